@@ -1,4 +1,5 @@
-from django.test import TestCase, RequestFactory
+from django.test import TestCase, RequestFactory, override_settings
+from django.core.cache import cache
 from django.contrib.auth.models import User
 from django.contrib.sites.models import Site
 from unittest.mock import patch, MagicMock
@@ -61,9 +62,24 @@ class SendActivationEmailTests(TestCase):
         # Assert the send method was called on the EmailMessage instance
         mock_email_instance.send.assert_called_once()
 
+class LoginRateLimitTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        User.objects.create_user(username='limited', password='password123')
+
+    @override_settings(RATELIMITS={'login': {'requests': 2, 'period': 300, 'keys': ('ip', 'username')}})
+    def test_login_attempts_limited_per_username(self):
+        for ip in ('10.0.0.1', '10.0.0.2'):
+            self.client.post('/accounts/login/', {'username': 'limited', 'password': 'wrong'}, REMOTE_ADDR=ip)
+        response = self.client.post('/accounts/login/', {'username': 'limited', 'password': 'password123'}, REMOTE_ADDR='10.0.0.3')
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        self.assertEqual(self.client.get('/accounts/login/').status_code, 200)
+
 # Example of how to run this specific test class:
 # python manage.py test accounts.tests.SendActivationEmailTests
 # To run all tests in accounts app:
 # python manage.py test accounts
 # To run all tests in the project:
 # python manage.py test
+
@@ -5,6 +5,7 @@ from .models import Profile
 # Import the new helper function
 from reservation.views import get_blog_posts
 from django.contrib import auth
+from mysite.ratelimit import RATE_LIMITED_MESSAGE, ratelimit
 
 # PW 찾기 관련
 from django.contrib.auth.views import PasswordResetView
@@ -43,7 +44,7 @@ def signup(request: HttpRequest) -> HttpResponse:
             mail_to = request.POST["email"]
             
             # 이메일이 있다면 실패
-            if len(User.objects.filter(email=mail_to)) == 0:
+            if not User.objects.filter(email=mail_to).exists():
                 user = User.objects.create_user(username=request.POST['username'], email=mail_to, password=request.POST['password1'])
                 user.is_active = True
                 user.save()
@@ -71,6 +72,12 @@ def signup(request: HttpRequest) -> HttpResponse:
 def confirm(request: HttpRequest) -> HttpResponse:
     return render(request, 'accounts/confirm.html')
 
+# Helper function for login view: Login page with the throttling message
+def _login_rate_limited(request: HttpRequest, retry_after: int) -> HttpResponse:
+    return render(request, 'accounts/login.html', {'msg': RATE_LIMITED_MESSAGE}, status=429)
+
+# 비밀번호 해시 계산이 비싸므로 IP와 학번 기준으로 시도 횟수 제한
+@ratelimit('login', methods=('POST',), limited_response=_login_rate_limited)
 def login(request: HttpRequest) -> HttpResponse:
     # 포스트 방식으로 들어오면
     if request.method == 'POST':
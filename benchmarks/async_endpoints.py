@@ -0,0 +1,133 @@
+"""
+Concurrent ``check``/``availability`` throughput: WSGI (gthread) vs ASGI (uvicorn).
+
+    python manage.py migrate
+    uv run python benchmarks/async_endpoints.py --clients 32 --duration 20
+
+Both server profiles of ``gunicorn.conf.py`` (``SERVER_PROFILE=wsgi`` and
+``SERVER_PROFILE=asgi``) are started one after the other on a free port with
+the same database and rate limits disabled. Each simulated
+client logs in with its own session and then alternates
+``POST /reservation/check`` and ``GET /reservation/new/<id>/availability``
+for ``--duration`` seconds.
+Throughput and p50/p95/p99 latency are reported per profile. Run it on the
+same VM size as production (``fly.toml``: 1 shared CPU, 512 MB) for
+comparable numbers; the load generator shares the CPU with the server.
+"""
+import argparse
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from booking_contention import SimulatedUser, _next_weekday, _setup_django, create_fixtures, remove_fixtures  # noqa: E402
+from http_load import format_latency  # noqa: E402
+
+PROFILES = ('wsgi', 'asgi')
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(profile: str, port: int, workers: Optional[int], timeout: float = 30.0) -> subprocess.Popen:
+    env = dict(os.environ, SERVER_PROFILE=profile, PORT=str(port), DJANGO_DEBUG='False', DJANGO_RATELIMIT_DISABLED='True')
+    if workers:
+        env['GUNICORN_WORKERS'] = str(workers)
+    cmd = [sys.executable, '-m', 'gunicorn', '--config', 'gunicorn.conf.py', '--bind', f'127.0.0.1:{port}']
+    proc = subprocess.Popen(cmd, cwd=BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{port}/healthz', timeout=5) as response:
+                response.read()
+            return proc
+        except (urllib.error.URLError, OSError):
+            time.sleep(0.1)
+    proc.terminate()
+    raise TimeoutError(f"{profile} server did not answer /healthz within {timeout}s")
+
+
+def load(base_url: str, usernames: List[str], equipment_id: int, room_date: date, duration: float) -> Dict[str, List[float]]:
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors = [0]
+    lock = threading.Lock()
+    barrier = threading.Barrier(len(usernames))
+
+    def client(username: str) -> None:
+        user = SimulatedUser(base_url, username)
+        user.login()
+        local: Dict[str, List[float]] = defaultdict(list)
+        local_errors = 0
+        barrier.wait()
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            start = 9 + random.randrange(24) * 0.5
+            try:
+                t0 = time.perf_counter()
+                user.check(equipment_id, room_date, start, min(start + 1, 21))
+                local['check'].append(time.perf_counter() - t0)
+                t0 = time.perf_counter()
+                user._open(f'/reservation/new/{equipment_id}/availability?week={random.randrange(4)}')
+                local['availability'].append(time.perf_counter() - t0)
+            except (urllib.error.URLError, OSError):
+                local_errors += 1
+        with lock:
+            for key, values in local.items():
+                latencies[key].extend(values)
+            errors[0] += local_errors
+
+    threads = [threading.Thread(target=client, args=(name,)) for name in usernames]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    latencies['errors'] = [0.0] * errors[0]
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=20.0)
+    parser.add_argument('--workers', type=int, help="gunicorn workers for both profiles (default: each profile's own, see gunicorn.conf.py)")
+    parser.add_argument('--profiles', nargs='+', choices=PROFILES, default=list(PROFILES))
+    args = parser.parse_args()
+
+    _setup_django()
+    equipment_id, usernames = create_fixtures(args.clients)
+    room_date = _next_weekday(date.today() + timedelta(days=1))
+    try:
+        for profile in args.profiles:
+            port = _free_port()
+            proc = start_server(profile, port, args.workers)
+            try:
+                latencies = load(f'http://127.0.0.1:{port}', usernames, equipment_id, room_date, args.duration)
+            finally:
+                proc.terminate()
+                proc.wait()
+            total = len(latencies['check']) + len(latencies['availability'])
+            print(f"{profile}: {args.clients} clients, {args.workers or 'default'} worker(s), {args.duration:.0f}s")
+            print(f"  throughput: {total / args.duration:.1f} req/s, errors: {len(latencies['errors'])}")
+            for step in ('check', 'availability'):
+                print(f"  {step:12s}: {len(latencies[step])} requests  {format_latency(latencies[step])}")
+    finally:
+        remove_fixtures(equipment_id, usernames)
+
+
+if __name__ == '__main__':
+    main()
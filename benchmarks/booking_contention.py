@@ -0,0 +1,219 @@
+"""
+Concurrent booking load test: many users race for the same equipment slots.
+
+Start a server against the same database first, then run the harness:
+
+    python manage.py migrate
+    DJANGO_RATELIMIT_DISABLED=True gunicorn --config gunicorn.conf.py mysite.wsgi:application --bind 127.0.0.1:8000
+    python benchmarks/booking_contention.py --base-url http://127.0.0.1:8000 --users 50 --slots 8
+
+Each simulated user logs in with its own session, then repeatedly picks one of
+``--slots`` half-hour slots on a single day and runs the real booking path
+(``POST /reservation/check`` followed by ``GET /reservation/create``). At the end
+the harness reports throughput, p50/p95/p99 latency per step and the number of
+overlapping ``Reservation`` rows it produced. Any overlap is a correctness bug.
+
+All simulated users share one IP, so the server must run with
+``DJANGO_RATELIMIT_DISABLED=True``; otherwise the run measures ``429``
+responses instead of contention (they are reported as ``throttled``).
+
+Users and equipment are created through the ORM and removed again with
+``--cleanup`` (the default), so the harness can run against a local copy of
+the production database. Usernames carry a random per-run prefix and only the
+accounts this run created are deleted; existing users are never touched.
+"""
+import argparse
+import http.cookiejar
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, List, Tuple
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from http_load import format_latency  # noqa: E402
+
+USER_PREFIX = 'l'  # + 실행마다 임의의 접미사 (기존 계정과 겹치지 않도록); Reservation.user가 10자이므로 전체 10자
+PASSWORD = 'load-test-password'
+
+
+def _setup_django() -> None:
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mysite.settings')
+    import django
+    django.setup()
+
+
+def _next_weekday(day: date) -> date:
+    while day.weekday() >= 5:
+        day += timedelta(days=1)
+    return day
+
+
+def create_fixtures(user_count: int) -> Tuple[int, List[str]]:
+    from django.contrib.auth.models import User
+    from reservation.models import Equipment
+
+    equipment = Equipment.objects.create(name='load-test equipment')
+    prefix = f'{USER_PREFIX}{uuid.uuid4().hex[:5]}'
+    usernames = [f'{prefix}{i:04d}' for i in range(user_count)]
+    for name in usernames:
+        User.objects.create_user(username=name, password=PASSWORD)
+    return equipment.pk, usernames
+
+
+def remove_fixtures(equipment_id: int, usernames: List[str]) -> None:
+    from django.contrib.auth.models import User
+    from reservation.models import Equipment
+
+    Equipment.objects.filter(pk=equipment_id).delete()  # cascades to its reservations
+    User.objects.filter(username__in=usernames).delete()
+
+
+def count_overlaps(equipment_id: int, room_date: date) -> Tuple[int, int]:
+    """Returns (reservations, overlapping pairs) for the contested day."""
+    from reservation.models import Reservation
+
+    rows = list(Reservation.objects.filter(equipment_id=equipment_id, room_date=room_date)
+                .order_by('room_start_time').values_list('room_start_time', 'room_finish_time'))
+    overlaps = 0
+    for i, (start_i, finish_i) in enumerate(rows):
+        for start_j, _ in rows[i + 1:]:
+            if start_j >= finish_i:
+                break
+            overlaps += 1
+    return len(rows), overlaps
+
+
+class SimulatedUser:
+    def __init__(self, base_url: str, username: str) -> None:
+        self.base_url = base_url.rstrip('/')
+        self.username = username
+        self.cookies = http.cookiejar.CookieJar()
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(self.cookies))
+
+    def _csrf_token(self) -> str:
+        for cookie in self.cookies:
+            if cookie.name == 'csrftoken':
+                return cookie.value
+        return ''
+
+    def _open(self, path: str, data: Dict[str, str] = None) -> bytes:
+        body = urllib.parse.urlencode(data).encode() if data is not None else None
+        request = urllib.request.Request(self.base_url + path, data=body, headers={'Referer': self.base_url + '/'})
+        with self.opener.open(request, timeout=30) as response:
+            return response.read()
+
+    def login(self) -> None:
+        self._open('/accounts/login/')
+        self._open('/accounts/login/', {'username': self.username, 'password': PASSWORD, 'csrfmiddlewaretoken': self._csrf_token()})
+
+    def check(self, equipment_id: int, room_date: date, start: float, finish: float) -> bool:
+        body = self._open('/reservation/check', {
+            'equipment_id': str(equipment_id), 'room_date': f'{room_date.isoformat()} ',
+            'room_start_time': str(start), 'room_finish_time': str(finish),
+            'csrfmiddlewaretoken': self._csrf_token(),
+        })
+        return json.loads(body).get('check_error') == 0
+
+    def create(self, equipment_id: int, room_date: date, start: float, finish: float) -> None:
+        query = urllib.parse.urlencode({
+            'user': self.username, 'equipment_id': equipment_id, 'room_date': f'{room_date.isoformat()} ',
+            'room_start_time': start, 'room_finish_time': finish,
+        })
+        self._open(f'/reservation/create?{query}')
+
+
+def run(args: argparse.Namespace) -> None:
+    _setup_django()
+    equipment_id, usernames = create_fixtures(args.users)
+    room_date = _next_weekday(date.today() + timedelta(days=1))
+    slots = [9 + i * 0.5 for i in range(args.slots)]
+
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    counters: Dict[str, int] = defaultdict(int)
+    lock = threading.Lock()
+    barrier = threading.Barrier(len(usernames))
+
+    def worker(username: str) -> None:
+        client = SimulatedUser(args.base_url, username)
+        local: Dict[str, List[float]] = defaultdict(list)
+        local_counts: Dict[str, int] = defaultdict(int)
+        try:
+            client.login()
+        except (urllib.error.URLError, OSError):
+            local_counts['login_errors'] += 1
+        barrier.wait()  # 모든 사용자가 동시에 예약 시작
+        for _ in range(args.attempts):
+            start = random.choice(slots)
+            try:
+                t0 = time.perf_counter()
+                ok = client.check(equipment_id, room_date, start, start + 0.5)
+                local['check'].append(time.perf_counter() - t0)
+                if not ok:
+                    local_counts['refused'] += 1
+                    continue
+                t0 = time.perf_counter()
+                client.create(equipment_id, room_date, start, start + 0.5)
+                local['create'].append(time.perf_counter() - t0)
+            except urllib.error.HTTPError as e:
+                local_counts['throttled' if e.code == 429 else 'errors'] += 1
+            except (urllib.error.URLError, OSError):
+                local_counts['errors'] += 1
+        with lock:
+            for key, values in local.items():
+                latencies[key].extend(values)
+            for key, value in local_counts.items():
+                counters[key] += value
+
+    threads = [threading.Thread(target=worker, args=(name,)) for name in usernames]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    total_requests = sum(len(v) for v in latencies.values())
+    reservations, overlaps = count_overlaps(equipment_id, room_date)
+    print(f"{len(usernames)} users x {args.attempts} attempts on {args.slots} slots ({room_date}), {elapsed:.1f}s")
+    # 거절된 create 요청은 빼고 실제로 저장된 예약만 센다
+    print(f"  throughput: {total_requests / elapsed:.1f} req/s, {reservations / elapsed:.1f} bookings/s")
+    for step in ('check', 'create'):
+        print(f"  {step:6s}: {len(latencies[step])} requests  {format_latency(latencies[step])}")
+    print(f"  refused by check: {counters['refused']}, errors: {counters['errors']}, login errors: {counters['login_errors']}")
+    if counters['throttled']:
+        print(f"  throttled (429): {counters['throttled']} - start the server with DJANGO_RATELIMIT_DISABLED=True")
+    print(f"  reservations stored: {reservations}, overlapping pairs: {overlaps}")
+
+    if args.cleanup:
+        remove_fixtures(equipment_id, usernames)
+    if overlaps:
+        sys.exit(1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--attempts', type=int, default=5, help="booking attempts per user")
+    parser.add_argument('--slots', type=int, default=8, help="number of contested half-hour slots")
+    parser.add_argument('--no-cleanup', dest='cleanup', action='store_false')
+    args = parser.parse_args()
+    if not 0 < args.users <= 9999:
+        parser.error('--users must be between 1 and 9999')  # 사용자 이름 끝 네 자리
+    run(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Cold-start benchmark: time from process launch to the first byte of ``/``.
+
+    python benchmarks/cold_start.py                 # gunicorn --preload (production)
+    python benchmarks/cold_start.py --no-preload    # gunicorn without preload
+    python benchmarks/cold_start.py --server runserver
+
+Each run starts a fresh server process, so the numbers include Python start-up,
+``django.setup()``, URLconf/view imports and template compilation.
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _command(server: str, port: int, preload: bool) -> list:
+    if server == 'runserver':
+        return [sys.executable, 'manage.py', 'runserver', '--noreload', f'127.0.0.1:{port}']
+    cmd = [sys.executable, '-m', 'gunicorn', '--bind', f'127.0.0.1:{port}', '--workers', '1']
+    if preload:
+        cmd.append('--preload')
+    return cmd + ['mysite.wsgi:application']
+
+
+def measure_once(server: str, preload: bool, path: str, timeout: float) -> float:
+    port = _free_port()
+    started = time.perf_counter()
+    env = dict(os.environ, DJANGO_RATELIMIT_DISABLED='True')  # 같은 IP에서 반복 요청
+    proc = subprocess.Popen(_command(server, port, preload), cwd=BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(f'http://127.0.0.1:{port}{path}', timeout=timeout) as response:
+                    response.read(1)
+                    return time.perf_counter() - started
+            except urllib.error.HTTPError:
+                return time.perf_counter() - started  # an error page is still a first byte
+            except OSError:
+                time.sleep(0.01)
+        raise TimeoutError(f"no response from {path} within {timeout}s")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--server', choices=['gunicorn', 'runserver'], default='gunicorn')
+    parser.add_argument('--no-preload', action='store_true')
+    parser.add_argument('--path', default='/')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--timeout', type=float, default=30.0)
+    args = parser.parse_args()
+
+    samples = [measure_once(args.server, not args.no_preload, args.path, args.timeout) for _ in range(args.runs)]
+    label = args.server if args.server == 'runserver' else f"gunicorn{'' if args.no_preload else ' --preload'}"
+    print(f"{label} {args.path}: time-to-first-byte over {args.runs} cold starts")
+    print(f"  min {min(samples) * 1000:.0f} ms  median {statistics.median(samples) * 1000:.0f} ms  max {max(samples) * 1000:.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Minimal HTTP load generator for comparing server profiles.
+
+    # before: gunicorn defaults
+    DJANGO_RATELIMIT_DISABLED=True gunicorn mysite.wsgi:application --bind 127.0.0.1:8000
+    python benchmarks/http_load.py http://127.0.0.1:8000/ --concurrency 16 --duration 20
+
+    # after: tuned profile
+    DJANGO_RATELIMIT_DISABLED=True gunicorn --config gunicorn.conf.py mysite.wsgi:application
+    python benchmarks/http_load.py http://127.0.0.1:8000/ --concurrency 16 --duration 20
+
+All requests come from one IP, so run the server with
+``DJANGO_RATELIMIT_DISABLED=True`` when the URL is a throttled view.
+Only the standard library is used, so it runs anywhere the app does.
+"""
+import argparse
+import threading
+import time
+import urllib.error
+import urllib.request
+from typing import List, Sequence
+
+
+def percentile(sorted_samples: Sequence[float], pct: float) -> float:
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, max(0, int(round(pct / 100 * len(sorted_samples))) - 1))
+    return sorted_samples[index]
+
+
+def format_latency(samples: List[float]) -> str:
+    samples = sorted(samples)
+    return '  '.join(f"p{p} {percentile(samples, p) * 1000:.1f} ms" for p in (50, 95, 99))
+
+
+def run(url: str, concurrency: int, duration: float) -> None:
+    latencies: List[float] = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client() -> None:
+        local: List[float] = []
+        local_errors = 0
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(url, timeout=30) as response:
+                    response.read()
+                local.append(time.perf_counter() - started)
+            except (urllib.error.URLError, OSError):
+                local_errors += 1
+        with lock:
+            latencies.extend(local)
+            errors[0] += local_errors
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    print(f"{url}  concurrency={concurrency}  duration={elapsed:.1f}s")
+    print(f"  {len(latencies)} ok, {errors[0]} errors, {len(latencies) / elapsed:.1f} req/s")
+    print(f"  {format_latency(latencies)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('url')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=20.0)
+    args = parser.parse_args()
+    run(args.url, args.concurrency, args.duration)
+
+
+if __name__ == '__main__':
+    main()
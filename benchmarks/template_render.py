@@ -0,0 +1,94 @@
+"""
+Template render benchmark for ``home.html`` and ``new.html``.
+
+    python benchmarks/template_render.py            # production settings (cached loader)
+    python benchmarks/template_render.py --debug    # DEBUG settings (no cached loader)
+
+Contexts are built in memory with unsaved model instances, so no database is
+needed. The first render of each template (compile + cold fragment cache) is
+reported separately from the steady state.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+
+def _setup(debug: bool) -> None:
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mysite.settings')
+    os.environ['DJANGO_DEBUG'] = 'True' if debug else 'False'
+    import django
+    django.setup()
+
+
+def _contexts(equipment_count: int, event_count: int) -> dict:
+    from reservation.models import Equipment, Reservation
+    from reservation.views import TIME_SLOTS
+
+    equipments = [Equipment(id=i, name=f"장비 {i}", description="원심분리기 " * 20) for i in range(1, equipment_count + 1)]
+    today = date.today()
+    reservations_today = [
+        Reservation(id=i, user=f"2020{i:06d}", equipment=equipments[i % equipment_count], room_date=today,
+                    room_start_time=9 + (i % 12), room_finish_time=10 + (i % 12))
+        for i in range(20)
+    ]
+    start = datetime.combine(today, datetime.min.time())
+    events = [
+        {'title': f"[장비 {i % equipment_count}] 2020{i:06d}",
+         'start': (start + timedelta(hours=i % 12 + 9, days=i // 40)).isoformat(),
+         'end': (start + timedelta(hours=i % 12 + 10, days=i // 40)).isoformat(),
+         'color': '#3788d8'}
+        for i in range(event_count)
+    ]
+    day_list = [[9 + j * 0.5 for j in range(0, 24, 3)] for _ in range(5)]
+    return {
+        'reservation/home.html': {
+            'equipments': equipments, 'notices': [], 'losts': [], 'msg': None,
+            'reservations_today': reservations_today, 'calendar_events': json.dumps(events),
+        },
+        'reservation/new.html': {
+            'equipment': equipments[0], 'date_diff': 4, 'weekday_mark': 0, 'day_list': day_list,
+            'start_day_diff': 0, 'time_slots': TIME_SLOTS, 'week_start': today.isoformat(),
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--debug', action='store_true')
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--equipment', type=int, default=30)
+    parser.add_argument('--events', type=int, default=2000)
+    args = parser.parse_args()
+    _setup(args.debug)
+
+    from django.contrib.auth.models import AnonymousUser
+    from django.template.loader import get_template
+    from django.test import RequestFactory
+
+    request = RequestFactory().get('/')
+    request.user = AnonymousUser()
+    print(f"{'DEBUG' if args.debug else 'production'} settings, {args.equipment} equipment, {args.events} calendar events")
+    for name, context in _contexts(args.equipment, args.events).items():
+        started = time.perf_counter()
+        get_template(name).render(context, request)
+        first = time.perf_counter() - started
+
+        samples = []
+        for _ in range(args.iterations):
+            started = time.perf_counter()
+            get_template(name).render(context, request)
+            samples.append(time.perf_counter() - started)
+        samples.sort()
+        p95 = samples[int(len(samples) * 0.95) - 1]
+        print(f"  {name:28s} first {first * 1000:7.2f} ms  mean {statistics.mean(samples) * 1000:6.2f} ms  p95 {p95 * 1000:6.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
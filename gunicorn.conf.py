@@ -0,0 +1,78 @@
+"""
+Gunicorn settings for the fly.io VM (see fly.toml: 1 shared CPU, 512 MB).
+
+``SERVER_PROFILE`` picks the app: ``wsgi`` (default, gthread workers) or
+``asgi`` (one uvicorn worker serving ``mysite.asgi``, needed for the async
+views and the SSE stream). WSGI workers and threads are sized from the CPU
+count and the memory limit of the container; workers are recycled after a
+number of requests or when their RSS grows past ``GUNICORN_MAX_WORKER_MB``.
+The RSS check is a ``post_request`` hook, which gunicorn only calls for its
+own sync/gthread workers: the uvicorn worker of the ``asgi`` profile is
+recycled by ``max_requests`` alone.
+Every value can be overridden with the environment variable named next to it.
+"""
+import multiprocessing
+import os
+import resource
+
+WORKER_MEMORY_MB = int(os.environ.get('GUNICORN_WORKER_MEMORY_MB', 100))  # 워커 1개 예상 메모리
+RESERVED_MEMORY_MB = 128  # 마스터 프로세스, OS 여유분
+
+
+def _memory_limit_mb() -> int:
+    # cgroup v2, cgroup v1, 실제 메모리 순서로 확인
+    for path in ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes'):
+        try:
+            with open(path) as f:
+                value = f.read().strip()
+            if value.isdigit() and int(value) < 1 << 50:
+                return int(value) // (1024 * 1024)
+        except OSError:
+            pass
+    return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') // (1024 * 1024)
+
+
+def _default_workers() -> int:
+    by_cpu = multiprocessing.cpu_count() * 2 + 1
+    by_memory = max(1, (_memory_limit_mb() - RESERVED_MEMORY_MB) // WORKER_MEMORY_MB)
+    return max(1, min(by_cpu, by_memory))
+
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+
+# SERVER_PROFILE=asgi: uvicorn 워커로 mysite.asgi 실행 (async check/availability, SSE)
+server_profile = os.environ.get('SERVER_PROFILE', 'wsgi')
+wsgi_app = 'mysite.asgi:application' if server_profile == 'asgi' else 'mysite.wsgi:application'
+
+# gthread: 요청 대부분이 SQLite I/O 대기이므로 스레드로 동시성을 확보
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'uvicorn_worker.UvicornWorker' if server_profile == 'asgi' else 'gthread')
+# ASGI는 SSE 이벤트 브로커(reservation/events.py)가 프로세스 안에 있으므로 워커 1개
+workers = int(os.environ.get('GUNICORN_WORKERS', 1 if server_profile == 'asgi' else _default_workers()))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+# 워커 재활용: 요청 수 기준 (+jitter로 동시 재시작 방지), 메모리 기준은 post_request에서
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 100))
+max_worker_memory_mb = int(os.environ.get('GUNICORN_MAX_WORKER_MB', 200))
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = 20
+keepalive = 5
+
+# 앱 모듈을 마스터에서 import하여 warm_up() 결과를 워커가 공유 (mysite/warmup.py)
+preload_app = True
+
+accesslog = '-'
+errorlog = '-'
+
+
+def _rss_mb() -> float:
+    # Linux reports ru_maxrss in KiB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# uvicorn 워커(SERVER_PROFILE=asgi)에서는 호출되지 않음
+def post_request(worker, req, environ, resp) -> None:
+    if _rss_mb() > max_worker_memory_mb:
+        worker.log.info("worker %s exceeded %d MB, recycling", worker.pid, max_worker_memory_mb)
+        worker.alive = False
@@ -3,6 +3,10 @@ ASGI config for mysite project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Availability event streams (``/reservation/events/<equipment_id>``) are served
+by a small ASGI app in front of Django so idle SSE connections skip the
+middleware stack; everything else goes to Django.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/3.0/howto/deployment/asgi/
 """
@@ -13,4 +17,18 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mysite.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from reservation.events import EVENTS_PATH, events_app  # noqa: E402  (needs the app registry)
+
+# gunicorn --preload 시 마스터 프로세스에서 한 번 실행 (mysite/wsgi.py와 동일)
+from mysite.warmup import warm_up  # noqa: E402
+warm_up()
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'http' and scope['method'] == 'GET':
+        match = EVENTS_PATH.match(scope['path'])
+        if match:
+            return await events_app(scope, receive, send, int(match['equipment_id']))
+    return await django_application(scope, receive, send)
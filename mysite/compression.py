@@ -0,0 +1,184 @@
+"""
+gzip/brotli compression of HTML and JSON responses.
+
+Replaces Django's ``GZipMiddleware``: only ``text/html`` and
+``application/json`` bodies of at least ``settings.COMPRESSION_MIN_SIZE``
+bytes are compressed (static files are served precompressed by WhiteNoise and
+the event stream must not be buffered). Brotli is preferred when the client
+accepts it and the optional ``brotli`` package is installed, gzip otherwise.
+
+Streaming responses (see ``mysite/responses.py``) are compressed chunk by
+chunk with a flush after each one, so the compressed body is streamed as well
+and never held in memory as a whole.
+
+Pages such as ``?msg=`` or the search results reflect user input next to
+secrets (CSRF token, session data), so like ``GZipMiddleware`` every
+compressed body gets a random length to defeat BREACH-style guessing: gzip
+puts up to ``MAX_RANDOM_BYTES`` random characters in the header's file name
+field, and brotli (which has no such field) ends the body with random
+whitespace that compresses to about as many bytes.
+"""
+import gzip
+import io
+import secrets
+import string
+import zlib
+from typing import AsyncIterator, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import patch_vary_headers
+
+try:  # optional: brotli is ~15-20% smaller than gzip for HTML/JSON
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+COMPRESSIBLE_TYPES = ('text/html', 'application/json')
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5  # 동적 응답용: 11은 CPU 대비 이득이 거의 없음
+# BREACH 완화 (GZipMiddleware.max_random_bytes와 같은 값): 압축 결과 길이에 무작위 잡음을 더한다
+MAX_RANDOM_BYTES = 100
+PADDING_CHARS = b' \t\r\n'  # JSON과 HTML 끝에 붙여도 의미가 바뀌지 않는 공백 (글자당 약 2비트)
+
+# 압축기: (chunk 압축, 마무리)
+Stream = Tuple[Callable[[bytes], bytes], Callable[[], bytes]]
+
+
+def _random_filename() -> str:
+    return ''.join(secrets.choice(string.ascii_letters) for _ in range(secrets.randbelow(MAX_RANDOM_BYTES) + 1))
+
+
+def _gzip_stream(flush: bool) -> Stream:
+    # Django의 compress_string/compress_sequence처럼 gzip 헤더의 파일 이름에 무작위 길이의 문자열을 넣는다
+    buffer = io.BytesIO()
+    zfile = gzip.GzipFile(filename=_random_filename(), mode='wb', compresslevel=GZIP_LEVEL, fileobj=buffer, mtime=0)
+
+    def drain() -> bytes:
+        data = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return data
+
+    def process(data: bytes) -> bytes:
+        zfile.write(data)
+        if flush:
+            zfile.flush(zlib.Z_SYNC_FLUSH)
+        return drain()
+
+    def finish() -> bytes:
+        zfile.close()
+        return drain()
+
+    return process, finish
+
+
+ENCODINGS: Dict[str, Callable[[bool], Stream]] = {'gzip': _gzip_stream}
+if brotli is not None:
+    def _padding() -> bytes:
+        # brotli에는 gzip 같은 헤더 필드가 없으므로 본문 끝에 무작위 공백을 붙여 같은 효과를 낸다
+        return bytes(secrets.choice(PADDING_CHARS) for _ in range(secrets.randbelow(4 * MAX_RANDOM_BYTES) + 1))
+
+    def _brotli_stream(flush: bool) -> Stream:
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+        def process(data: bytes) -> bytes:
+            return compressor.process(data) + (compressor.flush() if flush else b'')
+
+        return process, lambda: compressor.process(_padding()) + compressor.finish()
+
+    ENCODINGS['br'] = _brotli_stream
+
+
+def compress(data: bytes, coding: str) -> bytes:
+    process, finish = ENCODINGS[coding](False)
+    return process(data) + finish()
+
+
+PREFERENCE = ('br', 'gzip')
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """The best supported coding in an ``Accept-Encoding`` header, ignoring ``q=0`` entries."""
+    accepted = set()
+    for item in accept_encoding.lower().split(','):
+        coding, _, params = item.partition(';')
+        q = params.strip()
+        if q.startswith('q='):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding.strip())
+    for coding in PREFERENCE:
+        if coding in ENCODINGS and (coding in accepted or '*' in accepted):
+            return coding
+    return None
+
+
+def _compress_sequence(chunks: Iterable[bytes], coding: str) -> Iterator[bytes]:
+    process, finish = ENCODINGS[coding](True)
+    for chunk in chunks:
+        if chunk:
+            yield process(chunk)
+    yield finish()
+
+
+async def _acompress_sequence(chunks: AsyncIterator[bytes], coding: str) -> AsyncIterator[bytes]:
+    process, finish = ENCODINGS[coding](True)
+    async for chunk in chunks:
+        if chunk:
+            yield process(chunk)
+    yield finish()
+
+
+class CompressionMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request: HttpRequest, response: HttpResponse) -> HttpResponse:
+        content_type = response.get('Content-Type', '').split(';')[0].strip()
+        if content_type not in COMPRESSIBLE_TYPES or response.has_header('Content-Encoding'):
+            return response
+        if not response.streaming and len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        coding = negotiate_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if coding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = _acompress_sequence(response.streaming_content, coding)
+            else:
+                response.streaming_content = _compress_sequence(response.streaming_content, coding)
+            del response.headers['Content-Length']
+        else:
+            compressed = compress(response.content, coding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # 본문이 바뀌었으므로 강한 ETag는 약한 ETag로 (RFC 9110 8.8.1)
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = coding
+        return response
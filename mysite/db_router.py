@@ -0,0 +1,101 @@
+"""
+Read-replica routing.
+
+Views decorated with ``@read_only`` read from ``settings.DATABASE_REPLICA_ALIAS``;
+everything else, and every write, uses ``default``. After a request writes, the
+client gets a short-lived cookie that pins its reads to the primary so users
+see their own booking immediately despite replication lag.
+
+Without ``DATABASE_REPLICA_ALIAS`` (the default) the router is a no-op.
+"""
+import contextlib
+import contextvars
+from typing import Any, Callable, Iterator, Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+
+PIN_COOKIE = 'db_pin_primary'
+
+_use_replica: contextvars.ContextVar[bool] = contextvars.ContextVar('use_replica', default=False)
+_wrote: contextvars.ContextVar[bool] = contextvars.ContextVar('wrote', default=False)
+
+
+def read_only(view: Callable[..., HttpResponse]) -> Callable[..., HttpResponse]:
+    """Marks a view whose reads may be served by the replica."""
+    view.read_only = True
+    return view
+
+
+@contextlib.contextmanager
+def use_primary() -> Iterator[None]:
+    """Reads inside the block go to ``default`` even in a ``@read_only`` view (e.g. cache fills)."""
+    token = _use_replica.set(False)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+def _replica_alias() -> Optional[str]:
+    return getattr(settings, 'DATABASE_REPLICA_ALIAS', None)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model: Any, **hints: Any) -> Optional[str]:
+        alias = _replica_alias()
+        if alias and _use_replica.get() and not _wrote.get():
+            return alias
+        return 'default'
+
+    def db_for_write(self, model: Any, **hints: Any) -> str:
+        _wrote.set(True)
+        return 'default'
+
+    def allow_relation(self, obj1: Any, obj2: Any, **hints: Any) -> bool:
+        return True
+
+    def allow_migrate(self, db: str, app_label: str, model_name: Optional[str] = None, **hints: Any) -> bool:
+        # The replica gets its schema from the primary (file copy / streaming replication)
+        return db != _replica_alias()
+
+
+class ReplicaRoutingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        use_token = _use_replica.set(False)
+        wrote_token = _wrote.set(False)
+        try:
+            return self._pin_after_write(self.get_response(request))
+        finally:
+            _use_replica.reset(use_token)
+            _wrote.reset(wrote_token)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        use_token = _use_replica.set(False)
+        wrote_token = _wrote.set(False)
+        try:
+            return self._pin_after_write(await self.get_response(request))
+        finally:
+            _use_replica.reset(use_token)
+            _wrote.reset(wrote_token)
+
+    def _pin_after_write(self, response: HttpResponse) -> HttpResponse:
+        if _wrote.get():
+            response.set_cookie(PIN_COOKIE, '1', max_age=getattr(settings, 'DATABASE_REPLICA_PIN_SECONDS', 5), httponly=True, samesite='Lax')
+        return response
+
+    def process_view(self, request: HttpRequest, view_func: Callable, view_args: Any, view_kwargs: Any) -> None:
+        pinned = PIN_COOKIE in request.COOKIES
+        _use_replica.set(bool(getattr(view_func, 'read_only', False)) and request.method in ('GET', 'HEAD') and not pinned)
+        return None
@@ -0,0 +1,209 @@
+"""
+On-demand request profiling for staff (``?_profile=1``).
+
+A triggered request runs with a sampling profiler thread and an SQL execute
+wrapper on every database connection. Two files are written to
+``settings.PROFILE_DIR``:
+
+* ``<id>.folded`` - collapsed stacks (``frame;frame;frame count``), readable by
+  flamegraph.pl, speedscope and most flame-graph viewers;
+* ``<id>.json`` - request metadata and the SQL timeline (offset, duration, alias).
+
+The profile id is returned in the ``X-Profile-Id`` response header. Old files
+are deleted once the directory grows past ``PROFILE_MAX_BYTES``. Requests
+without the query parameter only pay for one substring check.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.http import HttpRequest, HttpResponse
+
+PROFILE_PARAM = '_profile'
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+DEFAULT_INTERVAL = 0.001
+
+# sys.setswitchinterval은 프로세스 전체 설정: 겹치는 프로파일 요청끼리 서로의 값을 되돌리지 않도록 참조 카운트
+_switch_lock = threading.Lock()
+_switch_users = 0
+_switch_original = 0.0
+
+
+def _frame_label(frame: Any) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.relpath(code.co_filename, settings.BASE_DIR)}:{code.co_firstlineno})".replace(';', ',')
+
+
+class StackSampler:
+    """Samples one thread's Python stack every ``interval`` seconds from a background thread."""
+
+    def __init__(self, thread_id: int, interval: float) -> None:
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack: List[str] = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def __enter__(self) -> 'StackSampler':
+        global _switch_users, _switch_original
+        # 기본 GIL 전환 간격(5ms)으로는 샘플이 너무 적으므로 프로파일 중에만 줄인다
+        with _switch_lock:
+            if _switch_users == 0:
+                _switch_original = sys.getswitchinterval()
+            _switch_users += 1
+            sys.setswitchinterval(min(sys.getswitchinterval(), self.interval))
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        global _switch_users
+        self._stop.set()
+        self._thread.join()
+        with _switch_lock:
+            _switch_users -= 1
+            if _switch_users == 0:  # 마지막 프로파일이 끝날 때만 원래 값으로
+                sys.setswitchinterval(_switch_original)
+
+    def folded(self) -> str:
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class SqlTimeline:
+    """``connection.execute_wrapper`` recording every query relative to the request start."""
+
+    def __init__(self, started: float) -> None:
+        self.started = started
+        self.queries: List[Dict[str, Any]] = []
+
+    def __call__(self, execute: Callable, sql: str, params: Any, many: bool, context: Dict[str, Any]) -> Any:
+        begin = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'alias': context['connection'].alias,
+                'offset_ms': round((begin - self.started) * 1000, 3),
+                'duration_ms': round((time.perf_counter() - begin) * 1000, 3),
+                'sql': sql,
+                'many': many,
+            })
+
+
+def rotate_profiles(directory: str, max_bytes: int) -> None:
+    """Deletes the oldest profile files until the directory fits in ``max_bytes``."""
+    entries = []
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if name.endswith(('.folded', '.json')) and os.path.isfile(path):
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        os.remove(path)
+        total -= size
+
+
+def _wants_profile(request: HttpRequest) -> bool:
+    # 쿼리 문자열 검사만 하고, 세션/사용자 조회는 파라미터가 있을 때만
+    if PROFILE_PARAM not in request.META.get('QUERY_STRING', ''):
+        return False
+    return request.GET.get(PROFILE_PARAM) == '1' and request.user.is_staff
+
+
+class ProfilingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not _wants_profile(request):
+            return self.get_response(request)
+
+        started = time.perf_counter()
+        timeline = SqlTimeline(started)
+        with ExitStack() as stack:
+            self._wrap_connections(stack, timeline)
+            sampler = stack.enter_context(self._sampler())
+            response = self.get_response(request)
+        return self._finish(request, response, sampler, timeline, started)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        if PROFILE_PARAM not in request.META.get('QUERY_STRING', '') or request.GET.get(PROFILE_PARAM) != '1' or not (await request.auser()).is_staff:
+            return await self.get_response(request)
+
+        started = time.perf_counter()
+        timeline = SqlTimeline(started)
+        stack = ExitStack()
+        # DB 연결은 스레드별이므로 이 요청의 async ORM 쿼리가 실행되는 스레드에서 감싼다
+        await sync_to_async(self._wrap_connections)(stack, timeline)
+        try:
+            # 이벤트 루프 스레드를 샘플링하므로 쿼리 시간은 await 대기로 보인다
+            with self._sampler() as sampler:
+                response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return await sync_to_async(self._finish)(request, response, sampler, timeline, started)
+
+    def _wrap_connections(self, stack: ExitStack, timeline: SqlTimeline) -> None:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(timeline))
+
+    def _sampler(self) -> StackSampler:
+        return StackSampler(threading.get_ident(), getattr(settings, 'PROFILE_SAMPLE_INTERVAL', DEFAULT_INTERVAL))
+
+    def _finish(self, request: HttpRequest, response: HttpResponse, sampler: StackSampler, timeline: SqlTimeline, started: float) -> HttpResponse:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        profile_id = self._store(request, response, sampler, timeline, elapsed_ms)
+        response['X-Profile-Id'] = profile_id
+        response['Server-Timing'] = f'total;dur={elapsed_ms:.1f}, sql;dur={sum(q["duration_ms"] for q in timeline.queries):.1f}'
+        return response
+
+    def _store(self, request: HttpRequest, response: HttpResponse, sampler: StackSampler, timeline: SqlTimeline, elapsed_ms: float) -> str:
+        directory = settings.PROFILE_DIR
+        os.makedirs(directory, exist_ok=True)
+        match = getattr(request, 'resolver_match', None)
+        view_name: Optional[str] = match.view_name if match else None
+        profile_id = f"{datetime.now():%Y%m%d-%H%M%S-%f}-{(view_name or 'unknown').replace(':', '_')}"
+        with open(os.path.join(directory, f'{profile_id}.folded'), 'w', encoding='utf-8') as f:
+            f.write(sampler.folded())
+        with open(os.path.join(directory, f'{profile_id}.json'), 'w', encoding='utf-8') as f:
+            json.dump({
+                'path': request.get_full_path(),
+                'method': request.method,
+                'view': view_name,
+                'user': request.user.get_username(),
+                'status': response.status_code,
+                'duration_ms': round(elapsed_ms, 3),
+                'sample_interval_ms': sampler.interval * 1000,
+                'samples': sum(sampler.stacks.values()),
+                'sql': timeline.queries,
+            }, f, ensure_ascii=False, indent=1)
+        rotate_profiles(directory, getattr(settings, 'PROFILE_MAX_BYTES', DEFAULT_MAX_BYTES))
+        return profile_id
@@ -0,0 +1,134 @@
+"""
+Per-user / per-IP request throttling backed by the shared cache.
+
+Limits are configured per scope in ``settings.RATELIMITS``::
+
+    RATELIMITS = {'check': {'requests': 60, 'period': 60, 'keys': ('user', 'ip'), 'ip_requests': 1200}}
+
+``<key>_requests`` overrides ``requests`` for one key: many users behind one
+campus NAT share a client IP, so the IP key needs a much higher limit than
+the per-user key.
+
+Each key (user id, client IP, or the posted ``username`` for login) gets a
+sliding-window counter: two fixed-window counters updated with atomic
+``cache.incr``, the previous window weighted by how much of it still overlaps
+the sliding window. This behaves like a token bucket holding ``requests``
+tokens that refill over ``period`` seconds, without a read-modify-write
+race between workers. A throttled request gets ``429`` and ``Retry-After``.
+"""
+import functools
+import math
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpRequest, HttpResponse, JsonResponse
+
+RATE_LIMITED_MESSAGE = "요청이 너무 많습니다. 잠시 후 다시 시도해주세요."
+
+
+def client_ip(request: HttpRequest) -> str:
+    # fly.io 프록시 뒤에서는 실제 클라이언트 IP가 헤더로 전달됨 (settings에서 프록시 뒤일 때만 설정)
+    header = getattr(settings, 'RATELIMIT_IP_HEADER', None)
+    return (header and request.META.get(header)) or request.META.get('REMOTE_ADDR', '')
+
+
+def _identities(request: HttpRequest, config: Dict, user: Any) -> List[Tuple[str, int]]:
+    """(identity, allowed requests) for each configured key that applies to the request."""
+    identities = []
+    for key in config['keys']:
+        requests = config.get(f'{key}_requests', config['requests'])
+        if key == 'user' and user.is_authenticated:
+            identities.append((f'user:{user.pk}', requests))
+        elif key == 'ip':
+            identities.append((f'ip:{client_ip(request)}', requests))
+        elif key == 'username' and request.POST.get('username'):
+            identities.append((f"username:{request.POST['username'][:150]}", requests))
+    return identities
+
+
+def _retry_after(current: int, previous: int, elapsed: float, requests: int, period: int) -> int:
+    weight = 1 - elapsed / period
+    if previous * weight + current <= requests:
+        return 0
+    if current > requests:
+        return max(1, math.ceil(period - elapsed))
+    # 이전 구간의 가중치가 충분히 줄어들 때까지
+    return max(1, math.ceil(period * (1 - (requests - current) / previous) - elapsed))
+
+
+def hit(scope: str, identity: str, requests: int, period: int, now: Optional[float] = None) -> int:
+    """Counts one request; returns 0 if allowed, else the seconds to wait."""
+    now = time.time() if now is None else now
+    window = int(now // period)
+    current_key = f'ratelimit:{scope}:{identity}:{window}'
+    cache.add(current_key, 0, timeout=period * 2)
+    try:
+        current = cache.incr(current_key)
+    except ValueError:  # 만료와 incr 사이에 키가 사라진 경우
+        cache.add(current_key, 1, timeout=period * 2)
+        current = 1
+    previous = cache.get(f'ratelimit:{scope}:{identity}:{window - 1}', 0)
+    return _retry_after(current, previous, now - window * period, requests, period)
+
+
+async def ahit(scope: str, identity: str, requests: int, period: int, now: Optional[float] = None) -> int:
+    """``hit`` for async views."""
+    now = time.time() if now is None else now
+    window = int(now // period)
+    current_key = f'ratelimit:{scope}:{identity}:{window}'
+    await cache.aadd(current_key, 0, timeout=period * 2)
+    try:
+        current = await cache.aincr(current_key)
+    except ValueError:
+        await cache.aadd(current_key, 1, timeout=period * 2)
+        current = 1
+    previous = await cache.aget(f'ratelimit:{scope}:{identity}:{window - 1}', 0)
+    return _retry_after(current, previous, now - window * period, requests, period)
+
+
+def _default_limited_response(request: HttpRequest, retry_after: int) -> HttpResponse:
+    return JsonResponse({'message': RATE_LIMITED_MESSAGE, 'code': 'rate_limited'}, status=429)
+
+
+def ratelimit(scope: str, methods: Tuple[str, ...] = ('GET', 'POST'), limited_response: Callable[[HttpRequest, int], HttpResponse] = _default_limited_response) -> Callable:
+    """Throttles the view with ``settings.RATELIMITS[scope]``; a missing scope disables it.
+
+    Works on sync and async views; async views count with the async cache API.
+    """
+    def limited(request: HttpRequest, retry_after: int) -> HttpResponse:
+        response = limited_response(request, retry_after)
+        response['Retry-After'] = str(retry_after)
+        return response
+
+    def decorator(view: Callable[..., HttpResponse]) -> Callable[..., HttpResponse]:
+        if iscoroutinefunction(view):
+            @functools.wraps(view)
+            async def async_wrapper(request: HttpRequest, *args, **kwargs) -> HttpResponse:
+                config: Optional[Dict] = getattr(settings, 'RATELIMITS', {}).get(scope)
+                if config and request.method in methods:
+                    user = await request.auser()
+                    retry_after = max(
+                        [await ahit(scope, identity, requests, config['period']) for identity, requests in _identities(request, config, user)],
+                        default=0,
+                    )
+                    if retry_after:
+                        return limited(request, retry_after)
+                return await view(request, *args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(view)
+        def wrapper(request: HttpRequest, *args, **kwargs) -> HttpResponse:
+            config: Optional[Dict] = getattr(settings, 'RATELIMITS', {}).get(scope)
+            if config and request.method in methods:
+                retry_after = max(
+                    (hit(scope, identity, requests, config['period']) for identity, requests in _identities(request, config, request.user)),
+                    default=0,
+                )
+                if retry_after:
+                    return limited(request, retry_after)
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
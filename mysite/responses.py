@@ -0,0 +1,72 @@
+"""
+JSON responses shared by the views, the API and the event stream.
+
+``json_response`` encodes a payload that is already in memory (orjson when
+installed). ``streaming_json_response`` writes a JSON array from any iterable,
+typically ``QuerySet.values_list(...)``, ``CHUNK_SIZE`` rows at a time: the
+queryset is read with ``.iterator()`` so neither the rows nor the encoded
+body are ever held in memory as a whole, however large the schedule gets.
+``CompressionMiddleware`` compresses the stream chunk by chunk.
+
+Under ASGI the chunks are produced in the thread that owns the database
+connection and handed to the event loop one by one; a plain sync iterator would
+make Django buffer the whole body first.
+"""
+import json
+from typing import Any, AsyncIterator, Callable, Iterable, Iterator, Optional
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import QuerySet
+from django.http import HttpRequest, HttpResponse, StreamingHttpResponse
+
+try:  # orjson is several times faster than the stdlib encoder; fall back if it is missing
+    import orjson
+
+    def dumps(data: Any) -> bytes:
+        return orjson.dumps(data)
+except ImportError:  # pragma: no cover
+    def dumps(data: Any) -> bytes:
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8')
+
+CHUNK_SIZE = 500
+
+
+def json_response(data: Any, status: int = 200) -> HttpResponse:
+    return HttpResponse(dumps(data), status=status, content_type='application/json')
+
+
+def iter_json_array(items: Iterable[Any], encode: Optional[Callable[[Any], Any]] = None, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Yields ``[item, ...]`` as bytes, one chunk per ``chunk_size`` items."""
+    yield b'['
+    chunk = []
+    first = True
+    for item in items:
+        chunk.append(dumps(encode(item) if encode else item))
+        if len(chunk) == chunk_size:
+            yield (b'' if first else b',') + b','.join(chunk)
+            chunk, first = [], False
+    if chunk:
+        yield (b'' if first else b',') + b','.join(chunk)
+    yield b']'
+
+
+async def _aiter_chunks(chunks: Iterator[bytes]) -> AsyncIterator[bytes]:
+    # 커서가 열린 스레드(thread_sensitive)에서 한 조각씩 꺼낸다
+    next_chunk = sync_to_async(lambda: next(chunks, None))
+    try:
+        while (chunk := await next_chunk()) is not None:
+            yield chunk
+    finally:
+        await sync_to_async(chunks.close)()
+
+
+def streaming_json_response(request: HttpRequest, items: Iterable[Any], encode: Optional[Callable[[Any], Any]] = None, chunk_size: int = CHUNK_SIZE) -> StreamingHttpResponse:
+    """A JSON array response encoded while it is sent; ``encode`` maps each item to a JSON-serialisable value."""
+    if isinstance(items, QuerySet):
+        # 응답 본문은 뷰가 끝난 뒤에 읽으므로 지금의 DB(레플리카/기본) 선택을 고정
+        items = items.using(items.db).iterator(chunk_size=chunk_size)
+    chunks = iter_json_array(items, encode, chunk_size)
+    if isinstance(request, ASGIRequest):
+        chunks = _aiter_chunks(chunks)
+    return StreamingHttpResponse(chunks, content_type='application/json')
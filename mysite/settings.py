@@ -23,7 +23,7 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 SECRET_KEY = 'dummy_secret_key_for_testing' # secret key
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = os.environ.get('DJANGO_DEBUG', 'True') == 'True'
 
 ALLOWED_HOSTS = ['*'] # In production, set this to specific domain if possible.
 
@@ -47,23 +47,35 @@ SITE_ID = 1
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware', # Whitenoise
+    'mysite.static_middleware.AsyncWhiteNoiseMiddleware', # Whitenoise (ASGI에서도 이벤트 루프에서 통과)
+    'mysite.compression.CompressionMiddleware', # HTML/JSON gzip·brotli
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'mysite.profiling.ProfilingMiddleware', # staff ?_profile=1
+    'mysite.slow_queries.SlowQueryMiddleware', # 느린 쿼리에 뷰 이름 기록
+    'mysite.db_router.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
 ROOT_URLCONF = 'mysite.urls'
 
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+if not DEBUG:
+    # Production: compile each template once per process
+    TEMPLATE_LOADERS = [('django.template.loaders.cached.Loader', TEMPLATE_LOADERS)]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': TEMPLATE_LOADERS,
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -86,6 +98,80 @@ DATABASES = {
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
     }
 }
+# Django 6.0의 기본값과 같게 고정 (0011 이후의 마이그레이션은 BigAutoField)
+DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Read replica for @read_only views (mysite/db_router.py).
+# e.g. DJANGO_DB_REPLICA=replica.sqlite3 with a copy of db.sqlite3 as the stand-in
+DATABASE_REPLICA_ALIAS = None
+DATABASE_REPLICA_PIN_SECONDS = 5  # 쓰기 후 primary에서 읽는 시간
+if os.environ.get('DJANGO_DB_REPLICA'):
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, os.environ['DJANGO_DB_REPLICA']),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICA_ALIAS = 'replica'
+DATABASE_ROUTERS = ['mysite.db_router.ReplicaRouter']
+
+# 여러 gunicorn 워커가 캐시(예약 현황, 요청 제한 카운터)를 공유하려면 DJANGO_REDIS_URL 설정
+# 공유 캐시가 없으면 워커마다 따로인 LocMem이라 다른 워커의 무효화가 보이지 않으므로 예약 현황 캐시는 몇 초만 유지
+RESERVATION_CACHE_TIMEOUT = 5
+if os.environ.get('DJANGO_REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['DJANGO_REDIS_URL'],
+        }
+    }
+    RESERVATION_CACHE_TIMEOUT = 60 * 60  # 무효화는 신호에서, 시간 제한은 안전장치
+
+# Staff request profiles (mysite/profiling.py): flame-graph stacks + SQL timeline
+PROFILE_DIR = os.environ.get('DJANGO_PROFILE_DIR', os.path.join(BASE_DIR, 'profiles'))
+PROFILE_MAX_BYTES = 50 * 1024 * 1024  # 넘으면 오래된 프로파일부터 삭제
+PROFILE_SAMPLE_INTERVAL = 0.001
+
+# 삭제 기록(tombstone) 보관 기간: `manage.py prune_tombstones`가 이보다 오래된 기록을 정리
+TOMBSTONE_RETENTION_DAYS = 90
+
+# Request throttling (mysite/ratelimit.py): N requests per period seconds for each key
+# 학내 NAT 뒤의 사용자들은 IP 하나를 공유하므로 IP 한도(ip_requests)는 사용자 한도보다 훨씬 크게
+RATELIMITS = {
+    'check': {'requests': 60, 'period': 60, 'keys': ('user', 'ip'), 'ip_requests': 1200},
+    'create': {'requests': 20, 'period': 60, 'keys': ('user', 'ip'), 'ip_requests': 400},
+    'login': {'requests': 10, 'period': 300, 'keys': ('ip', 'username')},
+}
+if os.environ.get('DJANGO_RATELIMIT_DISABLED') == 'True':  # 부하 테스트 (benchmarks/)
+    RATELIMITS = {}
+# fly.io 프록시가 넣는 클라이언트 IP: 프록시를 거치지 않으면 클라이언트가 임의로 바꿀 수 있으므로 fly에서만 신뢰
+RATELIMIT_IP_HEADER = 'HTTP_FLY_CLIENT_IP' if os.environ.get('DJANGO_BEHIND_FLY_PROXY') == 'True' else None
+
+# HTML/JSON 응답 압축 (mysite/compression.py): 이보다 작은 응답은 그대로 보냄
+COMPRESSION_MIN_SIZE = 1024
+
+# Slow-query log (mysite/slow_queries.py), summarised by `manage.py slow_queries`
+SLOW_QUERY_MS = float(os.environ.get('DJANGO_SLOW_QUERY_MS', 100))
+SLOW_QUERY_EXPLAIN_ANALYZE = False  # PostgreSQL: EXPLAIN ANALYZE는 쿼리를 한 번 더 실행함
+SLOW_QUERY_LOG = os.environ.get('DJANGO_SLOW_QUERY_LOG', os.path.join(BASE_DIR, 'slow_queries.log'))
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {'message': {'format': '%(message)s'}},
+    'handlers': {
+        'slow_queries': {
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': SLOW_QUERY_LOG,
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 3,
+            'delay': True,
+            'encoding': 'utf-8',
+            'formatter': 'message',
+        },
+    },
+    'loggers': {
+        'mysite.slow_queries': {'handlers': ['slow_queries'], 'level': 'WARNING', 'propagate': False},
+    },
+}
 
 
 # Password validation
@@ -147,5 +233,5 @@ CKEDITOR_UPLOAD_PATH = 'uploads/'
 CKEDITOR_IMAGE_BACKEND = "pillow" 
 CKEDITOR_FILENAME_GENERATOR = 'utils.get_filename'
 
-MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+MEDIA_ROOT = os.environ.get('DJANGO_MEDIA_ROOT', os.path.join(BASE_DIR, 'media'))  # fly.toml: 배포 후에도 남도록 볼륨에
 MEDIA_URL = '/media/'
@@ -0,0 +1,166 @@
+"""
+Slow-query log.
+
+Every database connection gets an execute wrapper (installed from
+``connection_created``) that times each query. Queries slower than
+``settings.SLOW_QUERY_MS`` are logged as one JSON object per line to the
+``mysite.slow_queries`` logger. Each entry has:
+
+* a fingerprint of the SQL with literals and ``IN`` lists normalised, so the
+  same ORM call groups together;
+* the view that was running and the first project frame that issued the query;
+* the parameters, with strings redacted to their length;
+* the ``EXPLAIN QUERY PLAN`` (SQLite) or ``EXPLAIN`` (PostgreSQL) output for
+  SELECTs.
+
+``python manage.py slow_queries`` aggregates the log by fingerprint and prints
+the top offenders. Fast queries only pay for two ``perf_counter`` calls.
+"""
+import contextvars
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import HttpRequest, HttpResponse
+
+logger = logging.getLogger('mysite.slow_queries')
+
+_current_view: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar('slow_query_view', default=None)
+_explaining: contextvars.ContextVar[bool] = contextvars.ContextVar('slow_query_explaining', default=False)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN\s*\((?:\s*(?:%s|\?)\s*,?)+\)', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_sql(sql: str) -> str:
+    sql = _STRING_LITERAL.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+def fingerprint(sql: str) -> str:
+    return hashlib.sha1(normalize_sql(sql).encode('utf-8')).hexdigest()[:12]
+
+
+def redact(params: Any) -> Any:
+    """Keeps numbers, dates and NULLs; strings and bytes are replaced by their length."""
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {key: redact(value) for key, value in params.items()}
+    if isinstance(params, (list, tuple)):
+        return [redact(value) for value in params]
+    if isinstance(params, str):
+        return f'<str:{len(params)}>'
+    if isinstance(params, (bytes, bytearray, memoryview)):
+        return f'<bytes:{len(params)}>'
+    if isinstance(params, (int, float, bool)):
+        return params
+    return str(params)
+
+
+def _calling_frame() -> Optional[str]:
+    """First project frame (under BASE_DIR, outside site-packages and this module) as ``path:line``."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if filename.startswith(str(settings.BASE_DIR)) and 'site-packages' not in filename and filename != os.path.abspath(__file__):
+            return f"{os.path.relpath(filename, settings.BASE_DIR)}:{frame.f_lineno}"
+        frame = frame.f_back
+    return None
+
+
+def explain(connection: Any, sql: str, params: Any) -> Optional[List[str]]:
+    if not sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+        return None
+    if connection.vendor == 'sqlite':
+        prefix = 'EXPLAIN QUERY PLAN '
+    elif connection.vendor == 'postgresql':
+        prefix = 'EXPLAIN (ANALYZE) ' if getattr(settings, 'SLOW_QUERY_EXPLAIN_ANALYZE', False) else 'EXPLAIN '
+    else:
+        return None
+    token = _explaining.set(True)
+    try:
+        # savepoint 안에서 실행해 EXPLAIN 실패가 진행 중인 트랜잭션을 깨지 않도록
+        with transaction.atomic(using=connection.alias):
+            with connection.cursor() as cursor:
+                cursor.execute(prefix + sql, params)
+                return [' | '.join(str(col) for col in row) for row in cursor.fetchall()]
+    except DatabaseError:
+        return None
+    finally:
+        _explaining.reset(token)
+
+
+def slow_query_wrapper(execute: Callable, sql: str, params: Any, many: bool, context: Dict[str, Any]) -> Any:
+    started = time.perf_counter()
+    failed = True
+    try:
+        result = execute(sql, params, many, context)
+        failed = False
+        return result
+    finally:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        threshold = getattr(settings, 'SLOW_QUERY_MS', None)
+        if threshold is not None and elapsed_ms >= threshold and not _explaining.get():
+            connection = context['connection']
+            logger.warning(json.dumps({
+                'fingerprint': fingerprint(sql),
+                'duration_ms': round(elapsed_ms, 3),
+                'alias': connection.alias,
+                'view': _current_view.get(),
+                'caller': _calling_frame(),
+                'sql': normalize_sql(sql),
+                'params': redact(params) if not many else '<executemany>',
+                'plan': None if many or failed else explain(connection, sql, params),
+            }, ensure_ascii=False, default=str))
+
+
+@receiver(connection_created)
+def install_wrapper(sender: Any, connection: Any, **kwargs: Any) -> None:
+    if slow_query_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(slow_query_wrapper)
+
+
+class SlowQueryMiddleware:
+    """Remembers the resolved view so slow queries can be attributed to it."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _current_view.set(None)
+        try:
+            return self.get_response(request)
+        finally:
+            _current_view.reset(token)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        token = _current_view.set(None)
+        try:
+            return await self.get_response(request)
+        finally:
+            _current_view.reset(token)
+
+    def process_view(self, request: HttpRequest, view_func: Callable, view_args: Any, view_kwargs: Any) -> None:
+        _current_view.set(f"{view_func.__module__}.{getattr(view_func, '__name__', type(view_func).__name__)}")
+        return None
@@ -13,11 +13,17 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+import re
+
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 import reservation.views
-from django.conf.urls.static import static
+from django.views.static import serve
 from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.views.decorators.cache import never_cache
+from django.views.decorators.csrf import csrf_exempt
+from mysite.warmup import lazy_view
 
 from typing import List, Union
 from django.urls.resolvers import URLPattern, URLResolver
@@ -25,15 +31,31 @@ from django.urls.resolvers import URLPattern, URLResolver
 urlpatterns: List[Union[URLPattern, URLResolver]] = [
     path('admin/', admin.site.urls),
     path('', reservation.views.home, name='home'),
+    path('calendar/events', reservation.views.calendar_events, name='calendar_events'),
     path('blog/<int:blog_id>', reservation.views.detail, name="detail"),
     path('reservation/new/<int:equipment_id>', reservation.views.new, name="new"),
+    path('reservation/new/<int:equipment_id>/availability', reservation.views.availability, name="availability"),
+    path('reservation/board', reservation.views.board, name="board"),
     path('reservation/check', reservation.views.check, name="check"),
+    path('reservation/search', reservation.views.search, name="search"),
     path('reservation/index/<str:category_name>', reservation.views.index, name="index"),
     path('reservation/create', reservation.views.create, name='create'),
     path('reservation/edit/<int:reservation_id>', reservation.views.edit, name="edit"),
     path('reservation/update/<int:reservation_id>', reservation.views.update, name="update"),
     path('reservation/delete/<int:reservation_id>', reservation.views.delete, name="delete"),
+    path('reservation/waitlist', reservation.views.waitlist_join, name="waitlist_join"),
+    path('reservation/waitlist/<int:entry_id>/cancel', reservation.views.waitlist_leave, name="waitlist_leave"),
     path('reservation/my', reservation.views.myreservation, name="myreservation"),
+    path('reservation/report', reservation.views.report, name="report"),
+    path('reservation/cancel', reservation.views.bulk_cancel, name="bulk_cancel"),
+    path('healthz', reservation.views.healthz, name='healthz'),
+    path('api/v1/', include('reservation.api_urls')), # JSON API
     path('accounts/',include('accounts.urls')), # Accounts
-    path('ckeditor/', include('ckeditor_uploader.urls')), # ckeditor
-]+ static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+    # ckeditor 업로드 뷰는 관리자만 쓰므로 첫 호출 때 import (ckeditor_uploader.urls와 같은 URL 이름)
+    re_path(r'^ckeditor/upload/', csrf_exempt(lazy_view('ckeditor_uploader.views.upload', staff_member_required)), name='ckeditor_upload'),
+    re_path(r'^ckeditor/browse/', never_cache(lazy_view('ckeditor_uploader.views.browse', staff_member_required)), name='ckeditor_browse'),
+    # 업로드 파일: static()은 DEBUG에서만 URL을 만들므로 운영(DJANGO_DEBUG=False)에서도 직접 제공.
+    # django.views.static.serve는 운영용이 아니지만 의도한 선택: 단일 VM 배포에서 업로드는 관리자 공지 이미지뿐이고,
+    # WhiteNoise는 시작 시점의 파일만 목록에 올리므로 실행 중 업로드한 파일을 제공하지 못함 (README 참고)
+    re_path(r'^%s(?P<path>.+)$' % re.escape(settings.MEDIA_URL.lstrip('/')), serve, {'document_root': settings.MEDIA_ROOT}, name='media'),
+]
\ No newline at end of file
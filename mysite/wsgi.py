@@ -11,4 +11,8 @@ import os
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mysite.settings')
-application = get_wsgi_application()
\ No newline at end of file
+application = get_wsgi_application()
+
+# gunicorn --preload 시 마스터 프로세스에서 한 번 실행되어 워커들이 공유
+from mysite.warmup import warm_up  # noqa: E402
+warm_up()
\ No newline at end of file
@@ -1,7 +1,11 @@
 from django.contrib import admin
-from .models import Reservation, Blog, Equipment
+from .models import Reservation, Blog, Equipment, WaitlistEntry
 
 # Register your models here.
 admin.site.register(Reservation)
 admin.site.register(Blog)
-admin.site.register(Equipment)
\ No newline at end of file
+admin.site.register(WaitlistEntry)
+
+@admin.register(Equipment)
+class EquipmentAdmin(admin.ModelAdmin):
+    list_display = ('name', 'capacity')
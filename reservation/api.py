@@ -0,0 +1,290 @@
+"""
+Versioned JSON API (``/api/v1/``) for kiosk displays and scripts.
+
+List endpoints use keyset ("cursor") pagination so every page costs the same
+fixed number of queries, accept ``?fields=`` for sparse field selection and are
+compressed by ``mysite.compression.CompressionMiddleware`` when the payload is
+large enough to benefit.
+"""
+import json
+from datetime import datetime, timedelta, date
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from django.db.models import QuerySet
+from django.http import HttpRequest, HttpResponse
+from django.views.decorators.http import require_GET, require_http_methods, require_POST
+
+from mysite.db_router import read_only
+from mysite.ratelimit import ratelimit
+from mysite.responses import json_response
+from .changes import ChangesExpired, current_change_seq, get_changes, get_snapshot
+from .models import Equipment, Reservation
+from .pagination import decode_cursor, encode_cursor, reservations_after
+from .views import BOOKING_ERROR_STATUS, BOOKING_ERRORS, _book_reservation, _get_week_start_day_and_params
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+MAX_AVAILABILITY_DAYS = 31
+
+EQUIPMENT_FIELDS = ('id', 'name', 'description', 'capacity')
+RESERVATION_FIELDS = ('id', 'user', 'equipment_id', 'equipment_name', 'room_date', 'room_start_time', 'room_finish_time', 'pub_date', 'updated_at')
+
+
+class ApiError(Exception):
+    def __init__(self, message: str, status: int = 400, code: Optional[str] = None) -> None:
+        super().__init__(message)
+        self.message = message
+        self.status = status
+        self.code = code
+
+
+def api_view(view: Callable[..., HttpResponse]) -> Callable[..., HttpResponse]:
+    """Turns ``ApiError`` into a JSON error body."""
+    def wrapper(request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+        try:
+            return view(request, *args, **kwargs)
+        except ApiError as e:
+            body = {'message': e.message}
+            if e.code:
+                body['code'] = e.code
+            return json_response(body, status=e.status)
+    wrapper.__name__ = view.__name__
+    wrapper.__doc__ = view.__doc__
+    return wrapper
+
+
+def _require_user(request: HttpRequest) -> None:
+    if not request.user.is_authenticated:
+        raise ApiError("로그인이 필요합니다.", status=401)
+
+
+def _get_page_size(request: HttpRequest) -> int:
+    try:
+        size = int(request.GET.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise ApiError("limit은 정수여야 합니다.")
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+def _get_fields(request: HttpRequest, allowed: Sequence[str]) -> Sequence[str]:
+    raw = request.GET.get('fields')
+    if not raw:
+        return allowed
+    fields = [f.strip() for f in raw.split(',') if f.strip()]
+    unknown = [f for f in fields if f not in allowed]
+    if unknown:
+        raise ApiError(f"알 수 없는 필드: {', '.join(unknown)}")
+    return fields
+
+
+def _paginate(qs: QuerySet, request: HttpRequest, key: Callable[[Any], Tuple], after: Callable[[QuerySet, List[Any]], QuerySet]) -> Tuple[List[Any], Optional[str]]:
+    """Runs exactly one query: the keyset filter plus ``LIMIT page_size + 1``."""
+    size = _get_page_size(request)
+    cursor = request.GET.get('cursor')
+    if cursor:
+        try:
+            qs = after(qs, decode_cursor(cursor))
+        except (IndexError, ValueError, TypeError):
+            raise ApiError("잘못된 cursor 값입니다.")
+    rows = list(qs[:size + 1])
+    next_cursor = encode_cursor(key(rows[size - 1])) if len(rows) > size else None
+    return rows[:size], next_cursor
+
+
+def _pick(row: Dict[str, Any], fields: Iterable[str]) -> Dict[str, Any]:
+    return {f: row[f] for f in fields}
+
+
+def serialize_equipment(equipment: Equipment) -> Dict[str, Any]:
+    return {'id': equipment.pk, 'name': equipment.name, 'description': equipment.description, 'capacity': equipment.capacity}
+
+
+def serialize_reservation(res: Reservation) -> Dict[str, Any]:
+    return {
+        'id': res.pk,
+        'user': res.user,
+        'equipment_id': res.equipment_id,
+        'equipment_name': res.equipment.name if res.equipment else None,
+        'room_date': res.room_date.isoformat(),
+        'room_start_time': res.room_start_time,
+        'room_finish_time': res.room_finish_time,
+        'pub_date': res.pub_date.isoformat(),
+        'updated_at': res.updated_at.isoformat(),
+    }
+
+
+def _parse_date(value: Optional[str], name: str) -> date:
+    try:
+        return datetime.strptime((value or '').strip(), "%Y-%m-%d").date()
+    except ValueError:
+        raise ApiError(f"{name}은(는) YYYY-MM-DD 형식이어야 합니다.")
+
+
+def _parse_time(value: Any, name: str) -> float:
+    try:
+        time_value = float(value)
+    except (TypeError, ValueError):
+        raise ApiError("잘못된 시간 형식입니다.")
+    if not 0 <= time_value <= 24 or time_value * 2 != int(time_value * 2):
+        raise ApiError(f"{name}은(는) 0-24 사이의 30분 단위여야 합니다.")
+    return time_value
+
+
+########################## Equipment
+@read_only
+@api_view
+@require_GET
+def equipment_list(request: HttpRequest) -> HttpResponse:
+    fields = _get_fields(request, EQUIPMENT_FIELDS)
+    rows, next_cursor = _paginate(
+        Equipment.objects.order_by('id'), request,
+        key=lambda e: (e.pk,),
+        after=lambda qs, c: qs.filter(id__gt=int(c[0])),
+    )
+    return json_response({
+        'results': [_pick(serialize_equipment(e), fields) for e in rows],
+        'next_cursor': next_cursor,
+    })
+
+
+@read_only
+@api_view
+@require_GET
+def equipment_availability(request: HttpRequest, equipment_id: int) -> HttpResponse:
+    """Booked ranges per day (a slot is full once ``capacity`` ranges overlap it). Defaults to the Monday–Friday week shown by ``new``."""
+    capacity = Equipment.objects.filter(pk=equipment_id).values_list('capacity', flat=True).first()
+    if capacity is None:
+        raise ApiError("존재하지 않는 장비입니다.", status=404)
+    if 'start' in request.GET:
+        start = _parse_date(request.GET['start'], 'start')
+        try:
+            days = int(request.GET.get('days', 5))
+        except ValueError:
+            raise ApiError("days는 정수여야 합니다.")
+        days = max(1, min(days, MAX_AVAILABILITY_DAYS))
+    else:
+        start = _get_week_start_day_and_params(datetime.now())[0].date()
+        days = 5
+    end = start + timedelta(days=days - 1)
+
+    booked: Dict[str, List[List[float]]] = {(start + timedelta(days=i)).isoformat(): [] for i in range(days)}
+    ranges = Reservation.objects.filter(
+        equipment_id=equipment_id, room_date__range=(start, end)
+    ).order_by('room_date', 'room_start_time').values_list('room_date', 'room_start_time', 'room_finish_time')
+    for room_date, start_time, finish_time in ranges:
+        booked[room_date.isoformat()].append([start_time, finish_time])
+
+    return json_response({'equipment_id': equipment_id, 'capacity': capacity, 'start': start.isoformat(), 'days': booked})
+
+
+########################## Reservations
+def _parse_change_token(request: HttpRequest) -> Optional[Tuple[int, Optional[int]]]:
+    """``(since, None)`` for a change token, ``(after, snapshot_seq)`` for a snapshot page, None without ``since``."""
+    token = request.GET.get('since')
+    if not token:
+        return None
+    try:
+        values = decode_cursor(token)
+        if len(values) == 2:
+            return int(values[0]), int(values[1])
+        return int(values[0]), None
+    except (IndexError, ValueError, TypeError):
+        raise ApiError("잘못된 since 값입니다.")
+
+
+def _serialize_change(action: str, row: Any) -> Dict[str, Any]:
+    if action == 'upsert':
+        return {'action': action, 'reservation': serialize_reservation(row)}
+    return {'action': action, 'id': row.reservation_id, 'equipment_id': row.equipment_id, 'room_date': row.room_date.isoformat()}
+
+
+@api_view
+@require_GET
+def reservation_changes(request: HttpRequest) -> HttpResponse:
+    """Reservations created, changed or deleted after ``?since=<token>``; staff see every user's.
+
+    Without ``since`` the current reservations are sent as a snapshot (only
+    upserts), paged like the changes, and its last page's ``next_token``
+    continues from the moment the snapshot started.
+    """
+    _require_user(request)
+    token = _parse_change_token(request)
+    username = None if request.user.is_staff and request.GET.get('all') == '1' else request.user.username
+    limit = _get_page_size(request)
+
+    if token is None or token[1] is not None:
+        # 전체 스냅샷: 정리된 삭제 기록과 무관하므로 만료되지 않는다
+        after, snapshot_seq = token if token else (0, current_change_seq())
+        rows, has_more = get_snapshot(username, after, limit)
+        return json_response({
+            'changes': [_serialize_change('upsert', row) for row in rows],
+            'next_token': encode_cursor([rows[-1].change_seq, snapshot_seq] if has_more else [snapshot_seq]),
+            'has_more': has_more,
+        })
+
+    since = token[0]
+    try:
+        changes, has_more = get_changes(username, since, limit)
+    except ChangesExpired:
+        raise ApiError("변경 기록이 만료되었습니다. since 없이 전체를 다시 받아주세요.", status=410, code='resync_required')
+    return json_response({
+        'changes': [_serialize_change(action, row) for _, action, row in changes],
+        'next_token': encode_cursor([changes[-1][0] if changes else since]),
+        'has_more': has_more,
+    })
+
+
+def _reservation_list(request: HttpRequest) -> HttpResponse:
+    fields = _get_fields(request, RESERVATION_FIELDS)
+    qs = Reservation.objects.filter(user=request.user.username).select_related('equipment')
+    if 'from' in request.GET:
+        qs = qs.filter(room_date__gte=_parse_date(request.GET['from'], 'from'))
+    rows, next_cursor = _paginate(
+        qs.order_by('room_date', 'room_start_time', 'id'), request,
+        key=lambda r: (r.room_date, r.room_start_time, r.pk),
+        after=reservations_after,
+    )
+    return json_response({
+        'results': [_pick(serialize_reservation(r), fields) for r in rows],
+        'next_cursor': next_cursor,
+    })
+
+
+def _reservation_create(request: HttpRequest) -> HttpResponse:
+    try:
+        payload = json.loads(request.body or b'{}') if request.content_type == 'application/json' else request.POST
+    except ValueError:
+        raise ApiError("JSON 본문을 해석할 수 없습니다.")
+    try:
+        equipment_id = int(payload.get('equipment_id'))
+    except (TypeError, ValueError):
+        raise ApiError("equipment_id가 필요합니다.")
+    reserve_date = _parse_date(payload.get('room_date'), 'room_date')
+    start_time = _parse_time(payload.get('room_start_time'), 'room_start_time')
+    finish_time = _parse_time(payload.get('room_finish_time'), 'room_finish_time')
+
+    reservation, code = _book_reservation(request.user.username, equipment_id, reserve_date, start_time, finish_time)
+    if code:
+        raise ApiError(BOOKING_ERRORS[code], status=BOOKING_ERROR_STATUS[code], code=code)
+    return json_response(serialize_reservation(reservation), status=201)
+
+
+@api_view
+@ratelimit('create', methods=('POST',))  # new.html의 예약 경로
+@require_http_methods(['GET', 'POST'])
+def reservation_list(request: HttpRequest) -> HttpResponse:
+    _require_user(request)
+    if request.method == 'POST':
+        return _reservation_create(request)
+    return _reservation_list(request)
+
+
+@api_view
+@require_POST
+def reservation_cancel(request: HttpRequest, reservation_id: int) -> HttpResponse:
+    _require_user(request)
+    # 본인 예약만 한 번의 DELETE로 취소
+    deleted, _ = Reservation.objects.filter(pk=reservation_id, user=request.user.username).delete()
+    if not deleted:
+        raise ApiError("예약을 찾을 수 없습니다.", status=404)
+    return json_response({'id': reservation_id, 'cancelled': True})
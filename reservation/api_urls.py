@@ -0,0 +1,13 @@
+from django.urls import path
+from . import api
+
+from typing import List, Union
+from django.urls.resolvers import URLPattern, URLResolver
+
+urlpatterns: List[Union[URLPattern, URLResolver]] = [
+    path('equipment', api.equipment_list, name='api_equipment_list'),
+    path('equipment/<int:equipment_id>/availability', api.equipment_availability, name='api_equipment_availability'),
+    path('reservations', api.reservation_list, name='api_reservation_list'),
+    path('reservations/changes', api.reservation_changes, name='api_reservation_changes'),
+    path('reservations/<int:reservation_id>/cancel', api.reservation_cancel, name='api_reservation_cancel'),
+]
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class ReservationConfig(AppConfig):
     name = 'reservation'
+
+    def ready(self) -> None:
+        from . import signals  # noqa: F401
+        from mysite import slow_queries  # noqa: F401  (installs the execute wrapper)
@@ -0,0 +1,299 @@
+"""
+Cached reads shared by ``new``, ``home`` and ``/healthz``.
+
+The ``a``-prefixed variants use the async cache and ORM APIs for the async
+views served under ASGI; both read and write the same entries.
+
+Entries are invalidated from the model signals in ``signals.py`` once the
+writing transaction commits. A fill reads and then writes, so a fill that read
+before the commit could store its stale rows after a plain delete; the weekly
+availability key therefore carries a generation counter that invalidation
+``incr``s, and a late fill writes under a generation nobody reads any more.
+The invalidation only reaches other gunicorn
+workers through a shared cache (``DJANGO_REDIS_URL``); with the per-process
+default cache ``settings.RESERVATION_CACHE_TIMEOUT`` is a few seconds instead
+of an hour. Fills always read the primary: a lagging replica must not put
+stale availability back into the cache right after an invalidation.
+
+The ``home`` payload goes through ``TwoTierCache``: a small in-process LRU in
+front of the shared cache, with single-flight rebuilds and
+stale-while-revalidate so an expiry never sends every worker to the database.
+"""
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import QuerySet
+
+from .models import Equipment, Reservation
+from .slots import full_slots_mask, slot_counts
+
+EQUIPMENT_LIST_KEY = 'reservation:equipment_list'
+CACHE_TIMEOUT = settings.RESERVATION_CACHE_TIMEOUT
+HOME_KEY = 'reservation:home'
+
+
+def _generation_key(equipment_id: int, week_start: date) -> str:
+    return f'reservation:availability_gen:{equipment_id}:{week_start.isoformat()}'
+
+
+def _availability_key(equipment_id: int, week_start: date, generation: int) -> str:
+    return f'reservation:availability:{equipment_id}:{week_start.isoformat()}:{generation}'
+
+
+def _new_generation() -> int:
+    # 세대 키가 만료·삭제된 뒤에도 이전 세대와 겹치지 않도록 시각에서 시작
+    return time.time_ns()
+
+
+def _generation(equipment_id: int, week_start: date) -> int:
+    key = _generation_key(equipment_id, week_start)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, _new_generation(), CACHE_TIMEOUT)
+        generation = cache.get(key, 0)
+    return generation
+
+
+async def _ageneration(equipment_id: int, week_start: date) -> int:
+    key = _generation_key(equipment_id, week_start)
+    generation = await cache.aget(key)
+    if generation is None:
+        await cache.aadd(key, _new_generation(), CACHE_TIMEOUT)
+        generation = await cache.aget(key, 0)
+    return generation
+
+
+def _bump_generation(equipment_id: int, week_start: date) -> None:
+    key = _generation_key(equipment_id, week_start)
+    try:
+        cache.incr(key)
+    except ValueError:  # 세대 키가 없으면 채우는 중인 요청이 읽은 세대와 다른 새 세대로
+        cache.add(key, _new_generation(), CACHE_TIMEOUT)
+
+
+def _week_start(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+
+def get_equipment_list() -> List[Equipment]:
+    return cache.get_or_set(EQUIPMENT_LIST_KEY, lambda: list(Equipment.objects.using('default').all()), CACHE_TIMEOUT)
+
+
+async def aget_equipment_list() -> List[Equipment]:
+    equipments = await cache.aget(EQUIPMENT_LIST_KEY)
+    if equipments is None:
+        equipments = [e async for e in Equipment.objects.using('default').all()]
+        await cache.aset(EQUIPMENT_LIST_KEY, equipments, CACHE_TIMEOUT)
+    return equipments
+
+
+def invalidate_equipment_list() -> None:
+    transaction.on_commit(lambda: cache.delete(EQUIPMENT_LIST_KEY))
+
+
+def _capacity_of(equipments: List[Equipment], equipment_id: int) -> int:
+    try:
+        equipment_id = int(equipment_id)
+    except (TypeError, ValueError):
+        return 1
+    for equipment in equipments:
+        if equipment.pk == equipment_id:
+            return equipment.capacity
+    return 1
+
+
+def get_capacity(equipment_id: int) -> int:
+    """Units of the equipment, from the cached equipment list (1 if unknown)."""
+    return _capacity_of(get_equipment_list(), equipment_id)
+
+
+async def aget_capacity(equipment_id: int) -> int:
+    return _capacity_of(await aget_equipment_list(), equipment_id)
+
+
+def _week_rows(equipment_id: int, week_start: date) -> QuerySet:
+    return Reservation.objects.using('default').filter(
+        equipment_id=equipment_id, room_date__range=(week_start, week_start + timedelta(days=4))
+    ).values_list('room_date', 'room_start_time', 'room_finish_time')
+
+
+def _count_week(rows: Iterable[Tuple[date, float, float]], week_start: date) -> List[List[int]]:
+    intervals: List[List[Tuple[float, float]]] = [[] for _ in range(5)]
+    for room_date, start_time, finish_time in rows:
+        intervals[(room_date - week_start).days].append((start_time, finish_time))
+    return [slot_counts(day) for day in intervals]
+
+
+def get_week_slot_counts(equipment_id: int, week_start: date) -> List[List[int]]:
+    """Concurrent bookings per half-hour slot for Monday–Friday of the week starting at ``week_start``."""
+    # 세대는 행을 읽기 전에 고정: 읽는 동안 무효화되면 이 값은 아무도 읽지 않는 키에 저장됨
+    key = _availability_key(equipment_id, week_start, _generation(equipment_id, week_start))
+    counts = cache.get(key)
+    if counts is None:
+        counts = _count_week(_week_rows(equipment_id, week_start), week_start)
+        cache.set(key, counts, CACHE_TIMEOUT)
+    return counts
+
+
+async def aget_week_slot_counts(equipment_id: int, week_start: date) -> List[List[int]]:
+    key = _availability_key(equipment_id, week_start, await _ageneration(equipment_id, week_start))
+    counts = await cache.aget(key)
+    if counts is None:
+        counts = _count_week([row async for row in _week_rows(equipment_id, week_start)], week_start)
+        await cache.aset(key, counts, CACHE_TIMEOUT)
+    return counts
+
+
+def get_week_availability(equipment_id: int, week_start: date) -> List[int]:
+    """Bitmasks of the fully booked slots for Monday–Friday of the week starting at ``week_start``."""
+    # 수량은 캐시 키에 넣지 않는다: 관리자가 수량을 바꿔도 슬롯별 예약 수는 그대로 유효
+    capacity = get_capacity(equipment_id)
+    return [full_slots_mask(day, capacity) for day in get_week_slot_counts(equipment_id, week_start)]
+
+
+async def aget_week_availability(equipment_id: int, week_start: date) -> List[int]:
+    """``get_week_availability`` for async views: async cache and ORM calls only."""
+    capacity = await aget_capacity(equipment_id)
+    return [full_slots_mask(day, capacity) for day in await aget_week_slot_counts(equipment_id, week_start)]
+
+
+def as_room_date(value) -> date:
+    """Normalises ``Reservation.room_date`` as seen in signals (str, datetime or date)."""
+    value = Reservation._meta.get_field('room_date').to_python(value)
+    return value.date() if isinstance(value, datetime) else value
+
+
+def invalidate_availability(equipment_id: int, room_date: date) -> None:
+    if equipment_id is None:
+        return
+    week_start = _week_start(as_room_date(room_date))
+    transaction.on_commit(lambda: _bump_generation(equipment_id, week_start))
+
+
+def invalidate_availability_weeks(equipment_id: int, week_starts: Iterable[date]) -> None:
+    week_starts = list(week_starts)
+
+    def bump() -> None:
+        for week_start in week_starts:
+            _bump_generation(equipment_id, week_start)
+    transaction.on_commit(bump)
+
+
+class TwoTierCache:
+    """In-process LRU over the shared cache with single-flight, stale-while-revalidate rebuilds.
+
+    A shared entry is fresh for ``fresh`` seconds and then served stale for up
+    to ``stale`` more while exactly one caller (holder of a ``cache.add`` lock)
+    rebuilds it. ``expire`` marks an entry stale everywhere without deleting
+    it; the local tier is only trusted for ``local_ttl`` seconds so other
+    processes notice within that time.
+    """
+
+    def __init__(self, maxsize: int = 32, local_ttl: float = 5, fresh: float = 60, stale: float = 600, lock_timeout: float = 10) -> None:
+        self.maxsize = maxsize
+        self.local_ttl = local_ttl
+        self.fresh = fresh
+        self.stale = stale
+        self.lock_timeout = lock_timeout
+        self._local: 'OrderedDict[str, Tuple[float, Any]]' = OrderedDict()
+        self._local_lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+
+    def _local_get(self, key: str) -> Tuple[bool, Any]:
+        with self._local_lock:
+            entry = self._local.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                return False, None
+            self._local.move_to_end(key)
+            return True, entry[1]
+
+    def _local_put(self, key: str, value: Any) -> None:
+        with self._local_lock:
+            self._local[key] = (time.monotonic() + self.local_ttl, value)
+            self._local.move_to_end(key)
+            while len(self._local) > self.maxsize:
+                self._local.popitem(last=False)
+
+    def _shared_get(self, key: str) -> Tuple[Any, bool]:
+        """Returns (envelope or None, is_fresh)."""
+        found = cache.get_many([key, f'{key}:expired_at'])
+        envelope = found.get(key)
+        if envelope is None:
+            return None, False
+        fresh = envelope['built_at'] + self.fresh > time.time() and envelope['built_at'] > found.get(f'{key}:expired_at', 0)
+        return envelope, fresh
+
+    def _rebuild(self, key: str, build: Callable[[], Any]) -> Any:
+        built_at = time.time()  # 빌드 중에 expire되면 다음 조회에서 다시 오래된 것으로 판단
+        value = build()
+        cache.set(key, {'built_at': built_at, 'value': value}, self.fresh + self.stale)
+        self._local_put(key, value)
+        return value
+
+    def _try_rebuild(self, key: str, build: Callable[[], Any]) -> Tuple[bool, Any]:
+        if not cache.add(f'{key}:lock', 1, self.lock_timeout):
+            return False, None
+        try:
+            return True, self._rebuild(key, build)
+        finally:
+            cache.delete(f'{key}:lock')
+
+    def get_or_build(self, key: str, build: Callable[[], Any]) -> Any:
+        hit, value = self._local_get(key)
+        if hit:
+            return value
+        envelope, fresh = self._shared_get(key)
+        if fresh:
+            self._local_put(key, envelope['value'])
+            return envelope['value']
+        if envelope is not None:
+            # 오래된 값: 한 호출만 다시 만들고 나머지는 기존 값을 바로 돌려받음
+            rebuilt, value = self._try_rebuild(key, build)
+            return value if rebuilt else envelope['value']
+
+        # 값이 아예 없음: 프로세스 안에서는 스레드 락, 프로세스 사이에서는 캐시 락으로 한 번만 생성
+        with self._local_lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            hit, value = self._local_get(key)
+            if hit:
+                return value
+            deadline = time.monotonic() + self.lock_timeout
+            while True:
+                envelope, _ = self._shared_get(key)
+                if envelope is not None:
+                    self._local_put(key, envelope['value'])
+                    return envelope['value']
+                rebuilt, value = self._try_rebuild(key, build)
+                if rebuilt:
+                    return value
+                if time.monotonic() > deadline:  # 락을 잡은 프로세스가 죽은 경우
+                    return self._rebuild(key, build)
+                time.sleep(0.05)
+
+    def clear_local(self) -> None:
+        with self._local_lock:
+            self._local.clear()
+
+    def expire(self, key: str) -> None:
+        cache.set(f'{key}:expired_at', time.time(), self.fresh + self.stale)
+        with self._local_lock:
+            self._local.pop(key, None)
+
+
+home_cache = TwoTierCache(fresh=min(60, CACHE_TIMEOUT))
+
+
+def home_key(today: date) -> str:
+    return f'{HOME_KEY}:{today.isoformat()}'
+
+
+def expire_home() -> None:
+    """Marks today's home payload stale (it keeps being served until the rebuild finishes)."""
+    transaction.on_commit(lambda: home_cache.expire(home_key(date.today())))
@@ -0,0 +1,100 @@
+"""
+Staff bulk cancellation (e.g. when a piece of equipment breaks).
+
+``bulk_cancel`` removes every booking of one equipment that overlaps a
+date/time range in a single locked transaction, with set-based statements
+only: one SELECT of the affected rows, one batched INSERT of tombstones, a
+batched ``DELETE ... WHERE id IN`` of exactly those rows, one rollup refresh
+over the range and, after commit, one ``delete_many`` of the availability
+weeks. The per-row ``Reservation`` signals are bypassed on purpose (a plain
+``QuerySet.delete()`` would load every row to send them); their work is done
+here once for the whole range. The waitlist is
+not promoted either: the equipment is out of service for that range.
+
+Affected users get one ``Notification`` each, written in the same
+transaction and shown on their ``myreservation`` page. Where email is
+configured, ``python manage.py send_notifications`` also mails them later so
+the request never waits on SMTP.
+"""
+from collections import defaultdict
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from django.db import connections, router, transaction
+from django.db.models import F
+
+from .caches import _week_start, expire_home, invalidate_availability_weeks
+from .changes import reserve_change_seqs
+from .events import notify_availability
+from .models import Equipment, Notification, Reservation, ReservationTombstone
+from .utilization import refresh_rollup_range
+
+BATCH_SIZE = 500
+
+
+def _format_time(value: float) -> str:
+    return f"{int(value):02d}:{int(round(value % 1 * 60)):02d}"
+
+
+def _notification_message(equipment_name: str, bookings: List[Tuple[date, float, float]], reason: str) -> str:
+    lines = [f"다음 {equipment_name} 예약이 관리자에 의해 취소되었습니다."]
+    lines += [f"- {room_date:%Y-%m-%d} {_format_time(start)}~{_format_time(finish)}" for room_date, start, finish in bookings]
+    if reason:
+        lines.append(f"사유: {reason}")
+    return '\n'.join(lines)
+
+
+def _delete_rows(ids: List[int]) -> None:
+    # QuerySet.delete()는 신호 때문에 행마다 객체를 불러오므로, 잠금 안에서 읽은 id만 SQL로 지운다
+    connection = connections[router.db_for_write(Reservation)]
+    table, pk = (connection.ops.quote_name(name) for name in (Reservation._meta.db_table, Reservation._meta.pk.column))
+    with connection.cursor() as cursor:
+        for i in range(0, len(ids), BATCH_SIZE):
+            batch = ids[i:i + BATCH_SIZE]
+            cursor.execute(f"DELETE FROM {table} WHERE {pk} IN ({', '.join(['%s'] * len(batch))})", batch)
+
+
+def bulk_cancel(equipment_id: int, start_date: date, end_date: date, start_time: Optional[float] = None, finish_time: Optional[float] = None, reason: str = '') -> int:
+    """Cancels the bookings of ``equipment_id`` overlapping [start_date, end_date] x [start_time, finish_time).
+
+    Without times whole days are cancelled. Returns the number of bookings
+    deleted; raises ``Equipment.DoesNotExist`` for an unknown equipment.
+    """
+    qs = Reservation.objects.filter(equipment_id=equipment_id, room_date__range=(start_date, end_date))
+    if start_time is not None:
+        qs = qs.filter(room_finish_time__gt=start_time)
+    if finish_time is not None:
+        qs = qs.filter(room_start_time__lt=finish_time)
+
+    with transaction.atomic():
+        # create/update와 같은 장비 잠금: 취소 도중 새 예약이 끼어들지 않는다
+        if not Equipment.objects.filter(pk=equipment_id).update(name=F('name')):
+            raise Equipment.DoesNotExist()
+        rows = list(qs.order_by('room_date', 'room_start_time', 'id').values_list('id', 'user', 'room_date', 'room_start_time', 'room_finish_time'))
+        if not rows:
+            return 0
+
+        seqs = reserve_change_seqs(len(rows))
+        ReservationTombstone.objects.bulk_create([
+            ReservationTombstone(reservation_id=pk, user=user, equipment_id=equipment_id, room_date=room_date, change_seq=seq)
+            for (pk, user, room_date, _, _), seq in zip(rows, seqs)
+        ], batch_size=BATCH_SIZE)
+        _delete_rows([pk for pk, _, _, _, _ in rows])
+
+        dates = sorted({room_date for _, _, room_date, _, _ in rows})
+        refresh_rollup_range(equipment_id, dates[0], dates[-1])
+        weeks = sorted({_week_start(room_date) for room_date in dates})
+        invalidate_availability_weeks(equipment_id, weeks)
+        for week_start in weeks:
+            notify_availability(equipment_id, week_start)
+        expire_home()
+
+        by_user: Dict[str, List[Tuple[date, float, float]]] = defaultdict(list)
+        for _, user, room_date, start, finish in rows:
+            by_user[user].append((room_date, start, finish))
+        equipment_name = Equipment.objects.values_list('name', flat=True).get(pk=equipment_id)
+        Notification.objects.bulk_create([
+            Notification(user=user, subject=f"[장비 예약] {equipment_name} 예약 {len(bookings)}건 취소 안내", message=_notification_message(equipment_name, bookings, reason))
+            for user, bookings in by_user.items()
+        ], batch_size=BATCH_SIZE)
+    return len(rows)
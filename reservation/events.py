@@ -0,0 +1,163 @@
+"""
+Server-Sent Events push of booking-grid changes (``/reservation/events/<id>``).
+
+``Reservation`` signals publish the new week bitmasks (see ``slots.py``) to an
+in-process broker once the transaction commits; every open stream for that
+equipment receives them. The stream is a plain ASGI app mounted in
+``mysite/asgi.py`` in front of Django, so an idle connection costs one
+coroutine and one queue rather than a worker thread.
+
+On connect (and on every automatic reconnect) the stream first sends the
+current bitmasks of the ``?week_start=`` week, read with the async cache and
+ORM, so a client never has to poll to catch up on changes it missed.
+
+The broker lives in the server process: run a single ASGI process (e.g.
+``uvicorn mysite.asgi:application``) or events from other processes are missed.
+Under WSGI the route does not exist and the page only refreshes after its own
+bookings.
+"""
+import asyncio
+import re
+import threading
+from datetime import date
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections, transaction
+
+from mysite.responses import dumps
+from .caches import _week_start, aget_equipment_list, aget_week_availability, as_room_date, get_week_availability
+from .slots import week_payload
+
+EVENTS_PATH = re.compile(r'^/reservation/events/(?P<equipment_id>\d+)$')
+HEARTBEAT_SECONDS = 20
+RETRY_MILLISECONDS = 5000
+QUEUE_SIZE = 8
+
+
+class AvailabilityBroker:
+    """Fan-out of events to asyncio queues; ``publish`` may be called from any thread."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._subscribers: Dict[int, Set[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+
+    def subscribe(self, equipment_id: int) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.setdefault(equipment_id, set()).add((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, equipment_id: int, queue: asyncio.Queue) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(equipment_id, set())
+            subscribers.difference_update({s for s in subscribers if s[1] is queue})
+            if not subscribers:
+                self._subscribers.pop(equipment_id, None)
+
+    def subscriber_count(self, equipment_id: int) -> int:
+        with self._lock:
+            return len(self._subscribers.get(equipment_id, ()))
+
+    def publish(self, equipment_id: int, event: bytes) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get(equipment_id, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(_offer, queue, event)
+            except RuntimeError:  # loop already closed
+                pass
+
+
+def _offer(queue: asyncio.Queue, event: bytes) -> None:
+    # 느린 클라이언트는 오래된 이벤트를 버린다 (최신 주간표만 의미가 있음)
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(event)
+
+
+broker = AvailabilityBroker()
+
+
+def format_event(name: str, data: Any) -> bytes:
+    return b'event: ' + name.encode() + b'\ndata: ' + dumps(data) + b'\n\n'
+
+
+def _publish_week(equipment_id: int, room_date: date) -> None:
+    if not broker.subscriber_count(equipment_id):
+        return
+    week_start = _week_start(room_date)
+    masks = get_week_availability(equipment_id, week_start)
+    broker.publish(equipment_id, format_event('availability', week_payload(equipment_id, week_start, None, masks)))
+
+
+def notify_availability(equipment_id: Optional[int], room_date: date) -> None:
+    """Called from the ``Reservation`` signals; sends nothing if the transaction rolls back."""
+    if equipment_id is None:
+        return
+    room_date = as_room_date(room_date)
+    transaction.on_commit(lambda: _publish_week(equipment_id, room_date))
+
+
+async def _wait_for_disconnect(receive: Callable) -> None:
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+def _requested_week(scope: Dict[str, Any]) -> Optional[date]:
+    """Monday given as ``?week_start=YYYY-MM-DD`` (the week the page shows), or None."""
+    values = parse_qs(scope.get('query_string', b'').decode('latin-1')).get('week_start')
+    try:
+        week_start = date.fromisoformat(values[0]) if values else None
+    except ValueError:
+        return None
+    return week_start if week_start and week_start.weekday() == 0 else None
+
+
+async def _snapshot(equipment_id: int, week_start: date) -> bytes:
+    # 구독 후에 읽으므로 연결 중에 바뀐 내용은 이어지는 이벤트로 전달된다
+    try:
+        masks = await aget_week_availability(equipment_id, week_start)
+    finally:
+        # Django 요청 밖이므로 요청 종료 시 하던 연결 정리를 직접 한다
+        await sync_to_async(close_old_connections)()
+    return format_event('availability', week_payload(equipment_id, week_start, None, masks))
+
+
+async def events_app(scope: Dict[str, Any], receive: Callable, send: Callable, equipment_id: int) -> None:
+    if not any(e.pk == equipment_id for e in await aget_equipment_list()):
+        await send({'type': 'http.response.start', 'status': 404, 'headers': [(b'content-type', b'text/plain; charset=utf-8')]})
+        await send({'type': 'http.response.body', 'body': b'Not Found'})
+        return
+    queue = broker.subscribe(equipment_id)
+    disconnected = asyncio.ensure_future(_wait_for_disconnect(receive))
+    try:
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', b'text/event-stream; charset=utf-8'),
+                (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no'),
+            ],
+        })
+        await send({'type': 'http.response.body', 'body': b'retry: %d\n\n' % RETRY_MILLISECONDS, 'more_body': True})
+        week_start = _requested_week(scope)
+        if week_start is not None:
+            await send({'type': 'http.response.body', 'body': await _snapshot(equipment_id, week_start), 'more_body': True})
+        while True:
+            next_event = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait({next_event, disconnected}, timeout=HEARTBEAT_SECONDS, return_when=asyncio.FIRST_COMPLETED)
+            if disconnected in done:
+                next_event.cancel()
+                break
+            if next_event in done:
+                body = next_event.result()
+            else:
+                next_event.cancel()
+                body = b': keep-alive\n\n'  # 프록시가 유휴 연결을 끊지 않도록
+            await send({'type': 'http.response.body', 'body': body, 'more_body': True})
+    finally:
+        broker.unsubscribe(equipment_id, queue)
+        disconnected.cancel()
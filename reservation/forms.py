@@ -1,8 +1,33 @@
 from django import forms
-from .models import Blog
+from .models import Blog, Equipment
 
 # 만약 모델 기반이 아니라면 forms.Form
 class BlogPost(forms.ModelForm):
     class Meta:
         model = Blog
-        fields = ['title' , 'description']
\ No newline at end of file
+        fields = ['title' , 'description']
+
+# 관리자 일괄 취소 (장비 고장 등)
+TIME_CHOICES = [('', '하루 전체')] + [(str(t / 2), f"{int(t // 2):02d}:{int(t % 2 * 30):02d}") for t in range(18, 43)]
+
+class BulkCancelForm(forms.Form):
+    equipment = forms.ModelChoiceField(queryset=Equipment.objects.order_by('name'), label="장비")
+    start_date = forms.DateField(label="시작 날짜", widget=forms.DateInput(attrs={'type': 'date'}))
+    end_date = forms.DateField(label="종료 날짜", widget=forms.DateInput(attrs={'type': 'date'}))
+    start_time = forms.TypedChoiceField(choices=TIME_CHOICES, coerce=float, empty_value=None, required=False, label="시작 시간")
+    finish_time = forms.TypedChoiceField(choices=TIME_CHOICES, coerce=float, empty_value=None, required=False, label="종료 시간")
+    reason = forms.CharField(max_length=200, required=False, label="취소 사유")
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        for field in self.fields.values():
+            field.widget.attrs['class'] = 'form-select' if isinstance(field.widget, forms.Select) else 'form-control'
+
+    def clean(self) -> dict:
+        data = super().clean()
+        if data.get('start_date') and data.get('end_date') and data['start_date'] > data['end_date']:
+            raise forms.ValidationError("종료 날짜가 시작 날짜보다 빠릅니다.")
+        start_time, finish_time = data.get('start_time'), data.get('finish_time')
+        if start_time is not None and finish_time is not None and start_time >= finish_time:
+            raise forms.ValidationError("종료 시간은 시작 시간보다 늦어야 합니다.")
+        return data
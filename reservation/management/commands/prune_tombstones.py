@@ -0,0 +1,18 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from reservation.changes import prune_tombstones
+
+
+class Command(BaseCommand):
+    help = "Deletes reservation tombstones older than the retention period; older sync tokens then need a full resync."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument('--days', type=int, default=getattr(settings, 'TOMBSTONE_RETENTION_DAYS', 90))
+
+    def handle(self, *args, **options) -> None:
+        deleted = prune_tombstones(timezone.now() - timedelta(days=options['days']))
+        self.stdout.write(self.style.SUCCESS(f"{deleted} tombstones deleted"))
@@ -0,0 +1,13 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from reservation.waitlist import prune_waitlist
+
+
+class Command(BaseCommand):
+    help = "Deletes waitlist entries whose date has passed."
+
+    def handle(self, *args, **options) -> None:
+        deleted = prune_waitlist(date.today())
+        self.stdout.write(self.style.SUCCESS(f"{deleted} waitlist entries deleted"))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from reservation.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the full-text search index of notices and lost items."
+
+    def handle(self, *args, **options) -> None:
+        rows = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"{rows} posts indexed"))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from reservation.utilization import rebuild_rollup
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the utilization rollup table from all reservations."
+
+    def handle(self, *args, **options) -> None:
+        rows = rebuild_rollup()
+        self.stdout.write(self.style.SUCCESS(f"{rows} rollup rows written"))
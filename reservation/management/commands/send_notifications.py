@@ -0,0 +1,31 @@
+from django.contrib.auth.models import User
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from reservation.models import Notification
+
+
+class Command(BaseCommand):
+    help = "Emails the pending notifications in the outbox and marks them as sent."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument('--batch-size', type=int, default=100)
+
+    def handle(self, *args, **options) -> None:
+        sent = skipped = 0
+        last_id = 0
+        with get_connection() as connection:
+            while True:
+                batch = list(Notification.objects.filter(sent_at__isnull=True, id__gt=last_id).order_by('id')[:options['batch_size']])
+                if not batch:
+                    break
+                last_id = batch[-1].pk
+                emails = dict(User.objects.filter(username__in={n.user for n in batch}).exclude(email='').values_list('username', 'email'))
+                messages = [EmailMessage(n.subject, n.message, to=[emails[n.user]], connection=connection) for n in batch if n.user in emails]
+                connection.send_messages(messages)
+                # 이메일이 없는 사용자의 알림도 발송 처리해 매번 다시 읽지 않도록
+                Notification.objects.filter(pk__in=[n.pk for n in batch]).update(sent_at=timezone.now())
+                sent += len(messages)
+                skipped += len(batch) - len(messages)
+        self.stdout.write(self.style.SUCCESS(f"{sent} notifications sent, {skipped} skipped (no email)"))
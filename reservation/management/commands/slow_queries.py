@@ -0,0 +1,68 @@
+import json
+import os
+from typing import Any, Dict, List
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+def _log_files(path: str) -> List[str]:
+    # RotatingFileHandler 백업(.1, .2, ...)까지 읽는다
+    files = [path] if os.path.exists(path) else []
+    index = 1
+    while os.path.exists(f'{path}.{index}'):
+        files.append(f'{path}.{index}')
+        index += 1
+    return files
+
+
+def aggregate(paths: List[str]) -> List[Dict[str, Any]]:
+    groups: Dict[str, Dict[str, Any]] = {}
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                group = groups.setdefault(entry['fingerprint'], {
+                    'fingerprint': entry['fingerprint'], 'sql': entry['sql'], 'count': 0,
+                    'total_ms': 0.0, 'max_ms': 0.0, 'views': set(), 'callers': set(), 'plan': None,
+                })
+                group['count'] += 1
+                group['total_ms'] += entry['duration_ms']
+                if entry['duration_ms'] >= group['max_ms']:
+                    group['max_ms'] = entry['duration_ms']
+                    group['plan'] = entry.get('plan') or group['plan']
+                group['views'].update(v for v in [entry.get('view')] if v)
+                group['callers'].update(c for c in [entry.get('caller')] if c)
+    return list(groups.values())
+
+
+class Command(BaseCommand):
+    help = "Prints the slowest query fingerprints from the slow-query log."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument('--log', default=None, help="log file (default: settings.SLOW_QUERY_LOG)")
+        parser.add_argument('--top', type=int, default=10)
+        parser.add_argument('--sort', choices=('total', 'count', 'max'), default='total')
+
+    def handle(self, *args, **options) -> None:
+        path = options['log'] or settings.SLOW_QUERY_LOG
+        paths = _log_files(path)
+        if not paths:
+            raise CommandError(f"{path} not found")
+        key = {'total': 'total_ms', 'count': 'count', 'max': 'max_ms'}[options['sort']]
+        groups = sorted(aggregate(paths), key=lambda g: g[key], reverse=True)[:options['top']]
+        for rank, group in enumerate(groups, 1):
+            self.stdout.write(self.style.WARNING(
+                f"#{rank} {group['fingerprint']}  {group['count']} calls, total {group['total_ms']:.1f} ms, "
+                f"avg {group['total_ms'] / group['count']:.1f} ms, max {group['max_ms']:.1f} ms"
+            ))
+            self.stdout.write(f"  {group['sql']}")
+            if group['views']:
+                self.stdout.write(f"  views: {', '.join(sorted(group['views']))}")
+            if group['callers']:
+                self.stdout.write(f"  callers: {', '.join(sorted(group['callers']))}")
+            for line in group['plan'] or []:
+                self.stdout.write(f"    {line}")
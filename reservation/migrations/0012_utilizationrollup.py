@@ -0,0 +1,28 @@
+# Generated by Django 6.0.3 on 2026-10-20 00:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservation', '0011_equipment_remove_reservation_room_type_alter_blog_id_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UtilizationRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('room_date', models.DateField(verbose_name='날짜')),
+                ('hour', models.SmallIntegerField(verbose_name='시간대 (0-23)')),
+                ('booked_slots', models.SmallIntegerField(default=0, verbose_name='예약된 30분 슬롯 수')),
+                ('equipment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='reservation.equipment', verbose_name='장비')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['room_date', 'equipment'], name='rollup_date_equipment_idx')],
+                'constraints': [models.UniqueConstraint(fields=('equipment', 'room_date', 'hour'), name='unique_rollup_slot')],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0.3 on 2026-10-20 00:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservation', '0012_utilizationrollup'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['user', 'room_date', 'room_start_time', 'id'], name='reservation_user_history_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# FTS5 index for reservation.search (SQLite only)
+
+import html
+
+from django.db import migrations
+from django.utils.html import strip_tags
+
+
+def create_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    Blog = apps.get_model('reservation', 'Blog')
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS reservation_blog_fts "
+        "USING fts5(title, body, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    )
+    for pk, title, description in Blog.objects.values_list('pk', 'title', 'description'):
+        schema_editor.execute(
+            "INSERT INTO reservation_blog_fts (rowid, title, body) VALUES (%s, %s, %s)",
+            [pk, title, html.unescape(strip_tags(description or '')).strip()],
+        )
+
+
+def drop_fts(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS reservation_blog_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservation', '0013_reservation_user_history_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts, drop_fts),
+    ]
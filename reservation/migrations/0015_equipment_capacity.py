@@ -0,0 +1,18 @@
+# Generated by Django 6.0.3 on 2026-10-20 01:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservation', '0014_blog_fts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='equipment',
+            name='capacity',
+            field=models.PositiveSmallIntegerField(default=1, verbose_name='동일 장비 수량'),
+        ),
+    ]
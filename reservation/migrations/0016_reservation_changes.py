@@ -0,0 +1,62 @@
+# Generated by Django 6.0.3 on 2026-10-20 01:10
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F, Max
+
+
+def backfill_change_seq(apps, schema_editor):
+    # 기존 예약은 id 순서를 변경 순번으로, 생성 시각을 수정 시각으로 사용
+    Reservation = apps.get_model('reservation', 'Reservation')
+    ChangeSequence = apps.get_model('reservation', 'ChangeSequence')
+    Reservation.objects.update(change_seq=F('id'), updated_at=F('pub_date'))
+    ChangeSequence.objects.create(pk=1, value=Reservation.objects.aggregate(m=Max('id'))['m'] or 0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservation', '0015_equipment_capacity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.BigIntegerField(default=0)),
+                ('pruned_through', models.BigIntegerField(default=0, verbose_name='삭제 기록을 정리한 마지막 순번')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ReservationTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reservation_id', models.IntegerField(verbose_name='삭제된 예약 ID')),
+                ('user', models.CharField(max_length=10, verbose_name='예약자 학번/이름')),
+                ('equipment_id', models.IntegerField(null=True, verbose_name='장비 ID')),
+                ('room_date', models.DateField(verbose_name='예약 날짜')),
+                ('change_seq', models.BigIntegerField(unique=True, verbose_name='변경 순번')),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='삭제 일시')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='reservation',
+            name='change_seq',
+            field=models.BigIntegerField(db_index=True, default=0, verbose_name='변경 순번'),
+        ),
+        migrations.AddField(
+            model_name='reservation',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='수정 일시'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['user', 'change_seq'], name='reservation_user_changes_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservationtombstone',
+            index=models.Index(fields=['user', 'change_seq'], name='tombstone_user_changes_idx'),
+        ),
+        migrations.RunPython(backfill_change_seq, migrations.RunPython.noop),
+    ]
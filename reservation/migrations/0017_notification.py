@@ -0,0 +1,28 @@
+# Generated by Django 6.0.3 on 2026-10-20 01:13
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservation', '0016_reservation_changes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user', models.CharField(max_length=10, verbose_name='받는 사람 학번/이름')),
+                ('subject', models.CharField(max_length=200, verbose_name='제목')),
+                ('message', models.TextField(verbose_name='내용')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='생성 일시')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='발송 일시')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['sent_at', 'id'], name='notification_outbox_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 6.0.3 on 2026-10-20 02:05
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservation', '0017_notification'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WaitlistEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user', models.CharField(max_length=10, verbose_name='대기자 학번/이름')),
+                ('room_date', models.DateField(verbose_name='예약 날짜')),
+                ('room_start_time', models.FloatField(verbose_name='시작 시간 (0-24)')),
+                ('room_finish_time', models.FloatField(verbose_name='종료 시간 (0-24)')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='신청 일시')),
+                ('equipment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='reservation.equipment', verbose_name='장비')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['equipment', 'room_date', 'created_at'], name='waitlist_slot_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'equipment', 'room_date', 'room_start_time', 'room_finish_time'), name='unique_waitlist_entry')],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 6.0.3 on 2026-10-20 02:20
+
+import django.core.validators
+from django.db import migrations, models
+
+
+def fix_zero_capacity(apps, schema_editor):
+    Equipment = apps.get_model('reservation', 'Equipment')
+    Equipment.objects.filter(capacity__lt=1).update(capacity=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservation', '0018_waitlist'),
+    ]
+
+    operations = [
+        migrations.RunPython(fix_zero_capacity, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='equipment',
+            name='capacity',
+            field=models.PositiveSmallIntegerField(default=1, validators=[django.core.validators.MinValueValidator(1)], verbose_name='동일 장비 수량'),
+        ),
+        migrations.AddConstraint(
+            model_name='equipment',
+            constraint=models.CheckConstraint(condition=models.Q(('capacity__gte', 1)), name='equipment_capacity_gte_1'),
+        ),
+    ]
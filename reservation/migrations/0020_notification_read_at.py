@@ -0,0 +1,22 @@
+# Generated by Django 6.0.3 on 2026-10-20 03:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservation', '0019_equipment_capacity_min'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='read_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='확인 일시'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', 'read_at'], name='notification_unread_idx'),
+        ),
+    ]
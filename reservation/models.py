@@ -1,11 +1,19 @@
-from django.db import models
+from django.core.validators import MinValueValidator
+from django.db import models, transaction
 from django.utils import timezone
 from ckeditor_uploader.fields import RichTextUploadingField
 
 class Equipment(models.Model):
     name = models.CharField(max_length=50, verbose_name="장비 이름")
     description = models.TextField(blank=True, verbose_name="장비 설명")
-    
+    capacity = models.PositiveSmallIntegerField(default=1, validators=[MinValueValidator(1)], verbose_name="동일 장비 수량")
+
+    class Meta:
+        constraints = [
+            # 0대이면 모든 예약이 거절되고 이용률 계산이 0으로 나누게 된다
+            models.CheckConstraint(condition=models.Q(capacity__gte=1), name='equipment_capacity_gte_1'),
+        ]
+
     def __str__(self) -> str:
         return self.name
 
@@ -16,10 +24,48 @@ class Reservation(models.Model):
     room_start_time = models.FloatField(verbose_name="시작 시간 (0-24)")
     room_finish_time = models.FloatField(verbose_name="종료 시간 (0-24)")
     pub_date = models.DateTimeField(default=timezone.now, verbose_name="작성 일시")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="수정 일시")
+    change_seq = models.BigIntegerField(default=0, db_index=True, verbose_name="변경 순번")
+
+    class Meta:
+        indexes = [
+            # 내 예약 목록의 keyset 페이지네이션 순서와 동일
+            models.Index(fields=['user', 'room_date', 'room_start_time', 'id'], name='reservation_user_history_idx'),
+            models.Index(fields=['user', 'change_seq'], name='reservation_user_changes_idx'),
+        ]
+
+    def save(self, *args, update_fields=None, **kwargs) -> None:
+        # change_seq는 pre_save 신호에서 부여하므로 부분 저장에도 포함하고, 순번과 행을 한 트랜잭션에 기록
+        if update_fields is not None:
+            update_fields = {*update_fields, 'updated_at', 'change_seq'}
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, update_fields=update_fields, **kwargs)
 
     def __str__(self) -> str:
         return f"{self.user} - {self.equipment.name if self.equipment else 'N/A'} ({self.room_date})"
 
+class ReservationTombstone(models.Model):
+    """Left behind by every deleted Reservation so sync clients can remove it."""
+    reservation_id = models.IntegerField(verbose_name="삭제된 예약 ID")
+    user = models.CharField(max_length=10, verbose_name="예약자 학번/이름")
+    equipment_id = models.IntegerField(null=True, verbose_name="장비 ID")
+    room_date = models.DateField(verbose_name="예약 날짜")
+    change_seq = models.BigIntegerField(unique=True, verbose_name="변경 순번")
+    deleted_at = models.DateTimeField(default=timezone.now, verbose_name="삭제 일시")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'change_seq'], name='tombstone_user_changes_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return f"#{self.reservation_id} 삭제 ({self.change_seq})"
+
+class ChangeSequence(models.Model):
+    """Single-row counter handing out Reservation change_seq values; the row lock orders commits."""
+    value = models.BigIntegerField(default=0)
+    pruned_through = models.BigIntegerField(default=0, verbose_name="삭제 기록을 정리한 마지막 순번")
+
 class Blog(models.Model):
     category = models.CharField(max_length=20, default='공지사항')
     title = models.CharField(max_length=200)
@@ -27,4 +73,61 @@ class Blog(models.Model):
     description = RichTextUploadingField(blank=True, null=True)
 
     def __str__(self) -> str:
-        return self.title
\ No newline at end of file
+        return self.title
+
+class UtilizationRollup(models.Model):
+    """Booked half-hour slots per (equipment, date, hour), maintained from Reservation signals."""
+    equipment = models.ForeignKey(Equipment, on_delete=models.CASCADE, verbose_name="장비")
+    room_date = models.DateField(verbose_name="날짜")
+    hour = models.SmallIntegerField(verbose_name="시간대 (0-23)")
+    booked_slots = models.SmallIntegerField(default=0, verbose_name="예약된 30분 슬롯 수")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['equipment', 'room_date', 'hour'], name='unique_rollup_slot'),
+        ]
+        indexes = [
+            models.Index(fields=['room_date', 'equipment'], name='rollup_date_equipment_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.equipment_id} {self.room_date} {self.hour}시: {self.booked_slots}"
+
+class Notification(models.Model):
+    """Message to a user: shown once on ``myreservation`` and mailed by ``manage.py send_notifications``."""
+    user = models.CharField(max_length=10, verbose_name="받는 사람 학번/이름")
+    subject = models.CharField(max_length=200, verbose_name="제목")
+    message = models.TextField(verbose_name="내용")
+    created_at = models.DateTimeField(default=timezone.now, verbose_name="생성 일시")
+    sent_at = models.DateTimeField(null=True, blank=True, verbose_name="발송 일시")
+    read_at = models.DateTimeField(null=True, blank=True, verbose_name="확인 일시")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['sent_at', 'id'], name='notification_outbox_idx'),
+            models.Index(fields=['user', 'read_at'], name='notification_unread_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user}: {self.subject}"
+
+class WaitlistEntry(models.Model):
+    """A user waiting for a slot; booked and removed (see waitlist.py) once the slot frees up."""
+    user = models.CharField(max_length=10, verbose_name="대기자 학번/이름")
+    equipment = models.ForeignKey(Equipment, on_delete=models.CASCADE, verbose_name="장비")
+    room_date = models.DateField(verbose_name="예약 날짜")
+    room_start_time = models.FloatField(verbose_name="시작 시간 (0-24)")
+    room_finish_time = models.FloatField(verbose_name="종료 시간 (0-24)")
+    created_at = models.DateTimeField(default=timezone.now, verbose_name="신청 일시")
+
+    class Meta:
+        indexes = [
+            # 취소된 (장비, 날짜) 구간과 겹치는 대기를 신청 순서대로
+            models.Index(fields=['equipment', 'room_date', 'created_at'], name='waitlist_slot_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'equipment', 'room_date', 'room_start_time', 'room_finish_time'], name='unique_waitlist_entry'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user} 대기 - {self.equipment_id} ({self.room_date} {self.room_start_time}~{self.room_finish_time})"
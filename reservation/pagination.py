@@ -0,0 +1,45 @@
+"""
+Keyset ("cursor") pagination helpers shared by the JSON API and the HTML views.
+
+A cursor is the sort key of the last row of the previous page, JSON-encoded
+and base64url-wrapped so it can travel in a query string.
+"""
+import base64
+import json
+from datetime import date
+from typing import Any, List, Sequence
+
+from django.db.models import QuerySet
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps([v.isoformat() if isinstance(v, date) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    """Raises ``ValueError`` for anything that is not a cursor made by ``encode_cursor``."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (TypeError, UnicodeDecodeError, json.JSONDecodeError, base64.binascii.Error) as e:
+        raise ValueError("invalid cursor") from e
+    if not isinstance(values, list):
+        raise ValueError("invalid cursor")
+    return values
+
+
+def reservations_after(qs: QuerySet, cursor: Sequence[Any], descending: bool = False) -> QuerySet:
+    """Rows strictly after ``cursor`` = (room_date, room_start_time, id) in the given direction.
+
+    The bound on ``room_date`` is a plain range so the (user, room_date, ...)
+    index is used; the tie-breaks on the boundary day are residual filters.
+    """
+    room_date, start_time, pk = date.fromisoformat(cursor[0]), float(cursor[1]), int(cursor[2])
+    if descending:
+        return qs.filter(room_date__lte=room_date).exclude(
+            room_date=room_date, room_start_time__gt=start_time
+        ).exclude(room_date=room_date, room_start_time=start_time, id__gte=pk)
+    return qs.filter(room_date__gte=room_date).exclude(
+        room_date=room_date, room_start_time__lt=start_time
+    ).exclude(room_date=room_date, room_start_time=start_time, id__lte=pk)
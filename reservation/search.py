@@ -0,0 +1,84 @@
+"""
+Full-text search over ``Blog`` (notices and lost items).
+
+On SQLite the posts are indexed in an FTS5 table (created by migration 0014)
+holding the title and the HTML-stripped description, kept in sync by the Blog
+signals in ``signals.py`` and ranked with bm25 (title weighted higher). Other
+backends fall back to a plain ``icontains`` filter.
+"""
+import html
+from typing import List, Tuple
+
+from django.db import connection
+from django.db.models import Q
+from django.utils.html import escape, strip_tags
+
+from .models import Blog
+
+FTS_TABLE = 'reservation_blog_fts'
+TITLE_WEIGHT = 10.0
+_MARK_START, _MARK_END = '\x02', '\x03'
+
+
+def fts_enabled() -> bool:
+    return connection.vendor == 'sqlite'
+
+
+def _plain_text(value: str) -> str:
+    return html.unescape(strip_tags(value or '')).strip()
+
+
+def _match_expression(query: str) -> str:
+    # 각 단어를 접두어 검색으로: "지갑" → 지갑을, 지갑이 ... 도 찾음
+    terms = [term.replace('"', '""') for term in query.split()]
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def index_blog(blog: Blog) -> None:
+    if not fts_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [blog.pk])
+        cursor.execute(f"INSERT INTO {FTS_TABLE} (rowid, title, body) VALUES (%s, %s, %s)",
+                       [blog.pk, blog.title, _plain_text(blog.description)])
+
+
+def remove_blog(blog_id: int) -> None:
+    if not fts_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [blog_id])
+
+
+def rebuild_index() -> int:
+    if not fts_enabled():
+        return 0
+    rows = [(pk, title, _plain_text(description)) for pk, title, description in Blog.objects.values_list('pk', 'title', 'description').iterator()]
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        cursor.executemany(f"INSERT INTO {FTS_TABLE} (rowid, title, body) VALUES (%s, %s, %s)", rows)
+    return len(rows)
+
+
+def _highlight(snippet: str) -> str:
+    return escape(snippet).replace(_MARK_START, '<mark>').replace(_MARK_END, '</mark>')
+
+
+def search_blog(query: str, limit: int = 20) -> List[Tuple[Blog, str]]:
+    """Returns up to ``limit`` (post, highlighted snippet HTML) pairs, best match first."""
+    query = query.strip()
+    if not query:
+        return []
+    if not fts_enabled():
+        blogs = Blog.objects.filter(Q(title__icontains=query) | Q(description__icontains=query)).order_by('-pub_date')[:limit]
+        return [(blog, escape(_plain_text(blog.description)[:120])) for blog in blogs]
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid, snippet({FTS_TABLE}, 1, %s, %s, '…', 16) FROM {FTS_TABLE} "
+            f"WHERE {FTS_TABLE} MATCH %s ORDER BY bm25({FTS_TABLE}, %s, 1.0) LIMIT %s",
+            [_MARK_START, _MARK_END, _match_expression(query), TITLE_WEIGHT, limit],
+        )
+        hits = cursor.fetchall()
+    blogs = Blog.objects.in_bulk([rowid for rowid, _ in hits])
+    return [(blogs[rowid], _highlight(snippet)) for rowid, snippet in hits if rowid in blogs]
@@ -0,0 +1,80 @@
+from typing import Optional
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .caches import as_room_date, expire_home, invalidate_availability, invalidate_equipment_list
+from .changes import next_change_seq, record_tombstone
+from .events import notify_availability
+from .models import Blog, Equipment, Reservation
+from .search import index_blog, remove_blog
+from .utilization import refresh_rollup
+from .waitlist import promote_waitlist
+
+
+def _promote_on_commit(equipment_id: Optional[int], room_date, start_time: float, finish_time: float) -> None:
+    # 취소가 커밋된 뒤 별도 트랜잭션에서 대기자를 예약 (취소가 롤백되면 실행되지 않음)
+    room_date = as_room_date(room_date)
+    transaction.on_commit(lambda: promote_waitlist(equipment_id, room_date, start_time, finish_time))
+
+
+@receiver(pre_save, sender=Reservation)
+def remember_previous_slot(sender, instance: Reservation, **kwargs) -> None:
+    # 수정 시 이전 (장비, 날짜)도 다시 집계해야 하므로 기억해 둔다
+    instance._previous_slot = instance._previous_times = None
+    if instance.pk:
+        previous = Reservation.objects.filter(pk=instance.pk).values_list('equipment_id', 'room_date', 'room_start_time', 'room_finish_time').first()
+        if previous:
+            instance._previous_slot, instance._previous_times = previous[:2], previous[2:]
+
+
+@receiver(pre_save, sender=Reservation)
+def assign_change_seq(sender, instance: Reservation, **kwargs) -> None:
+    # Reservation.save()가 연 트랜잭션 안에서 실행됨
+    instance.change_seq = next_change_seq()
+
+
+@receiver(post_save, sender=Reservation)
+def reservation_saved(sender, instance: Reservation, **kwargs) -> None:
+    refresh_rollup(instance.equipment_id, instance.room_date)
+    invalidate_availability(instance.equipment_id, instance.room_date)
+    notify_availability(instance.equipment_id, instance.room_date)
+    expire_home()
+    previous = getattr(instance, '_previous_slot', None)
+    if previous and previous != (instance.equipment_id, Reservation._meta.get_field('room_date').to_python(instance.room_date)):
+        refresh_rollup(*previous)
+        invalidate_availability(*previous)
+        notify_availability(*previous)
+    if previous:
+        # 옮기거나 줄인 예약이 비운 시간은 대기자에게
+        _promote_on_commit(*previous, *instance._previous_times)
+
+
+@receiver(post_delete, sender=Reservation)
+def reservation_deleted(sender, instance: Reservation, **kwargs) -> None:
+    record_tombstone(instance)
+    refresh_rollup(instance.equipment_id, instance.room_date)
+    invalidate_availability(instance.equipment_id, instance.room_date)
+    notify_availability(instance.equipment_id, instance.room_date)
+    expire_home()
+    _promote_on_commit(instance.equipment_id, instance.room_date, instance.room_start_time, instance.room_finish_time)
+
+
+@receiver(post_save, sender=Equipment)
+@receiver(post_delete, sender=Equipment)
+def equipment_changed(sender, instance: Equipment, **kwargs) -> None:
+    invalidate_equipment_list()
+    expire_home()
+
+
+@receiver(post_save, sender=Blog)
+def blog_saved(sender, instance: Blog, **kwargs) -> None:
+    index_blog(instance)
+    expire_home()
+
+
+@receiver(post_delete, sender=Blog)
+def blog_deleted(sender, instance: Blog, **kwargs) -> None:
+    remove_blog(instance.pk)
+    expire_home()
@@ -0,0 +1,77 @@
+"""
+Half-hour booking slots and the bitmask wire format used by the booking grid.
+
+A day is one integer: bit ``i`` is set when ``TIME_SLOTS[i]`` is booked. A week
+is five such integers (Monday–Friday), small enough to inline in the page and
+to poll from ``new`` after every booking.
+"""
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# 주간 예약표의 30분 단위 행 (09:00 ~ 20:30). 값은 new.html의 셀 id와 예약 시간 값에 대응
+TIME_SLOTS: List[Tuple[str, str]] = [
+    (f"{hour}{'.5' if half else ''}", f"{hour:02d}:{'30' if half else '00'}")
+    for hour in range(9, 21) for half in (0, 1)
+]
+FIRST_SLOT = 9.0
+MAX_WEEK_OFFSET = 52
+
+
+def slot_bitmask(start_time: float, finish_time: float) -> int:
+    """Bitmask of the half-hour slots in ``[start_time, finish_time)``, bit i = TIME_SLOTS[i]."""
+    first = max(0, int((start_time - FIRST_SLOT) * 2))
+    last = min(len(TIME_SLOTS), int((finish_time - FIRST_SLOT) * 2))
+    return ((1 << max(0, last - first)) - 1) << first if last > first else 0
+
+
+def slot_counts(intervals: Iterable[Tuple[float, float]]) -> List[int]:
+    """Concurrent bookings per slot: a sweep over +1/-1 boundaries (difference array)."""
+    diff = [0] * (len(TIME_SLOTS) + 1)
+    for start_time, finish_time in intervals:
+        first = max(0, int((start_time - FIRST_SLOT) * 2))
+        last = min(len(TIME_SLOTS), int((finish_time - FIRST_SLOT) * 2))
+        if last > first:
+            diff[first] += 1
+            diff[last] -= 1
+    counts, running = [], 0
+    for delta in diff[:-1]:
+        running += delta
+        counts.append(running)
+    return counts
+
+
+def full_slots_mask(counts: List[int], capacity: int) -> int:
+    """Bitmask of the slots where every unit is taken."""
+    return sum(1 << i for i, n in enumerate(counts) if n >= capacity)
+
+
+def max_overlap(intervals: Iterable[Tuple[float, float]], start_time: float, finish_time: float) -> int:
+    """Peak number of ``intervals`` in use at the same instant within ``[start_time, finish_time)``."""
+    events = []
+    for s, f in intervals:
+        if s < finish_time and f > start_time:
+            events.append((max(s, start_time), 1))
+            events.append((min(f, finish_time), -1))
+    # 같은 시각에는 종료(-1)를 먼저 처리: 10:00에 끝나는 예약과 10:00에 시작하는 예약은 겹치지 않음
+    events.sort()
+    peak = running = 0
+    for _, delta in events:
+        running += delta
+        peak = max(peak, running)
+    return peak
+
+
+def week_payload(equipment_id: int, week_start: date, offset: Optional[int], masks: List[int]) -> Dict[str, Any]:
+    """``offset`` is weeks from the current week, or None for pushed events (clients match on ``week_start``)."""
+    return {
+        'equipment_id': equipment_id,
+        'week_start': week_start.isoformat(),
+        'offset': offset,
+        'first_slot': FIRST_SLOT,
+        'slots': len(TIME_SLOTS),
+        'days': masks,
+    }
+
+
+def shift_week(week_start: date, offset: int) -> date:
+    return week_start + timedelta(weeks=offset)
@@ -16,3 +16,8 @@ def replace(value, arg):
 @register.filter
 def zfill(value, arg):
     return str(value).zfill(int(arg))
+
+
+@register.filter
+def percent(value):
+    return f"{float(value) * 100:.0f}%"
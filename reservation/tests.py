@@ -1,18 +1,59 @@
-from django.test import TestCase
+from django.test import TestCase, RequestFactory, override_settings
+from django.http import HttpResponse
+from unittest import skipUnless
 from unittest.mock import patch, MagicMock, call
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
+import gzip
+import json
+import asyncio
+import threading
+import time
+import os
+import shutil
+import sys
+import tempfile
 
 # Functions to test from reservation.views
 from .views import (
     _get_week_start_day_and_params,
-    _get_daily_reservations_list,
     _check_reservation_overlap,
+    _evaluate_candidates,
     get_blog_posts,
+    TIME_SLOTS,
+    _get_history_queryset,
+    _get_history_page,
+    _move_reservation,
+    _book_reservation,
+    MAX_CANDIDATES,
 )
 # Models that might be needed for mocking
-from .models import Reservation, Blog
-# myrange function (it's used by _get_daily_reservations_list)
-from utils import myrange # Assuming myrange is in the root utils.py
+from .models import Reservation, Blog, Equipment, Notification, ReservationTombstone, UtilizationRollup, WaitlistEntry
+from .utilization import get_heatmap, get_weekly_trend, rebuild_rollup
+from . import caches
+from .caches import EQUIPMENT_LIST_KEY, TwoTierCache, get_equipment_list, get_week_availability, home_cache
+from .search import search_blog
+from .changes import prune_tombstones
+from .cancellation import bulk_cancel as cancel_reservations
+from .waitlist import promote_waitlist
+from django.core import mail
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from .slots import full_slots_mask, max_overlap, slot_bitmask, slot_counts
+from .events import broker, notify_availability
+from asgiref.sync import async_to_sync
+from asgiref.testing import ApplicationCommunicator
+from django.core.cache import cache
+from mysite import compression
+from mysite.compression import compress, negotiate_encoding, _compress_sequence
+from mysite.profiling import StackSampler, rotate_profiles
+from mysite.ratelimit import client_ip, hit
+from mysite.responses import iter_json_array
+from mysite.slow_queries import fingerprint, redact
+from django.core.management import call_command
+from io import StringIO
+from mysite.db_router import PIN_COOKIE, ReplicaRouter, ReplicaRoutingMiddleware, read_only
+from django.contrib.auth.models import User
 
 class GetWeekStartDayAndParamsTests(TestCase):
     def test_weekday_input(self):
@@ -43,68 +84,6 @@ class GetWeekStartDayAndParamsTests(TestCase):
         self.assertEqual(date_diff, 5)
 
 
-class GetDailyReservationsListTests(TestCase):
-    @patch('reservation.views.Reservation.objects')  # Patch the model manager
-    def test_get_daily_reservations_list_structure(self, mock_reservation_manager):
-        expected_slots_day0 = list(myrange(9.0, 10.0, 0.5)) + list(myrange(14.0, 15.0, 0.5))
-        expected_slots_day2 = list(myrange(11.0, 11.5, 0.5))
-
-        mock_res_day0_event1 = MagicMock(spec=Reservation, room_start_time=9.0, room_finish_time=10.0)
-        mock_res_day0_event2 = MagicMock(spec=Reservation, room_start_time=14.0, room_finish_time=15.0)
-        iterable_reservations_day0 = [mock_res_day0_event1, mock_res_day0_event2]
-
-        mock_res_day2_event1 = MagicMock(spec=Reservation, room_start_time=11.0, room_finish_time=11.5)
-        iterable_reservations_day2 = [mock_res_day2_event1]
-
-        def filter_side_effect(**kwargs):
-            queryset_mock = MagicMock()
-            # 'room_date' in kwargs will be a datetime object from the helper function
-            filter_datetime_obj = kwargs.get('room_date')
-            # Convert to date for comparison, as model field is DateField and ORM might pass date part
-            filter_date_obj = filter_datetime_obj.date()
-
-            if filter_date_obj == date(2020, 1, 6):
-                queryset_mock.order_by.return_value = iterable_reservations_day0
-            elif filter_date_obj == date(2020, 1, 8):
-                queryset_mock.order_by.return_value = iterable_reservations_day2
-            else:
-                queryset_mock.order_by.return_value = []
-            return queryset_mock
-
-        mock_reservation_manager.filter.side_effect = filter_side_effect
-
-        start_day_datetime = datetime(2020, 1, 6)
-        equipment_id = 1
-        username = 'testuser'
-
-        day_list = _get_daily_reservations_list(mock_reservation_manager, equipment_id, username, start_day_datetime, myrange)
-
-        self.assertEqual(len(day_list), 5)
-        self.assertEqual(day_list[0], expected_slots_day0)
-        self.assertEqual(day_list[1], [])
-        self.assertEqual(day_list[2], expected_slots_day2)
-        self.assertEqual(day_list[3], [])
-        self.assertEqual(day_list[4], [])
-
-        expected_filter_calls = [
-            call(equipment_id=equipment_id, room_date=datetime(2020, 1, 6, 0, 0)),
-            call(equipment_id=equipment_id, room_date=datetime(2020, 1, 7, 0, 0)),
-            call(equipment_id=equipment_id, room_date=datetime(2020, 1, 8, 0, 0)),
-            call(equipment_id=equipment_id, room_date=datetime(2020, 1, 9, 0, 0)),
-            call(equipment_id=equipment_id, room_date=datetime(2020, 1, 10, 0, 0)),
-        ]
-        self.assertEqual(mock_reservation_manager.filter.call_args_list, expected_filter_calls)
-
-        # Check that order_by was called for each mock returned by filter
-        # This relies on filter_side_effect returning distinct mocks that we can check.
-        # Iterate through the calls made to the filter mock
-        for call_made in mock_reservation_manager.filter.mock_calls:
-            # Get the mock object that was returned by this specific filter call
-            # This is call_made.return_value
-            filter_return_mock = call_made.return_value
-            filter_return_mock.order_by.assert_called_with('room_start_time')
-
-
 class CheckReservationOverlapTests(TestCase):
     @patch('reservation.views.Reservation.objects')
     def test_overlap_conditions(self, mock_reservation_objects):
@@ -113,12 +92,49 @@ class CheckReservationOverlapTests(TestCase):
         room_type = '1A'
         reserve_date = date(2020, 1, 6)
 
-        mock_qs.exists.return_value = False
+        mock_qs.values_list.return_value = []
         self.assertFalse(_check_reservation_overlap(mock_reservation_objects, room_type, reserve_date, 9.0, 10.0))
 
-        mock_qs.exists.return_value = True
+        mock_qs.values_list.return_value = [(9.5, 10.5)]
         self.assertTrue(_check_reservation_overlap(mock_reservation_objects, room_type, reserve_date, 9.0, 10.0))
 
+    def test_capacity_sweep_line(self):
+        # 2대 장비: 09:00-10:00과 09:30-10:30이 09:30-10:00에 겹쳐 그 시간만 만석
+        booked = [(9.0, 10.0), (9.5, 10.5)]
+        self.assertEqual(max_overlap(booked, 9.0, 11.0), 2)
+        self.assertEqual(max_overlap(booked, 10.0, 11.0), 1)
+        self.assertEqual(max_overlap([(9.0, 10.0), (10.0, 11.0)], 9.0, 11.0), 1)
+        counts = slot_counts(booked)
+        self.assertEqual(counts[:4], [1, 2, 1, 0])
+        self.assertEqual(full_slots_mask(counts, 2), 0b10)
+
+    def test_booking_respects_capacity(self):
+        cache.clear()
+        equipment = Equipment.objects.create(name="원심분리기", capacity=2)
+        day = date(2030, 1, 7)
+        self.assertEqual(_book_reservation('u1', equipment.pk, day, 9.0, 10.0)[1], None)
+        self.assertEqual(_book_reservation('u2', equipment.pk, day, 9.5, 10.5)[1], None)
+        self.assertEqual(_book_reservation('u3', equipment.pk, day, 9.5, 10.0)[1], 'overlap')
+        self.assertEqual(_book_reservation('u3', equipment.pk, day, 10.0, 11.0)[1], None)
+        self.assertEqual(get_week_availability(equipment.pk, day)[0], 0b110)
+
+
+    def test_booking_reads_capacity_from_locked_row(self):
+        cache.clear()
+        equipment = Equipment.objects.create(name="원심분리기", capacity=2)
+        day = date(2030, 1, 7)
+        _book_reservation('u1', equipment.pk, day, 9.0, 10.0)
+        get_equipment_list()  # 수량 2가 캐시에 남은 상태에서
+        Equipment.objects.filter(pk=equipment.pk).update(capacity=1)  # 다른 워커가 줄임 (이 프로세스 캐시는 그대로)
+        self.assertEqual(_book_reservation('u2', equipment.pk, day, 9.0, 10.0)[1], 'overlap')
+
+    def test_capacity_must_be_positive(self):
+        equipment = Equipment(name="PCR", capacity=0)
+        with self.assertRaises(ValidationError):
+            equipment.full_clean()
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            equipment.save()
+
 
 class GetBlogPostsTests(TestCase):
     @patch('reservation.views.Blog.objects')
@@ -137,8 +153,966 @@ class GetBlogPostsTests(TestCase):
         mock_ordered_qs.__getitem__.assert_called_once_with(slice(None, count, None))
         self.assertEqual(result, mock_final_posts)
 
+class ApiTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='apiuser', password='password123')
+        self.equipments = [Equipment.objects.create(name=f"장비{i}") for i in range(5)]
+        for i in range(6):
+            Reservation.objects.create(user='apiuser', equipment=self.equipments[i % 2], room_date=date(2030, 1, 7 + i // 2), room_start_time=9.0 + i, room_finish_time=9.5 + i)
+
+    def test_equipment_list_cursor_pagination(self):
+        with self.assertNumQueries(1):
+            first = self.client.get('/api/v1/equipment?limit=2').json()
+        self.assertEqual([e['id'] for e in first['results']], [e.pk for e in self.equipments[:2]])
+        seen = [e['id'] for e in first['results']]
+        cursor = first['next_cursor']
+        while cursor:
+            page = self.client.get(f'/api/v1/equipment?limit=2&cursor={cursor}').json()
+            seen.extend(e['id'] for e in page['results'])
+            cursor = page['next_cursor']
+        self.assertEqual(seen, [e.pk for e in self.equipments])
+
+    def test_sparse_fields(self):
+        body = self.client.get('/api/v1/equipment?fields=name').json()
+        self.assertEqual(body['results'][0], {'name': '장비0'})
+        self.assertEqual(self.client.get('/api/v1/equipment?fields=secret').status_code, 400)
+
+    def test_reservation_list_query_count_independent_of_page_size(self):
+        self.client.force_login(self.user)
+        with self.assertNumQueries(3):
+            self.client.get('/api/v1/reservations?limit=1')
+        with self.assertNumQueries(3):
+            body = self.client.get('/api/v1/reservations?limit=100').json()
+        self.assertEqual(len(body['results']), 6)
+        self.assertEqual(body['results'][0]['equipment_name'], '장비0')
+
+    def test_availability_uses_single_range_query(self):
+        with self.assertNumQueries(2):
+            body = self.client.get(f'/api/v1/equipment/{self.equipments[0].pk}/availability?start=2030-01-07&days=5').json()
+        self.assertEqual(body['days']['2030-01-07'], [[9.0, 9.5]])
+        self.assertEqual(body['days']['2030-01-08'], [[11.0, 11.5]])
+
+    def test_create_and_cancel(self):
+        self.client.force_login(self.user)
+        url = '/api/v1/reservations'
+        payload = {'equipment_id': self.equipments[0].pk, 'room_date': '2030-02-01', 'room_start_time': 10, 'room_finish_time': 11}
+        response = self.client.post(url, payload, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        conflict = self.client.post(url, dict(payload, room_start_time=10.5, room_finish_time=11.5), content_type='application/json')
+        self.assertEqual(conflict.status_code, 409)
+
+        reservation_id = response.json()['id']
+        self.assertEqual(self.client.post(f'{url}/{reservation_id}/cancel').status_code, 200)
+        self.assertFalse(Reservation.objects.filter(pk=reservation_id).exists())
+        self.assertEqual(self.client.post(f'{url}/{reservation_id}/cancel').status_code, 404)
+
+    def test_reservations_require_login(self):
+        self.assertEqual(self.client.get('/api/v1/reservations').status_code, 401)
+
+class BatchCheckTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='batchuser', password='password123')
+        self.equipment = Equipment.objects.create(name="현미경")
+        Reservation.objects.create(user='other', equipment=self.equipment, room_date=date(2030, 1, 7), room_start_time=10.0, room_finish_time=11.0)
+        Reservation.objects.create(user='batchuser', equipment=self.equipment, room_date=date(2030, 1, 8), room_start_time=9.0, room_finish_time=9.5)
+        Reservation.objects.create(user='batchuser', equipment=self.equipment, room_date=date(2030, 1, 8), room_start_time=12.0, room_finish_time=12.5)
+
+    def test_evaluate_candidates_single_query(self):
+        candidates = [
+            (self.equipment.pk, date(2030, 1, 7), 9.0, 10.0),
+            (self.equipment.pk, date(2030, 1, 7), 10.5, 11.5),
+            (self.equipment.pk, date(2030, 1, 8), 15.0, 16.0),
+        ]
+        get_equipment_list()  # 수량은 캐시된 장비 목록에서 읽음
+        with self.assertNumQueries(1):
+            verdicts = _evaluate_candidates(Reservation.objects.all(), 'batchuser', candidates)
+        self.assertEqual(verdicts, [None, 'overlap', 'daily_limit'])
+
+    def test_check_view_returns_verdict_per_candidate(self):
+        self.client.force_login(self.user)
+        candidates = [
+            {'room_date': '2030-01-07 ', 'room_start_time': 9, 'room_finish_time': 10},
+            {'room_date': '2030-01-07 ', 'room_start_time': 9.5, 'room_finish_time': 10.5},
+        ]
+        response = self.client.post('/reservation/check', {'equipment_id': self.equipment.pk, 'candidates': json.dumps(candidates)})
+        self.assertEqual([r['check_error'] for r in response.json()['results']], [0, 1])
+
+    def test_check_view_rejects_too_many_candidates(self):
+        self.client.force_login(self.user)
+        candidates = [{'room_date': '2030-01-07 ', 'room_start_time': 9, 'room_finish_time': 10}] * (MAX_CANDIDATES + 1)
+        response = self.client.post('/reservation/check', {'equipment_id': self.equipment.pk, 'candidates': json.dumps(candidates)})
+        self.assertEqual(response.json(), {'code': 'invalid_time', 'message': "잘못된 시간 형식입니다.", 'check_error': 1})
+
+    def test_check_view_single_candidate_unchanged(self):
+        self.client.force_login(self.user)
+        response = self.client.post('/reservation/check', {'equipment_id': self.equipment.pk, 'room_date': '2030-01-07 ', 'room_start_time': '10', 'room_finish_time': '10.5'})
+        self.assertEqual(response.json(), {'code': 'overlap', 'message': "이미 예약된 시간입니다", 'check_error': 1})
+
+class UtilizationRollupTests(TestCase):
+    def setUp(self):
+        self.equipment = Equipment.objects.create(name="원심분리기")
+
+    def _rollup(self):
+        return dict(UtilizationRollup.objects.filter(equipment=self.equipment).values_list('hour', 'booked_slots'))
+
+    def test_rollup_follows_save_and_delete(self):
+        res = Reservation.objects.create(user='u1', equipment=self.equipment, room_date=date(2030, 1, 7), room_start_time=9.5, room_finish_time=11.0)
+        self.assertEqual(self._rollup(), {9: 1, 10: 2})
+
+        res.room_date = date(2030, 1, 8)
+        res.room_finish_time = 10.0
+        res.save()
+        self.assertFalse(UtilizationRollup.objects.filter(room_date=date(2030, 1, 7)).exists())
+        self.assertEqual(self._rollup(), {9: 1})
+
+        res.delete()
+        self.assertFalse(UtilizationRollup.objects.exists())
+
+    def test_rebuild_matches_incremental(self):
+        Reservation.objects.create(user='u1', equipment=self.equipment, room_date=date(2030, 1, 7), room_start_time=9.0, room_finish_time=10.0)
+        Reservation.objects.create(user='u2', equipment=self.equipment, room_date=date(2030, 1, 7), room_start_time=13.5, room_finish_time=14.0)
+        incremental = set(UtilizationRollup.objects.values_list('equipment_id', 'room_date', 'hour', 'booked_slots'))
+        self.assertEqual(rebuild_rollup(), 2)
+        self.assertEqual(set(UtilizationRollup.objects.values_list('equipment_id', 'room_date', 'hour', 'booked_slots')), incremental)
+
+    def test_heatmap_values(self):
+        # Monday 2030-01-07, a single weekday window
+        Reservation.objects.create(user='u1', equipment=self.equipment, room_date=date(2030, 1, 7), room_start_time=9.0, room_finish_time=10.5)
+        row = get_heatmap(date(2030, 1, 7), date(2030, 1, 7))[0]
+        self.assertEqual(row['hours'][:3], [1.0, 0.5, 0.0])
+
+    def test_weekend_bookings_not_counted_against_weekday_capacity(self):
+        Reservation.objects.create(user='u1', equipment=self.equipment, room_date=date(2030, 1, 12), room_start_time=9.0, room_finish_time=10.0)
+        self.assertEqual(get_heatmap(date(2030, 1, 7), date(2030, 1, 13))[0]['hours'][0], 0.0)
+        self.assertEqual(get_weekly_trend(date(2030, 1, 13), 1)[0]['utilization'], 0.0)
+
+    def test_report_is_staff_only(self):
+        self.assertEqual(self.client.get('/reservation/report').status_code, 302)
+        staff = User.objects.create_user(username='staff', password='password123', is_staff=True)
+        self.client.force_login(staff)
+        self.assertEqual(self.client.get('/reservation/report').status_code, 200)
+
+class NewViewGridTests(TestCase):
+    def test_time_slots_match_cell_ids(self):
+        self.assertEqual(len(TIME_SLOTS), 24)
+        self.assertEqual(TIME_SLOTS[0], ("9", "09:00"))
+        self.assertEqual(TIME_SLOTS[3], ("10.5", "10:30"))
+        self.assertEqual(TIME_SLOTS[-1], ("20.5", "20:30"))
+
+    def test_new_renders_grid(self):
+        equipment = Equipment.objects.create(name="분광기")
+        self.client.force_login(User.objects.create_user(username='griduser', password='password123'))
+        response = self.client.get(f'/reservation/new/{equipment.pk}')
+        self.assertContains(response, 'id="Mon_9.5"')
+        self.assertContains(response, '<option value="20.5">20:30</option>', html=True)
+        self.assertEqual(response.context['grid']['days'], [0, 0, 0, 0, 0])
+        self.assertContains(response, 'id="grid_data"')
+
+    def test_availability_endpoint_sends_bitmasks(self):
+        equipment = Equipment.objects.create(name="분광기")
+        start_day = _get_week_start_day_and_params(datetime.now())[0].date()
+        Reservation.objects.create(user='u1', equipment=equipment, room_date=start_day + timedelta(days=8), room_start_time=10.0, room_finish_time=11.5)
+        data = self.client.get(f'/reservation/new/{equipment.pk}/availability', {'week': 1}).json()
+        self.assertEqual(data['week_start'], (start_day + timedelta(weeks=1)).isoformat())
+        self.assertEqual((data['offset'], data['slots']), (1, 24))
+        self.assertEqual(data['days'], [0, 0b11100, 0, 0, 0])
+        self.assertEqual(self.client.get(f'/reservation/new/{equipment.pk}/availability', {'week': 'x'}).status_code, 400)
+        self.assertEqual(self.client.get('/reservation/new/9999/availability').status_code, 404)
+
+class MediaServingTests(TestCase):
+    @override_settings(DEBUG=False)
+    def test_uploads_served_without_debug(self):
+        from django.conf import settings
+        if not os.path.isdir(settings.MEDIA_ROOT):
+            self.addCleanup(shutil.rmtree, settings.MEDIA_ROOT, True)
+        os.makedirs(os.path.join(settings.MEDIA_ROOT, 'uploads'), exist_ok=True)
+        fd, path = tempfile.mkstemp(suffix='.txt', dir=os.path.join(settings.MEDIA_ROOT, 'uploads'))
+        self.addCleanup(os.remove, path)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(b'uploaded')
+        response = self.client.get(f'/media/uploads/{os.path.basename(path)}')
+        self.assertEqual(b''.join(response.streaming_content), b'uploaded')
+        self.assertEqual(self.client.get('/media/uploads/missing.txt').status_code, 404)
+
+class HealthzTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_healthz_warms_caches(self):
+        equipment = Equipment.objects.create(name="PCR")
+        response = self.client.get('/healthz')
+        self.assertEqual(response.json(), {'status': 'ok', 'equipment': 1})
+        self.assertIsNotNone(cache.get(EQUIPMENT_LIST_KEY))
+        # 예약 현황은 캐시에서 읽으므로 장비 조회 1번만 실행
+        with self.assertNumQueries(1):
+            self.client.get(f'/reservation/new/{equipment.pk}')
+
+    def test_availability_cache_invalidated_by_booking(self):
+        equipment = Equipment.objects.create(name="PCR")
+        week_start = date(2030, 1, 7)
+        self.assertEqual(get_week_availability(equipment.pk, week_start), [0, 0, 0, 0, 0])
+        with self.captureOnCommitCallbacks(execute=True):
+            Reservation.objects.create(user='u1', equipment=equipment, room_date=date(2030, 1, 9), room_start_time=9.0, room_finish_time=10.0)
+            # 커밋 전에는 무효화하지 않음: 다른 요청이 커밋 전 데이터로 다시 채우지 않도록
+            self.assertEqual(get_week_availability(equipment.pk, week_start), [0, 0, 0, 0, 0])
+        self.assertEqual(get_week_availability(equipment.pk, week_start), [0, 0, 0b11, 0, 0])
+
+    def test_fill_racing_an_invalidation_is_not_served(self):
+        equipment = Equipment.objects.create(name="PCR")
+        week_start = date(2030, 1, 7)
+        count_week = caches._count_week
+
+        def commit_while_filling(rows, week):
+            # 채우는 요청이 행을 읽은 뒤, 저장하기 전에 다른 요청의 예약이 커밋됨
+            counts = count_week(rows, week)
+            with self.captureOnCommitCallbacks(execute=True):
+                Reservation.objects.create(user='u1', equipment=equipment, room_date=date(2030, 1, 9), room_start_time=9.0, room_finish_time=10.0)
+            return counts
+
+        with patch('reservation.caches._count_week', side_effect=commit_while_filling):
+            self.assertEqual(get_week_availability(equipment.pk, week_start), [0, 0, 0, 0, 0])
+        self.assertEqual(get_week_availability(equipment.pk, week_start), [0, 0, 0b11, 0, 0])
+
+class BoardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_slot_bitmask(self):
+        self.assertEqual(slot_bitmask(9.0, 10.0), 0b11)
+        self.assertEqual(slot_bitmask(10.5, 11.0), 0b1000)
+        self.assertEqual(slot_bitmask(20.5, 21.0), 1 << 23)
+        self.assertEqual(slot_bitmask(8.0, 9.0), 0)
+
+    def test_board_query_count_is_fixed(self):
+        equipments = [Equipment.objects.create(name=f"장비{i}") for i in range(120)]
+        start_day = _get_week_start_day_and_params(datetime.now())[0].date()
+        for i, equipment in enumerate(equipments[:40]):
+            Reservation.objects.create(user='u1', equipment=equipment, room_date=start_day + timedelta(days=i % 5), room_start_time=9.0, room_finish_time=10.0)
+        with self.assertNumQueries(2):
+            response = self.client.get('/reservation/board')
+        rows = response.context['rows']
+        self.assertEqual(len(rows), 120)
+        self.assertEqual(rows[1][2], [0, 0b11, 0, 0, 0])
+
+class ReservationHistoryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='histuser', password='password123')
+        equipment = Equipment.objects.create(name="현미경")
+        self.now = datetime(2030, 1, 9, 12, 0)
+        for day in (7, 8, 9, 10, 11):
+            for start in (9.0, 14.0):
+                Reservation.objects.create(user='histuser', equipment=equipment, room_date=date(2030, 1, day), room_start_time=start, room_finish_time=start + 1)
+
+    def _walk(self, mode, page_size):
+        qs = _get_history_queryset('histuser', mode, self.now)
+        seen, cursor = [], None
+        while True:
+            rows, cursor = _get_history_page(qs, mode, cursor, page_size)
+            seen.extend((r.room_date.day, r.room_start_time) for r in rows)
+            if not cursor:
+                return seen
+
+    def test_upcoming_and_past_split_today_by_finish_time(self):
+        upcoming = self._walk('upcoming', 2)
+        past = self._walk('past', 2)
+        self.assertEqual(upcoming[0], (9, 14.0))
+        self.assertEqual(upcoming, sorted(upcoming))
+        self.assertEqual(past[0], (9, 9.0))
+        self.assertEqual(past, sorted(past, reverse=True))
+        self.assertEqual(len(upcoming) + len(past), 10)
+
+    def test_history_uses_index(self):
+        plan = _get_history_queryset('histuser', 'upcoming', self.now).explain()
+        self.assertIn('reservation_user_history_idx', plan)
+
+    def test_myreservation_view_pages(self):
+        self.client.force_login(self.user)
+        response = self.client.get('/reservation/my?mode=past')
+        self.assertEqual(response.context['mode'], 'past')
+
+    def test_cancelled_mode_pages_through_tombstones(self):
+        cache.clear()
+        for reservation in Reservation.objects.filter(user='histuser', room_date__day__in=(7, 8)).order_by('id'):
+            reservation.delete()
+        self.client.force_login(self.user)
+        seen, cursor, pages = [], '', 0
+        while True:
+            with patch('reservation.views.HISTORY_PAGE_SIZE', 3):
+                response = self.client.get('/reservation/my', {'mode': 'cancelled', 'cursor': cursor})
+            pages += 1
+            self.assertEqual(response.context['mode'], 'cancelled')
+            seen.extend(t.change_seq for t in response.context['reservation_list'])
+            cursor = response.context['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual((len(seen), pages), (4, 2))
+        self.assertEqual(seen, sorted(seen, reverse=True))  # 최근 취소부터
+        self.assertContains(response, "현미경")
+
+class ConflictCheckedWriteTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='mover', password='password123')
+        self.equipment = Equipment.objects.create(name="질량분석기")
+        self.mine = Reservation.objects.create(user='mover', equipment=self.equipment, room_date=date(2030, 1, 7), room_start_time=9.0, room_finish_time=10.0)
+        Reservation.objects.create(user='other', equipment=self.equipment, room_date=date(2030, 1, 7), room_start_time=11.0, room_finish_time=12.0)
+
+    def test_move_rejects_overlap_and_keeps_row(self):
+        _, code = _move_reservation(self.mine.pk, 'mover', date(2030, 1, 7), 10.5, 11.5)
+        self.assertEqual(code, 'overlap')
+        self.mine.refresh_from_db()
+        self.assertEqual((self.mine.room_start_time, self.mine.room_finish_time), (9.0, 10.0))
+
+    def test_resize_within_own_slot_is_allowed(self):
+        reservation, code = _move_reservation(self.mine.pk, 'mover', date(2030, 1, 7), 9.5, 11.0)
+        self.assertIsNone(code)
+        self.assertEqual(reservation.room_finish_time, 11.0)
+
+    def test_move_checks_ownership_and_times(self):
+        self.assertEqual(_move_reservation(self.mine.pk, 'other', date(2030, 1, 8), 9.0, 10.0)[1], 'not_found')
+        self.assertEqual(_move_reservation(self.mine.pk, 'mover', date(2030, 1, 8), 10.0, 9.0)[1], 'invalid_time')
+
+    def test_update_view_returns_structured_conflict(self):
+        self.client.force_login(self.user)
+        response = self.client.get(
+            f'/reservation/update/{self.mine.pk}',
+            {'room_date': '2030-01-07', 'room_start_time': '11', 'room_finish_time': '12'},
+            HTTP_ACCEPT='application/json',
+        )
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['code'], 'overlap')
+
+    def test_update_view_invalid_time_is_bad_request(self):
+        self.client.force_login(self.user)
+        response = self.client.get(
+            f'/reservation/update/{self.mine.pk}',
+            {'room_date': '2030-01-07', 'room_start_time': '12', 'room_finish_time': '11'},
+            HTTP_ACCEPT='application/json',
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['code'], 'invalid_time')
+
+    def test_create_rechecks_after_check(self):
+        self.client.force_login(self.user)
+        response = self.client.get('/reservation/create', {
+            'equipment_id': self.equipment.pk, 'room_date': '2030-01-07 ', 'room_start_time': '11.5', 'room_finish_time': '12',
+        })
+        self.assertIn('/reservation/new/', response['Location'])
+        self.assertEqual(Reservation.objects.filter(room_date=date(2030, 1, 7)).count(), 2)
+        _, code = _book_reservation('mover', self.equipment.pk, date(2030, 1, 7), 12.0, 13.0)
+        self.assertIsNone(code)
+
+@override_settings(DATABASE_REPLICA_ALIAS='replica')
+class ReplicaRouterTests(TestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+        self.factory = RequestFactory()
+
+    def _route(self, view, request):
+        seen = {}
+
+        def get_response(req):
+            middleware.process_view(req, view, (), {})
+            seen['read'] = self.router.db_for_read(Reservation)
+            if getattr(view, 'writes', False):
+                self.router.db_for_write(Reservation)
+            return HttpResponse()
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        response = middleware(request)
+        return seen['read'], response
+
+    def test_read_only_view_uses_replica(self):
+        db, response = self._route(read_only(lambda r: None), self.factory.get('/'))
+        self.assertEqual(db, 'replica')
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_unmarked_view_and_writes_use_primary(self):
+        view = lambda r: None
+        view.writes = True
+        db, response = self._route(view, self.factory.get('/reservation/create'))
+        self.assertEqual(db, 'default')
+        self.assertIn(PIN_COOKIE, response.cookies)
+        self.assertEqual(self.router.db_for_write(Reservation), 'default')
+
+    def test_pinned_client_reads_primary(self):
+        request = self.factory.get('/')
+        request.COOKIES[PIN_COOKIE] = '1'
+        db, _ = self._route(read_only(lambda r: None), request)
+        self.assertEqual(db, 'default')
+
+    def test_outside_request_reads_primary(self):
+        self.assertEqual(self.router.db_for_read(Reservation), 'default')
+
+class BlogSearchTests(TestCase):
+    def setUp(self):
+        self.wallet = Blog.objects.create(category="분실물", title="검은색 지갑을 찾습니다", pub_date=datetime(2030, 1, 7), description="<p>3층 실험실에서 <b>지갑</b> 분실</p>")
+        self.notice = Blog.objects.create(category="공지사항", title="장비 점검 안내", pub_date=datetime(2030, 1, 8), description="<p>원심분리기 점검, 지갑 보관함 위치 변경</p>")
+
+    def test_ranked_prefix_search_over_stripped_html(self):
+        results = search_blog("지갑")
+        self.assertEqual([blog for blog, _ in results], [self.wallet, self.notice])
+        self.assertNotIn('<p>', results[0][1])
+        self.assertIn('<mark>', results[0][1])
+
+    def test_index_follows_edits_and_deletes(self):
+        self.notice.description = "<p>원심분리기 점검</p>"
+        self.notice.save()
+        self.assertEqual([blog for blog, _ in search_blog("지갑")], [self.wallet])
+        self.wallet.delete()
+        self.assertEqual(search_blog("지갑"), [])
+
+    def test_query_syntax_is_escaped(self):
+        self.assertEqual(search_blog('"지갑 OR'), [])
+        self.assertEqual(search_blog('   '), [])
+
+    def test_search_view(self):
+        response = self.client.get('/reservation/search', {'q': '점검'})
+        self.assertContains(response, '장비 점검 안내')
+
+class AvailabilityEventsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.equipment = Equipment.objects.create(name="PCR")
+
+    def test_committed_booking_is_pushed_to_open_streams(self):
+        from mysite.asgi import application
+        scope = {'type': 'http', 'method': 'GET', 'path': f'/reservation/events/{self.equipment.pk}', 'headers': []}
+
+        async def scenario():
+            stream = ApplicationCommunicator(application, scope)
+            await stream.send_input({'type': 'http.request'})
+            self.assertEqual((await stream.receive_output(1))['status'], 200)
+            self.assertEqual((await stream.receive_output(1))['body'], b'retry: 5000\n\n')
+            self.assertEqual(broker.subscriber_count(self.equipment.pk), 1)
+            # 신호 처리기는 요청 스레드에서 실행되므로 다른 스레드에서 발행
+            await asyncio.get_running_loop().run_in_executor(None, notify_availability, self.equipment.pk, '2030-01-09')
+            body = (await stream.receive_output(1))['body'].decode()
+            await stream.send_input({'type': 'http.disconnect'})
+            await stream.wait(1)
+            return body
+
+        with patch('reservation.events.get_week_availability', return_value=[0, 0, 0b11, 0, 0]), \
+                patch('reservation.events.transaction.on_commit', side_effect=lambda f: f()):
+            body = async_to_sync(scenario)()
+        self.assertTrue(body.startswith('event: availability\ndata: '))
+        data = json.loads(body.split('data: ', 1)[1])
+        self.assertEqual((data['week_start'], data['days']), ('2030-01-07', [0, 0, 0b11, 0, 0]))
+        self.assertEqual(broker.subscriber_count(self.equipment.pk), 0)
+
+    def test_rolled_back_or_unwatched_changes_are_not_published(self):
+        with patch.object(broker, 'publish') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                Reservation.objects.create(user='u1', equipment=self.equipment, room_date=date(2030, 1, 9), room_start_time=9.0, room_finish_time=10.0)
+            with self.captureOnCommitCallbacks(execute=False) as callbacks:
+                Reservation.objects.create(user='u2', equipment=self.equipment, room_date=date(2030, 1, 9), room_start_time=10.0, room_finish_time=11.0)
+        publish.assert_not_called()
+        self.assertEqual(len(callbacks), 3)  # 현황 캐시 무효화, 푸시, 홈 만료 모두 커밋 후로 미뤄짐
+
+    def test_signals_notify_old_and_new_slot_on_move(self):
+        reservation = Reservation.objects.create(user='u1', equipment=self.equipment, room_date=date(2030, 1, 9), room_start_time=9.0, room_finish_time=10.0)
+        with patch('reservation.signals.notify_availability') as notify:
+            reservation.room_date = date(2030, 1, 16)
+            reservation.save()
+        self.assertEqual(notify.call_args_list, [call(self.equipment.pk, date(2030, 1, 16)), call(self.equipment.pk, date(2030, 1, 9))])
+
+class AsyncEndpointsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='asyncuser', password='password123')
+        self.equipment = Equipment.objects.create(name="PCR")
+        Reservation.objects.create(user='other', equipment=self.equipment, room_date=date(2030, 1, 7), room_start_time=10.0, room_finish_time=11.0)
+
+    async def test_check_under_async_client(self):
+        await self.async_client.aforce_login(self.user)
+        data = {'equipment_id': self.equipment.pk, 'room_date': '2030-01-07 ', 'room_start_time': '10', 'room_finish_time': '10.5'}
+        response = await self.async_client.post('/reservation/check', data)
+        self.assertEqual(response.json(), {'code': 'overlap', 'message': "이미 예약된 시간입니다", 'check_error': 1})
+        data['room_start_time'], data['room_finish_time'] = '11', '12'
+        self.assertEqual((await self.async_client.post('/reservation/check', data)).json()['check_error'], 0)
+
+    async def test_check_requires_login(self):
+        self.assertEqual((await self.async_client.post('/reservation/check', {})).status_code, 302)
+
+    def _stream(self, equipment_id, query=b''):
+        from mysite.asgi import application
+        scope = {'type': 'http', 'method': 'GET', 'path': f'/reservation/events/{equipment_id}', 'query_string': query, 'headers': []}
+
+        async def scenario():
+            stream = ApplicationCommunicator(application, scope)
+            await stream.send_input({'type': 'http.request'})
+            messages = [await stream.receive_output(1), await stream.receive_output(1)]
+            if messages[0]['status'] == 200:
+                messages.append(await stream.receive_output(1))
+                await stream.send_input({'type': 'http.disconnect'})
+            await stream.wait(1)
+            return messages
+
+        return async_to_sync(scenario)()
+
+    def test_stream_starts_with_snapshot_of_requested_week(self):
+        start, retry, snapshot = self._stream(self.equipment.pk, b'week_start=2030-01-07')
+        self.assertEqual(start['status'], 200)
+        data = json.loads(snapshot['body'].decode().split('data: ', 1)[1])
+        self.assertEqual((data['week_start'], data['days'][0]), ('2030-01-07', 0b11 << 2))
+
+    def test_stream_for_unknown_equipment_is_404(self):
+        self.assertEqual(self._stream(9999)[0]['status'], 404)
+
+class ProfilingMiddlewareTests(TestCase):
+    def setUp(self):
+        self.profile_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.profile_dir)
+        self.staff = User.objects.create_user(username='staff', password='password123', is_staff=True)
+
+    def test_overlapping_samplers_restore_switch_interval_once(self):
+        original = sys.getswitchinterval()
+        first, second = StackSampler(threading.get_ident(), 0.001), StackSampler(threading.get_ident(), 0.002)
+        first.__enter__()
+        second.__enter__()
+        first.__exit__(None, None, None)  # 먼저 끝난 요청이 다른 요청의 간격을 되돌리지 않음
+        self.assertEqual(sys.getswitchinterval(), 0.001)
+        second.__exit__(None, None, None)
+        self.assertEqual(sys.getswitchinterval(), original)
+
+    def test_staff_profile_is_stored(self):
+        self.client.force_login(self.staff)
+        with self.settings(PROFILE_DIR=self.profile_dir):
+            response = self.client.get('/', {'_profile': '1'})
+        self.assertEqual(response.status_code, 200)
+        profile_id = response['X-Profile-Id']
+        with open(os.path.join(self.profile_dir, f'{profile_id}.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+        self.assertEqual((meta['view'], meta['user'], meta['status']), ('home', 'staff', 200))
+        self.assertTrue(meta['sql'])
+        self.assertTrue(os.path.exists(os.path.join(self.profile_dir, f'{profile_id}.folded')))
+
+    async def test_async_view_profiled_under_asgi(self):
+        equipment = await Equipment.objects.acreate(name="PCR")
+        await cache.aclear()
+        await self.async_client.aforce_login(self.staff)
+        with self.settings(PROFILE_DIR=self.profile_dir):
+            response = await self.async_client.get(f'/reservation/new/{equipment.pk}/availability', {'_profile': '1'})
+        with open(os.path.join(self.profile_dir, f"{response['X-Profile-Id']}.json"), encoding='utf-8') as f:
+            meta = json.load(f)
+        self.assertEqual((meta['view'], meta['status']), ('availability', 200))
+        self.assertTrue(meta['sql'])
+
+    def test_ignored_for_non_staff(self):
+        self.client.force_login(User.objects.create_user(username='u1', password='password123'))
+        with self.settings(PROFILE_DIR=self.profile_dir):
+            response = self.client.get('/', {'_profile': '1'})
+        self.assertNotIn('X-Profile-Id', response)
+        self.assertEqual(os.listdir(self.profile_dir), [])
+
+    def test_rotation_removes_oldest_files(self):
+        for i, name in enumerate(['a.folded', 'a.json', 'b.folded', 'b.json']):
+            path = os.path.join(self.profile_dir, name)
+            with open(path, 'w') as f:
+                f.write('x' * 100)
+            os.utime(path, (i, i))
+        rotate_profiles(self.profile_dir, 250)
+        self.assertEqual(sorted(os.listdir(self.profile_dir)), ['b.folded', 'b.json'])
+
+class SlowQueryLogTests(TestCase):
+    def test_fingerprint_ignores_literals_and_in_list_length(self):
+        self.assertEqual(
+            fingerprint('SELECT * FROM t WHERE id IN (%s, %s) AND n = 3'),
+            fingerprint("SELECT *  FROM t WHERE id IN (%s, %s, %s) AND n = 12"),
+        )
+        self.assertEqual(redact(['secret@example.com', 7, None]), ['<str:18>', 7, None])
+
+    def test_slow_query_is_logged_with_view_and_plan(self):
+        with self.settings(SLOW_QUERY_MS=0), self.assertLogs('mysite.slow_queries', 'WARNING') as logs:
+            self.client.get('/reservation/index/공지사항')
+        entries = [json.loads(record.getMessage()) for record in logs.records]
+        entry = next(e for e in entries if 'reservation_blog' in e['sql'])
+        self.assertEqual(entry['view'], 'reservation.views.index')
+        self.assertTrue(entry['caller'].startswith('reservation/'))
+        self.assertIn('<str:', json.dumps(entry['params']))
+        self.assertTrue(entry['plan'])
+
+    def test_command_prints_top_offenders(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.log', delete=False, encoding='utf-8') as f:
+            for duration in (120, 300):
+                f.write(json.dumps({'fingerprint': 'aaa', 'duration_ms': duration, 'sql': 'SELECT a', 'view': 'v.home', 'caller': 'x.py:1', 'plan': ['SCAN a']}) + '\n')
+            f.write(json.dumps({'fingerprint': 'bbb', 'duration_ms': 150, 'sql': 'SELECT b', 'view': None, 'caller': None, 'plan': None}) + '\n')
+        self.addCleanup(os.remove, f.name)
+        out = StringIO()
+        call_command('slow_queries', '--log', f.name, '--top', '1', stdout=out)
+        self.assertIn('#1 aaa  2 calls, total 420.0 ms', out.getvalue())
+        self.assertIn('SCAN a', out.getvalue())
+        self.assertNotIn('bbb', out.getvalue())
+
+class RateLimitTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='limited', password='password123')
+
+    def test_sliding_window(self):
+        # 60초에 2회: 세 번째는 거절, 다음 구간 중간에는 이전 구간 가중치가 줄어 다시 허용
+        self.assertEqual(hit('t', 'ip:1', 2, 60, now=600.0), 0)
+        self.assertEqual(hit('t', 'ip:1', 2, 60, now=601.0), 0)
+        self.assertEqual(hit('t', 'ip:1', 2, 60, now=602.0), 58)
+        self.assertGreater(hit('t', 'ip:1', 2, 60, now=661.0), 0)
+        self.assertEqual(hit('t', 'ip:1', 2, 60, now=730.0), 0)
+        self.assertEqual(hit('t', 'ip:2', 2, 60, now=602.0), 0)
+
+    @override_settings(RATELIMITS={'check': {'requests': 2, 'period': 60, 'keys': ('user',)}})
+    def test_check_returns_429_with_retry_after(self):
+        self.client.force_login(self.user)
+        data = {'equipment_id': '1', 'room_date': '2030-01-07 ', 'room_start_time': '9', 'room_finish_time': '10'}
+        for _ in range(2):
+            self.assertEqual(self.client.post('/reservation/check', data).status_code, 200)
+        response = self.client.post('/reservation/check', data)
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response['Retry-After']), 1)
+        self.assertEqual(response.json()['code'], 'rate_limited')
+
+    @override_settings(RATELIMITS={'create': {'requests': 1, 'period': 60, 'keys': ('user', 'ip'), 'ip_requests': 3}})
+    def test_api_booking_is_throttled_per_user_and_ip(self):
+        equipment = Equipment.objects.create(name="PCR")
+        data = {'equipment_id': equipment.pk, 'room_date': '2030-01-07', 'room_start_time': 9, 'room_finish_time': 10}
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.post('/api/v1/reservations', data).status_code, 201)
+        self.assertEqual(self.client.post('/api/v1/reservations', data).status_code, 429)
+        self.assertEqual(self.client.get('/api/v1/reservations').status_code, 200)  # 조회는 제한 없음
+        # 같은 IP(NAT)의 다른 계정은 사용자 한도와 별개인 더 큰 IP 한도까지 허용
+        self.client.force_login(User.objects.create_user(username='other', password='password123'))
+        self.assertEqual(self.client.post('/api/v1/reservations', dict(data, room_start_time=10, room_finish_time=11)).status_code, 201)
+        self.client.force_login(User.objects.create_user(username='third', password='password123'))
+        self.assertEqual(self.client.post('/api/v1/reservations', dict(data, room_start_time=11, room_finish_time=12)).status_code, 429)
+
+    def test_proxy_ip_header_trusted_only_behind_fly(self):
+        request = RequestFactory().get('/', REMOTE_ADDR='10.0.0.1', HTTP_FLY_CLIENT_IP='1.2.3.4')
+        with override_settings(RATELIMIT_IP_HEADER=None):
+            self.assertEqual(client_ip(request), '10.0.0.1')
+        with override_settings(RATELIMIT_IP_HEADER='HTTP_FLY_CLIENT_IP'):
+            self.assertEqual(client_ip(request), '1.2.3.4')
+
+class ChangeFeedTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='syncuser', password='password123')
+        self.equipment = Equipment.objects.create(name="PCR")
+        self.client.force_login(self.user)
+
+    def _book(self, user='syncuser', start=9.0):
+        return Reservation.objects.create(user=user, equipment=self.equipment, room_date=date(2030, 1, 7), room_start_time=start, room_finish_time=start + 1)
+
+    def _sync(self, token=None, **params):
+        if token:
+            params['since'] = token
+        return self.client.get('/api/v1/reservations/changes', params).json()
+
+    def test_incremental_sync_with_tombstones(self):
+        first, second = self._book(), self._book(start=11.0)
+        self._book(user='other')
+        body = self._sync()
+        self.assertEqual([c['reservation']['id'] for c in body['changes']], [first.pk, second.pk])
+        token = body['next_token']
+
+        self.assertEqual(self._sync(token)['changes'], [])
+        first.room_start_time, first.room_finish_time = 13.0, 14.0
+        first.save(update_fields=['room_start_time', 'room_finish_time'])
+        second_id = second.pk
+        second.delete()
+        with self.assertNumQueries(5):  # 세션, 사용자, 정리 순번, 예약, 삭제 기록
+            body = self._sync(token)
+        self.assertEqual([c['action'] for c in body['changes']], ['upsert', 'delete'])
+        self.assertEqual(body['changes'][0]['reservation']['room_start_time'], 13.0)
+        self.assertEqual(body['changes'][1]['id'], second_id)
+
+    def test_paging_and_staff_view(self):
+        for i in range(3):
+            self._book(start=9.0 + i)
+        body = self._sync(limit=2)
+        self.assertTrue(body['has_more'])
+        self.assertEqual(len(self._sync(body['next_token'])['changes']), 1)
+        staff = User.objects.create_user(username='staff', password='password123', is_staff=True)
+        self._book(user='other')
+        self.client.force_login(staff)
+        self.assertEqual(len(self._sync(all='1')['changes']), 4)
+
+    def test_pruned_token_requires_resync(self):
+        self._book().delete()
+        token = self._sync()['next_token']
+        self._book().delete()
+        prune_tombstones(timezone.now() + timedelta(days=1))
+        response = self.client.get('/api/v1/reservations/changes', {'since': token})
+        self.assertEqual((response.status_code, response.json()['code']), (410, 'resync_required'))
+
+    def test_sync_without_token_after_prune_is_a_snapshot(self):
+        kept = self._book()
+        self._book(start=11.0).delete()
+        prune_tombstones(timezone.now() + timedelta(days=1))
+        body = self._sync()
+        self.assertEqual([(c['action'], c['reservation']['id']) for c in body['changes']], [('upsert', kept.pk)])
+        # 스냅샷 이후의 변경은 받은 토큰으로 이어서 받을 수 있음
+        kept_id = kept.pk
+        kept.delete()
+        body = self._sync(body['next_token'])
+        self.assertEqual([(c['action'], c['id']) for c in body['changes']], [('delete', kept_id)])
+
+    def test_snapshot_pages_continue_after_prune(self):
+        for i in range(3):
+            self._book(start=9.0 + i)
+        self._book(start=13.0).delete()
+        body = self._sync(limit=2)
+        prune_tombstones(timezone.now() + timedelta(days=1))  # 스냅샷 도중 정리되어도 이어짐
+        body = self._sync(body['next_token'], limit=2)
+        self.assertEqual((len(body['changes']), body['has_more']), (1, False))
+        self.assertEqual(self._sync(body['next_token'])['changes'], [])
+
+class HomeCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        home_cache.clear_local()
+
+    def test_cold_miss_is_single_flight(self):
+        tier = TwoTierCache()
+        calls = []
+
+        def build():
+            calls.append(1)
+            time.sleep(0.1)
+            return 'payload'
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(tier.get_or_build('t:cold', build))) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['payload'] * 8)
+
+    def test_expired_entry_is_served_stale_while_one_caller_rebuilds(self):
+        tier = TwoTierCache()
+        tier.get_or_build('t:swr', lambda: 'old')
+        tier.expire('t:swr')
+        cache.add('t:swr:lock', 1)  # 다른 워커가 다시 만드는 중
+        self.assertEqual(tier.get_or_build('t:swr', lambda: self.fail("rebuilt twice")), 'old')
+        cache.delete('t:swr:lock')
+        self.assertEqual(tier.get_or_build('t:swr', lambda: 'new'), 'new')
+
+    def test_home_payload_cached_and_expired_by_signals(self):
+        Equipment.objects.create(name="PCR")
+        self.client.get('/')
+        with self.assertNumQueries(0):
+            self.client.get('/')
+        with self.captureOnCommitCallbacks(execute=True):
+            Blog.objects.create(category="공지사항", title="새 공지", pub_date=datetime.now(), description="")
+        self.assertContains(self.client.get('/'), '새 공지')
+
+class BulkCancelTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.equipment = Equipment.objects.create(name="PCR")
+        self.other = Equipment.objects.create(name="원심분리기")
+        self.staff = User.objects.create_user(username='staff', email='staff@knu.ac.kr', password='password123', is_staff=True)
+        User.objects.create_user(username='alice', email='alice@knu.ac.kr', password='password123')
+
+    def _book(self, user, day, start, equipment=None):
+        return Reservation.objects.create(user=user, equipment=equipment or self.equipment, room_date=date(2030, 1, day), room_start_time=start, room_finish_time=start + 1)
+
+    def test_cancels_range_with_tombstones_and_one_notification_per_user(self):
+        for day in (7, 8, 14):
+            self._book('alice', day, 9.0)
+        self._book('bob', 8, 13.0)
+        kept = [self._book('alice', 8, 15.0), self._book('alice', 15, 9.0), self._book('alice', 8, 9.0, self.other)]
+        week = date(2030, 1, 7)
+        self.assertEqual(get_week_availability(self.equipment.pk, week)[1] & 0b11, 0b11)
+        with self.captureOnCommitCallbacks(execute=True):
+            cancelled = cancel_reservations(self.equipment.pk, date(2030, 1, 7), date(2030, 1, 14), 9.0, 14.0, reason="장비 고장")
+
+        self.assertEqual(cancelled, 4)
+        self.assertEqual(sorted(Reservation.objects.values_list('pk', flat=True)), sorted(r.pk for r in kept))
+        self.assertEqual(ReservationTombstone.objects.count(), 4)
+        self.assertEqual(len(set(ReservationTombstone.objects.values_list('change_seq', flat=True))), 4)
+        self.assertEqual(get_week_availability(self.equipment.pk, week)[1] & 0b11, 0)
+        self.assertEqual(UtilizationRollup.objects.filter(equipment=self.equipment, room_date=date(2030, 1, 8)).count(), 1)
+        notices = {n.user: n for n in Notification.objects.all()}
+        self.assertEqual(sorted(notices), ['alice', 'bob'])
+        self.assertIn('3건', notices['alice'].subject)
+        self.assertIn('장비 고장', notices['alice'].message)
+
+    def test_send_notifications_mails_outbox_once(self):
+        self._book('alice', 7, 9.0)
+        self._book('bob', 7, 11.0)  # 이메일 없는 사용자
+        cancel_reservations(self.equipment.pk, date(2030, 1, 7), date(2030, 1, 7))
+        call_command('send_notifications', stdout=StringIO())
+        self.assertEqual([m.to for m in mail.outbox], [['alice@knu.ac.kr']])
+        self.assertFalse(Notification.objects.filter(sent_at__isnull=True).exists())
+        call_command('send_notifications', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_notifications_shown_once_on_myreservation(self):
+        self._book('alice', 7, 9.0)
+        cancel_reservations(self.equipment.pk, date(2030, 1, 7), date(2030, 1, 7), reason="장비 고장")
+        self.client.login(username='alice', password='password123')
+        response = self.client.get('/reservation/my')
+        self.assertContains(response, "PCR 예약 1건 취소 안내")
+        self.assertContains(response, "사유: 장비 고장")
+        self.assertNotContains(self.client.get('/reservation/my'), "취소 안내")
+        # 화면에서 확인한 알림도 메일은 따로 발송됨
+        call_command('send_notifications', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_view_is_staff_only(self):
+        self._book('alice', 7, 9.0)
+        data = {'equipment': self.equipment.pk, 'start_date': '2030-01-07', 'end_date': '2030-01-07', 'start_time': '', 'finish_time': '', 'reason': ''}
+        self.client.force_login(User.objects.get(username='alice'))
+        self.assertEqual(self.client.post('/reservation/cancel', data).status_code, 302)
+        self.assertEqual(Reservation.objects.count(), 1)
+        self.client.force_login(self.staff)
+        response = self.client.post('/reservation/cancel', data)
+        self.assertRedirects(response, '/reservation/cancel?cancelled=1')  # 새로고침해도 다시 전송되지 않음
+        self.assertContains(self.client.get(response['Location']), '1건을 취소했습니다')
+        self.assertEqual(Reservation.objects.count(), 0)
+
+    def test_deletes_exactly_the_selected_rows_in_batches(self):
+        for start in (9.0, 11.0, 13.0):
+            self._book('alice', 7, start)
+        kept = self._book('alice', 8, 9.0)
+        with patch('reservation.cancellation.BATCH_SIZE', 2):
+            self.assertEqual(cancel_reservations(self.equipment.pk, date(2030, 1, 7), date(2030, 1, 7)), 3)
+        self.assertEqual(list(Reservation.objects.values_list('pk', flat=True)), [kept.pk])
+
+    def test_delete_view_only_deletes_own_booking(self):
+        reservation = self._book('alice', 7, 9.0)
+        self.client.force_login(self.staff)
+        self.assertEqual(self.client.get(f'/reservation/delete/{reservation.pk}').status_code, 404)
+        self.client.force_login(User.objects.get(username='alice'))
+        self.assertRedirects(self.client.get(f'/reservation/delete/{reservation.pk}'), '/reservation/my', fetch_redirect_response=False)
+        self.assertFalse(Reservation.objects.exists())
+
+class WaitlistTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.equipment = Equipment.objects.create(name="PCR")
+        self.day = date.today() + timedelta(days=7)
+        self.booking = Reservation.objects.create(user='owner', equipment=self.equipment, room_date=self.day, room_start_time=10.0, room_finish_time=12.0)
+        self.waiter = User.objects.create_user(username='waiter', password='password123')
+
+    def _join(self, start='10', finish='11'):
+        return self.client.post('/reservation/waitlist', {'equipment_id': self.equipment.pk, 'room_date': f'{self.day.isoformat()} ', 'room_start_time': start, 'room_finish_time': finish})
+
+    def test_prune_waitlist_deletes_past_entries(self):
+        past = WaitlistEntry.objects.create(user='waiter', equipment=self.equipment, room_date=date.today() - timedelta(days=1), room_start_time=10.0, room_finish_time=11.0)
+        kept = WaitlistEntry.objects.create(user='waiter', equipment=self.equipment, room_date=self.day, room_start_time=10.0, room_finish_time=11.0)
+        out = StringIO()
+        call_command('prune_waitlist', stdout=out)
+        self.assertIn('1 waitlist entries deleted', out.getvalue())
+        self.assertEqual(list(WaitlistEntry.objects.values_list('pk', flat=True)), [kept.pk])
+        self.assertFalse(WaitlistEntry.objects.filter(pk=past.pk).exists())
+
+    def test_join_only_for_booked_out_slots(self):
+        self.client.force_login(self.waiter)
+        self.assertEqual(self._join().status_code, 201)
+        self.assertEqual(self._join().json()['code'], 'duplicate')
+        self.assertEqual(self._join('13', '14').json()['code'], 'available')
+        self.assertEqual(WaitlistEntry.objects.count(), 1)
+
+    def test_too_many_message_follows_limit(self):
+        self.client.force_login(self.waiter)
+        with patch('reservation.waitlist.MAX_WAITING_PER_USER', 0):
+            response = self._join()
+        self.assertEqual(response.json(), {'code': 'too_many', 'message': "대기 신청은 최대 0건까지 할 수 있습니다."})
+
+    def test_delete_books_first_waiter_and_notifies(self):
+        WaitlistEntry.objects.create(user='waiter', equipment=self.equipment, room_date=self.day, room_start_time=10.0, room_finish_time=11.0)
+        WaitlistEntry.objects.create(user='second', equipment=self.equipment, room_date=self.day, room_start_time=10.5, room_finish_time=11.5)
+        WaitlistEntry.objects.create(user='third', equipment=self.equipment, room_date=self.day, room_start_time=11.0, room_finish_time=12.0)
+        self.client.force_login(User.objects.create_user(username='owner', password='password123'))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get(f'/reservation/delete/{self.booking.pk}')
+        # second는 waiter와 겹치므로 계속 대기, third는 남은 자리에 예약
+        self.assertEqual(sorted(Reservation.objects.values_list('user', flat=True)), ['third', 'waiter'])
+        self.assertEqual(list(WaitlistEntry.objects.values_list('user', flat=True)), ['second'])
+        self.assertEqual(sorted(Notification.objects.values_list('user', flat=True)), ['third', 'waiter'])
+
+    def test_moving_a_booking_frees_its_old_slot(self):
+        WaitlistEntry.objects.create(user='waiter', equipment=self.equipment, room_date=self.day, room_start_time=11.0, room_finish_time=12.0)
+        self.booking.room_finish_time = 11.0
+        with self.captureOnCommitCallbacks(execute=True):
+            self.booking.save(update_fields=['room_finish_time'])
+        self.assertTrue(Reservation.objects.filter(user='waiter', room_start_time=11.0).exists())
+        self.assertFalse(WaitlistEntry.objects.exists())
+
+    def test_cancellation_without_waiters_costs_one_query(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(promote_waitlist(self.equipment.pk, self.day, 10.0, 12.0), [])
+
+class CompressionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        home_cache.clear_local()
+        self.equipment = Equipment.objects.create(name="PCR")
+        for day in range(1, 31):
+            Reservation.objects.create(user=f'user{day}', equipment=self.equipment, room_date=date(2030, 1, day), room_start_time=9.0, room_finish_time=10.5)
+        Reservation.objects.create(user='late', equipment=self.equipment, room_date=date(2030, 2, 1), room_start_time=9.0, room_finish_time=10.0)
+
+    def test_json_array_is_encoded_in_chunks(self):
+        chunks = list(iter_json_array(range(5), lambda n: {'n': n}, chunk_size=2))
+        self.assertEqual(len(chunks), 5)  # '[', 3개 묶음, ']'
+        self.assertEqual(json.loads(b''.join(chunks)), [{'n': n} for n in range(5)])
+        self.assertEqual(b''.join(iter_json_array([])), b'[]')
+
+    def test_negotiation_skips_refused_codings(self):
+        self.assertEqual(negotiate_encoding('gzip, deflate'), 'gzip')
+        self.assertIsNone(negotiate_encoding('gzip;q=0, deflate'))
+        self.assertIsNone(negotiate_encoding(''))
+        with patch.dict('mysite.compression.ENCODINGS', {'br': lambda flush: None}):
+            self.assertEqual(negotiate_encoding('gzip, br'), 'br')
+
+    def test_calendar_events_streamed_for_visible_range(self):
+        response = self.client.get('/calendar/events', {'start': '2030-01-01T00:00:00+09:00', 'end': '2030-02-01T00:00:00+09:00'})
+        self.assertTrue(response.streaming)
+        events = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(len(events), 30)
+        self.assertEqual(events[0], {'title': '[PCR] user1', 'start': '2030-01-01T09:00:00', 'end': '2030-01-01T10:30:00', 'color': events[0]['color']})
+        self.assertEqual(self.client.get('/calendar/events').status_code, 400)
+        self.assertEqual(self.client.get('/calendar/events', {'start': '2030-01-01', 'end': '2030-06-01'}).status_code, 400)
+
+    def test_large_html_and_streamed_json_are_gzipped(self):
+        response = self.client.get('/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertIn('예약 현황 달력', gzip.decompress(response.content).decode())
+
+        response = self.client.get('/calendar/events', {'start': '2030-01-01', 'end': '2030-02-01'}, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(len(json.loads(gzip.decompress(b''.join(response.streaming_content)))), 30)
+
+    def test_compressed_length_is_randomized(self):
+        # BREACH 완화: 같은 본문이라도 압축 결과의 길이가 매번 달라야 한다
+        body = b'<p>csrfmiddlewaretoken=abc</p>' * 100
+        whole = [compress(body, 'gzip') for _ in range(10)]
+        streamed = [b''.join(_compress_sequence([body[:500], body[500:]], 'gzip')) for _ in range(10)]
+        for results in (whole, streamed):
+            self.assertGreater(len({len(data) for data in results}), 1)
+            self.assertTrue(all(gzip.decompress(data) == body for data in results))
+
+    @skipUnless(compression.brotli, 'brotli 패키지가 필요합니다')
+    def test_brotli_length_is_randomized(self):
+        body = b'{"q":"abc","csrf":"token"}' * 100
+        results = [compress(body, 'br') for _ in range(10)]
+        self.assertGreater(len({len(data) for data in results}), 1)
+        for data in results:
+            self.assertEqual(compression.brotli.decompress(data).rstrip(), body)
+
+    def test_small_responses_are_not_compressed(self):
+        response = self.client.get('/healthz', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.json()['status'], 'ok')
+
+    async def test_calendar_events_streamed_under_asgi(self):
+        response = await self.async_client.get('/calendar/events', {'start': '2030-01-01', 'end': '2030-02-01'}, headers={'Accept-Encoding': 'gzip'})
+        self.assertTrue(response.is_async)
+        body = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(len(json.loads(gzip.decompress(body))), 30)
+
 # Example run commands:
 # python manage.py test accounts.tests.SendActivationEmailTests
-# python manage.py test reservation.tests.GetDailyReservationsListTests
+# python manage.py test reservation.tests.GetWeekStartDayAndParamsTests
 # python manage.py test reservation
 # python manage.py test
@@ -0,0 +1,108 @@
+"""
+Utilization rollup: booked half-hour slots per (equipment, date, hour).
+
+The rollup is refreshed one (equipment, date) pair at a time from the
+``Reservation`` signals in ``signals.py`` and can be rebuilt in bulk with
+``python manage.py rebuild_utilization``. The staff report only ever reads a
+fixed window of rollup rows, so it costs the same regardless of history size.
+"""
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Sum
+
+from utils import myrange
+from .models import Equipment, Reservation, UtilizationRollup
+
+REPORT_HOURS = range(9, 21)  # 예약 가능 시간 09:00 ~ 21:00
+SLOTS_PER_HOUR = 2
+WEEKDAYS = (2, 3, 4, 5, 6)  # __week_day: 1=일요일 ... 7=토요일, 분모와 같은 월~금만 집계
+
+
+def _slots_by_hour(ranges: Iterable[Tuple[float, float]]) -> Dict[int, int]:
+    counts: Dict[int, int] = defaultdict(int)
+    for start_time, finish_time in ranges:
+        for slot in myrange(start_time, finish_time, 0.5):
+            counts[int(slot)] += 1
+    return counts
+
+
+def refresh_rollup(equipment_id: Optional[int], room_date: date) -> None:
+    """Recomputes the rollup rows of a single (equipment, date) pair."""
+    if equipment_id is None:
+        return
+    room_date = Reservation._meta.get_field('room_date').to_python(room_date)
+    refresh_rollup_range(equipment_id, room_date, room_date)
+
+
+def refresh_rollup_range(equipment_id: int, start: date, end: date) -> None:
+    """Recomputes the rollup rows of one equipment over [start, end] with one read and one delete."""
+    counts: Dict[Tuple[date, int], int] = defaultdict(int)
+    rows = Reservation.objects.filter(equipment_id=equipment_id, room_date__range=(start, end)).values_list(
+        'room_date', 'room_start_time', 'room_finish_time'
+    )
+    for room_date, start_time, finish_time in rows:
+        for slot in myrange(start_time, finish_time, 0.5):
+            counts[(room_date, int(slot))] += 1
+    with transaction.atomic():
+        UtilizationRollup.objects.filter(equipment_id=equipment_id, room_date__range=(start, end)).delete()
+        UtilizationRollup.objects.bulk_create([
+            UtilizationRollup(equipment_id=equipment_id, room_date=d, hour=h, booked_slots=n)
+            for (d, h), n in sorted(counts.items())
+        ])
+
+
+def rebuild_rollup(batch_size: int = 1000) -> int:
+    """Rebuilds the whole rollup table from ``Reservation``. Returns the number of rows written."""
+    counts: Dict[Tuple[int, date, int], int] = defaultdict(int)
+    rows = Reservation.objects.filter(equipment__isnull=False).values_list(
+        'equipment_id', 'room_date', 'room_start_time', 'room_finish_time'
+    ).iterator(chunk_size=batch_size)
+    for equipment_id, room_date, start_time, finish_time in rows:
+        for slot in myrange(start_time, finish_time, 0.5):
+            counts[(equipment_id, room_date, int(slot))] += 1
+
+    with transaction.atomic():
+        UtilizationRollup.objects.all().delete()
+        UtilizationRollup.objects.bulk_create(
+            (UtilizationRollup(equipment_id=e, room_date=d, hour=h, booked_slots=n) for (e, d, h), n in counts.items()),
+            batch_size=batch_size,
+        )
+    return len(counts)
+
+
+def get_heatmap(start: date, end: date) -> List[dict]:
+    """Utilization (0-1) per equipment and hour over the weekdays of [start, end]."""
+    weekdays = sum(1 for i in range((end - start).days + 1) if (start + timedelta(days=i)).weekday() < 5) or 1
+    totals = UtilizationRollup.objects.filter(room_date__range=(start, end), room_date__week_day__in=WEEKDAYS).values('equipment_id', 'hour').annotate(slots=Sum('booked_slots'))
+    cells: Dict[int, Dict[int, int]] = defaultdict(dict)
+    for row in totals:
+        cells[row['equipment_id']][row['hour']] = row['slots']
+
+    heatmap = []
+    for equipment in Equipment.objects.order_by('name'):
+        hours = [min(cells[equipment.pk].get(h, 0) / (SLOTS_PER_HOUR * weekdays * equipment.capacity), 1.0) for h in REPORT_HOURS]
+        heatmap.append({'equipment': equipment, 'hours': hours, 'average': sum(hours) / len(hours)})
+    return heatmap
+
+
+def get_weekly_trend(end: date, weeks: int) -> List[dict]:
+    """Overall utilization (0-1) per week for the ``weeks`` weeks ending with the week of ``end``."""
+    last_monday = end - timedelta(days=end.weekday())
+    first_monday = last_monday - timedelta(weeks=weeks - 1)
+    units = Equipment.objects.aggregate(units=Sum('capacity'))['units'] or 1
+    capacity = units * 5 * len(REPORT_HOURS) * SLOTS_PER_HOUR
+
+    per_day = UtilizationRollup.objects.filter(
+        room_date__range=(first_monday, last_monday + timedelta(days=6)), room_date__week_day__in=WEEKDAYS, hour__in=REPORT_HOURS,
+    ).values('room_date').annotate(slots=Sum('booked_slots'))
+    per_week: Dict[date, int] = defaultdict(int)
+    for row in per_day:
+        per_week[row['room_date'] - timedelta(days=row['room_date'].weekday())] += row['slots']
+
+    return [
+        {'week': monday, 'utilization': min(per_week.get(monday, 0) / capacity, 1.0)}
+        for monday in (first_monday + timedelta(weeks=i) for i in range(weeks))
+    ]
@@ -1,13 +1,40 @@
 from django.shortcuts import render, get_object_or_404, redirect
-from .models import Reservation, Blog, Equipment
+from .models import Reservation, ReservationTombstone, Blog, Equipment, Notification, WaitlistEntry
 from django.utils import timezone
 from datetime import datetime, timedelta, date
 from django.contrib.auth.decorators import login_required
-from django.http import HttpRequest, HttpResponse
+from django.contrib.admin.views.decorators import staff_member_required
+from django.views.decorators.http import require_POST
+from django.http import Http404, HttpRequest, HttpResponse, JsonResponse
+from django.db import DatabaseError, connection, transaction
 import json
-from django.db.models import Q, QuerySet
-from typing import Tuple, List, Optional, Callable
-from utils import myrange # Import myrange from root utils.py
+from django.db.models import F, Q, QuerySet
+from django.urls import reverse
+from typing import Tuple, List, Optional, Callable, Iterable
+from .utilization import REPORT_HOURS, get_heatmap, get_weekly_trend
+from .cancellation import bulk_cancel as cancel_reservations
+from .forms import BulkCancelForm
+from .caches import aget_equipment_list, aget_week_availability, get_capacity, get_equipment_list, get_week_availability, home_cache, home_key
+from mysite.db_router import read_only, use_primary
+from mysite.ratelimit import ratelimit
+from mysite.responses import json_response, streaming_json_response
+from .pagination import decode_cursor, encode_cursor, reservations_after
+from .search import search_blog
+from .slots import MAX_WEEK_OFFSET, TIME_SLOTS, full_slots_mask, max_overlap, shift_week, slot_counts, week_payload
+
+# Helper function for board view: {equipment_id: [mask_mon, ..., mask_fri]} of fully booked slots from one range query
+def _build_occupancy_matrix(reservations_qs: QuerySet, start_day: date, capacities: dict) -> dict:
+    intervals: dict = {}
+    rows = reservations_qs.filter(
+        room_date__range=(start_day, start_day + timedelta(days=4)), equipment__isnull=False
+    ).values_list('equipment_id', 'room_date', 'room_start_time', 'room_finish_time')
+    for equipment_id, room_date, start_time, finish_time in rows:
+        days = intervals.setdefault(equipment_id, [[] for _ in range(5)])
+        days[(room_date - start_day).days].append((start_time, finish_time))
+    return {
+        equipment_id: [full_slots_mask(slot_counts(day), capacities.get(equipment_id, 1)) for day in days]
+        for equipment_id, days in intervals.items()
+    }
 
 # Helper function for new view: Calculates start_day and related date parameters
 def _get_week_start_day_and_params(today: datetime) -> Tuple[datetime, int, int, int]:
@@ -24,177 +51,507 @@ def _get_week_start_day_and_params(today: datetime) -> Tuple[datetime, int, int,
     date_diff = 4 - today_day  # Represents the end day for the view's logic
     return start_day, start_day_diff, weekday_mark, date_diff
 
-# Helper function for new view: Gets list of daily reservations
-def _get_daily_reservations_list(reservations_qs: QuerySet, equipment_id: int, username: Optional[str], start_day: datetime, myrange_func: Callable) -> List[List[float]]:
-    day_list = []
-    for i in range(0, 5):  # Monday to Friday
-        day = start_day + timedelta(days=i)
-        reservations_day = reservations_qs.filter(
-            equipment_id=equipment_id, room_date=day
-        ).order_by('room_start_time')
-        temp_list = []
-        for res in reservations_day:
-            temp_list.extend(myrange_func(res.room_start_time, res.room_finish_time, 0.5))
-        day_list.append(temp_list)
-    return day_list
-
 ########################## C
+@read_only
 def new(request: HttpRequest, equipment_id: int) -> HttpResponse:
     today = datetime.now()
-    start_day, start_day_diff, weekday_mark, date_diff = _get_week_start_day_and_params(today)
+    start_day, _, weekday_mark, date_diff = _get_week_start_day_and_params(today)
     
     equipment = get_object_or_404(Equipment, pk=equipment_id)
-    reservations = Reservation.objects.all()
-    # username used to be passed to _get_daily_reservations_list but wasn't actually used for filtering there
-    day_list = _get_daily_reservations_list(reservations, equipment_id, request.user.username if request.user.is_authenticated else None, start_day, myrange)
+    # 주간 예약 현황은 캐시에서 (예약 저장/삭제 시 signals에서 무효화)
+    week_start = start_day.date()
+    grid = week_payload(equipment.pk, week_start, 0, get_week_availability(equipment.pk, week_start))
     
     return render(request, 'reservation/new.html', {
         'equipment': equipment,
         'date_diff': date_diff,
         'weekday_mark': weekday_mark,
-        'day_list': day_list,
-        'start_day_diff': start_day_diff
+        'grid': grid,
+        'time_slots': TIME_SLOTS,
+        'msg': request.GET.get('msg', None),
     })
 
-# Helper function for check view: Checks for reservation overlaps
-def _check_reservation_overlap(reservations_qs: QuerySet, equipment_id: int, reserve_date: date, start_time: float, finish_time: float) -> bool:
-    if reservations_qs.filter(
+# 예약 화면의 주간표 갱신용 (?week=N: 이번 주 기준 N주 뒤)
+@read_only
+async def availability(request: HttpRequest, equipment_id: int) -> HttpResponse:
+    try:
+        offset = int(request.GET.get('week', 0))
+    except ValueError:
+        return JsonResponse({'message': "week는 정수여야 합니다."}, status=400)
+    offset = max(-MAX_WEEK_OFFSET, min(offset, MAX_WEEK_OFFSET))
+    if not any(e.pk == equipment_id for e in await aget_equipment_list()):
+        raise Http404(BOOKING_ERRORS['not_found'])
+    week_start = shift_week(_get_week_start_day_and_params(datetime.now())[0].date(), offset)
+    return JsonResponse(week_payload(equipment_id, week_start, offset, await aget_week_availability(equipment_id, week_start)))
+
+# 전체 장비 주간 현황판
+@read_only
+def board(request: HttpRequest) -> HttpResponse:
+    start_day = _get_week_start_day_and_params(datetime.now())[0].date()
+    equipments = get_equipment_list()
+    matrix = _build_occupancy_matrix(Reservation.objects.all(), start_day, {e.pk: e.capacity for e in equipments})
+    rows = [[e.pk, e.name, matrix.get(e.pk, [0] * 5)] for e in equipments]
+    return render(request, 'reservation/board.html', {
+        'rows': rows,
+        'days': [start_day + timedelta(days=i) for i in range(5)],
+        'time_slots': TIME_SLOTS,
+    })
+
+# 예약 거절 사유: AJAX/API 응답의 code 값과 사용자에게 보여줄 메시지
+BOOKING_ERRORS = {
+    'invalid_time': "잘못된 시간 형식입니다.",
+    'daily_limit': "해당일에 이미 2건의 예약을 하셨습니다",
+    'overlap': "이미 예약된 시간입니다",
+    'not_found': "예약 또는 장비를 찾을 수 없습니다.",
+}
+BOOKING_ERROR_STATUS = {'invalid_time': 400, 'not_found': 404, 'daily_limit': 409, 'overlap': 409}
+
+# Helper function for check view: Checks whether all units of the equipment are taken at some instant of the slot
+def _check_reservation_overlap(reservations_qs: QuerySet, equipment_id: int, reserve_date: date, start_time: float, finish_time: float, exclude_id: Optional[int] = None, capacity: int = 1) -> bool:
+    overlapping = reservations_qs.filter(
         equipment_id=equipment_id, room_date=reserve_date,
         room_start_time__lt=finish_time,
         room_finish_time__gt=start_time
-    ).exists():
-        return True
-    return False
+    )
+    if exclude_id is not None:
+        overlapping = overlapping.exclude(pk=exclude_id)
+    # 겹치는 예약이 있어도 동시에 쓰이는 대수가 수량보다 적으면 예약 가능
+    return max_overlap(overlapping.values_list('room_start_time', 'room_finish_time'), start_time, finish_time) >= capacity
 
-# ajax 통신
-@login_required
-def check(request: HttpRequest) -> HttpResponse:
-    equipment_id = request.POST.get('equipment_id', None)
-    room_date_vr = request.POST.get('room_date', None)
-    try:
-        room_start_time_vr = float(request.POST.get('room_start_time', None))
-        room_finish_time_vr = float(request.POST.get('room_finish_time', None))
-    except (ValueError, TypeError):
-        return HttpResponse(json.dumps({'message': "잘못된 시간 형식입니다.", 'check_error': 1}), content_type="application/json")
+# Helper function for check view and the API: Returns the BOOKING_ERRORS code of a refused booking, or None
+# (잠금 안에서는 잠근 행에서 읽은 capacity를 넘긴다: 캐시된 장비 목록은 다른 워커에서 오래됐을 수 있음)
+def _get_reservation_error(reservations_qs: QuerySet, username: str, equipment_id: int, reserve_date: date, start_time: float, finish_time: float, exclude_id: Optional[int] = None, capacity: Optional[int] = None) -> Optional[str]:
+    # 하루 2건 검사
+    own = reservations_qs.filter(user=username, room_date=reserve_date)
+    if exclude_id is not None:
+        own = own.exclude(pk=exclude_id)
+    if own.count() >= 2:
+        return 'daily_limit'
+    if capacity is None:
+        capacity = get_capacity(equipment_id)
+    if _check_reservation_overlap(reservations_qs, equipment_id, reserve_date, start_time, finish_time, exclude_id, capacity):
+        return 'overlap'
+    return None
 
-    reservations = Reservation.objects.all()
-    reserve_date = datetime.strptime(room_date_vr, "%Y-%m-%d ").date()
+# Helper function for create/update: 09:00 ~ 21:00, 30분 단위
+def _is_valid_slot(start_time: float, finish_time: float) -> bool:
+    return 9 <= start_time < finish_time <= 21 and (start_time * 2).is_integer() and (finish_time * 2).is_integer()
 
-    check_error = 0
-    message = ""
+# Helper function for create/update: Takes a write lock on the equipment row(s) matched by `equipment_qs`
+def _lock_equipment(equipment_qs: QuerySet) -> bool:
+    # 트랜잭션의 첫 문장으로 쓰기를 하여 같은 장비에 대한 검사+쓰기를 직렬화한다
+    # (PostgreSQL은 행 잠금, SQLite는 DB 쓰기 잠금)
+    return equipment_qs.update(name=F('name')) > 0
 
-    # 하루 2건 검사
-    if reservations.filter(user=request.user.username, room_date=reserve_date).count() >= 2:
-        message = "해당일에 이미 2건의 예약을 하셨습니다"
-        check_error = 1
-    elif _check_reservation_overlap(reservations, equipment_id, reserve_date, room_start_time_vr, room_finish_time_vr):
-        message = "이미 예약된 시간입니다"
-        check_error = 1
+# Helper function for create view and the API: Checks and inserts in one locked transaction
+def _book_reservation(username: str, equipment_id: int, reserve_date: date, start_time: float, finish_time: float) -> Tuple[Optional[Reservation], Optional[str]]:
+    if not _is_valid_slot(start_time, finish_time):
+        return None, 'invalid_time'
+    with transaction.atomic():
+        if not _lock_equipment(Equipment.objects.filter(pk=equipment_id)):
+            return None, 'not_found'
+        capacity = Equipment.objects.values_list('capacity', flat=True).get(pk=equipment_id)
+        code = _get_reservation_error(Reservation.objects.all(), username, equipment_id, reserve_date, start_time, finish_time, capacity=capacity)
+        if code:
+            return None, code
+        reservation = Reservation.objects.create(
+            user=username, equipment_id=equipment_id, room_date=reserve_date,
+            room_start_time=start_time, room_finish_time=finish_time, pub_date=timezone.now(),
+        )
+    return reservation, None
+
+# Helper function for update view: Moves/resizes the user's own booking in one locked transaction
+def _move_reservation(reservation_id: int, username: str, reserve_date: date, start_time: float, finish_time: float) -> Tuple[Optional[Reservation], Optional[str]]:
+    if not _is_valid_slot(start_time, finish_time):
+        return None, 'invalid_time'
+    with transaction.atomic():
+        if not _lock_equipment(Equipment.objects.filter(reservation__pk=reservation_id)):
+            return None, 'not_found'
+        reservation = Reservation.objects.filter(pk=reservation_id, user=username).first()
+        if reservation is None:
+            return None, 'not_found'
+        capacity = Equipment.objects.values_list('capacity', flat=True).get(pk=reservation.equipment_id)
+        code = _get_reservation_error(Reservation.objects.all(), username, reservation.equipment_id, reserve_date, start_time, finish_time, exclude_id=reservation.pk, capacity=capacity)
+        if code:
+            return None, code
+        reservation.room_date = reserve_date
+        reservation.room_start_time = start_time
+        reservation.room_finish_time = finish_time
+        reservation.save(update_fields=['room_date', 'room_start_time', 'room_finish_time'])
+    return reservation, None
+
+# Helper function for check view: The one query _judge_candidates needs (the candidates' equipment-days and the user's days)
+def _candidate_rows(reservations_qs: QuerySet, username: str, candidates: List[Tuple[int, date, float, float]]) -> QuerySet:
+    pairs = {(equipment_id, reserve_date) for equipment_id, reserve_date, _, _ in candidates}
+    dates = {reserve_date for _, reserve_date, _, _ in candidates}
+    pair_filter = Q()
+    for equipment_id, reserve_date in pairs:
+        pair_filter |= Q(equipment_id=equipment_id, room_date=reserve_date)
+    return reservations_qs.filter(pair_filter | Q(user=username, room_date__in=dates)).values_list(
+        'user', 'equipment_id', 'room_date', 'room_start_time', 'room_finish_time'
+    )
+
+# Helper function for check view: BOOKING_ERRORS code (or None) per candidate, from the rows of _candidate_rows
+def _judge_candidates(rows: Iterable[tuple], username: str, candidates: List[Tuple[int, date, float, float]], capacity_of: Callable[[int], int]) -> List[Optional[str]]:
+    user_counts: dict = {}
+    booked: dict = {}
+    for user, equipment_id, room_date, start_time, finish_time in rows:
+        if user == username:
+            user_counts[room_date] = user_counts.get(room_date, 0) + 1
+        booked.setdefault((equipment_id, room_date), []).append((start_time, finish_time))
+
+    verdicts: List[Optional[str]] = []
+    for equipment_id, reserve_date, start_time, finish_time in candidates:
+        if user_counts.get(reserve_date, 0) >= 2:
+            verdicts.append('daily_limit')
+        elif max_overlap(booked.get((equipment_id, reserve_date), ()), start_time, finish_time) >= capacity_of(equipment_id):
+            verdicts.append('overlap')
+        else:
+            verdicts.append(None)
+    return verdicts
+
+# Helper function for check view: Evaluates many candidate slots against one query
+def _evaluate_candidates(reservations_qs: QuerySet, username: str, candidates: List[Tuple[int, date, float, float]]) -> List[Optional[str]]:
+    return _judge_candidates(_candidate_rows(reservations_qs, username, candidates), username, candidates, get_capacity)
 
-    context = {'message': message, 'check_error': check_error}
-    return HttpResponse(json.dumps(context), content_type="application/json")
+# Helper function for check view: _evaluate_candidates with the async ORM and cache
+async def _aevaluate_candidates(reservations_qs: QuerySet, username: str, candidates: List[Tuple[int, date, float, float]]) -> List[Optional[str]]:
+    rows = [row async for row in _candidate_rows(reservations_qs, username, candidates)]
+    capacities = {e.pk: e.capacity for e in await aget_equipment_list()}
+    return _judge_candidates(rows, username, candidates, lambda equipment_id: capacities.get(equipment_id, 1))
+
+MAX_CANDIDATES = 50 # 후보마다 OR 조건이 하나씩 늘어나므로 SQLite 식 깊이 제한 안쪽으로
+
+# Helper function for check view: Parses the JSON list posted as `candidates`
+def _parse_candidates(raw: str, default_equipment_id: Optional[str]) -> List[Tuple[int, date, float, float]]:
+    items = json.loads(raw)
+    if len(items) > MAX_CANDIDATES:
+        raise ValueError(f"too many candidates: {len(items)}")
+    candidates = []
+    for item in items:
+        candidates.append((
+            int(item.get('equipment_id', default_equipment_id)),
+            datetime.strptime(item['room_date'].strip(), "%Y-%m-%d").date(),
+            float(item['room_start_time']),
+            float(item['room_finish_time']),
+        ))
+    return candidates
+
+# ajax 통신: async 뷰라 ASGI에서는 DB를 기다리는 동안 워커를 점유하지 않는다
+@login_required
+@ratelimit('check', methods=('POST',))
+async def check(request: HttpRequest) -> HttpResponse:
+    equipment_id = request.POST.get('equipment_id', None)
+    username = (await request.auser()).username
+
+    try:
+        # 여러 후보 시간을 한 번에 검사
+        if 'candidates' in request.POST:
+            candidates = _parse_candidates(request.POST['candidates'], equipment_id)
+        else:
+            candidates = [(
+                int(equipment_id),
+                datetime.strptime(request.POST.get('room_date', None), "%Y-%m-%d ").date(),
+                float(request.POST.get('room_start_time', None)),
+                float(request.POST.get('room_finish_time', None)),
+            )]
+    except (ValueError, TypeError, KeyError, AttributeError):
+        return json_response({'code': 'invalid_time', 'message': BOOKING_ERRORS['invalid_time'], 'check_error': 1})
+
+    verdicts = await _aevaluate_candidates(Reservation.objects.all(), username, candidates) if candidates else []
+    results = [{'code': code, 'message': BOOKING_ERRORS[code] if code else "", 'check_error': 1 if code else 0} for code in verdicts]
+    if 'candidates' in request.POST:
+        return json_response({'results': results})
+    return json_response(results[0])
 
 # C
 @login_required
+@ratelimit('create')
 def create(request: HttpRequest) -> HttpResponse:
-    equipment_id = request.GET['equipment_id']
-    reserve_date = datetime.strptime(request.GET['room_date'], "%Y-%m-%d ").date()
-
-    reservation = Reservation()
-    reservation.user = request.GET['user']
-    reservation.equipment = get_object_or_404(Equipment, pk=equipment_id)
-    reservation.room_date= reserve_date
-    reservation.room_start_time = request.GET['room_start_time']
-    reservation.room_finish_time= request.GET['room_finish_time']
-    reservation.pub_date = timezone.datetime.now()
-    reservation.save()
+    equipment_id = request.GET.get('equipment_id', '')
+    if not equipment_id.isdigit():
+        raise Http404(BOOKING_ERRORS['not_found'])
+    try:
+        reserve_date = datetime.strptime(request.GET['room_date'].strip(), "%Y-%m-%d").date()
+        room_start_time = float(request.GET['room_start_time'])
+        room_finish_time = float(request.GET['room_finish_time'])
+    except (KeyError, ValueError):
+        code = 'invalid_time'
+    else:
+        # check 이후 다른 사용자가 먼저 예약했을 수 있으므로 잠금 안에서 다시 검사
+        _, code = _book_reservation(request.user.username, equipment_id, reserve_date, room_start_time, room_finish_time)
+    if code == 'not_found':
+        raise Http404(BOOKING_ERRORS[code])
+    if code:
+        return redirect(f"{reverse('new', args=[equipment_id])}?msg={BOOKING_ERRORS[code]}")
 
     return redirect('/reservation/my')
 
+# Helper function for home view: Everything on the page except the user and ?msg, shared by all visitors
+def _build_home_payload(today: date) -> dict:
+    with use_primary():
+        return {
+            'equipments': get_equipment_list(),
+            'notices': list(get_blog_posts("공지사항", 3)),
+            'losts': list(get_blog_posts("분실물", 3)),
+            # Simple summary of today's reservations
+            'reservations_today': list(Reservation.objects.filter(room_date=today).select_related('equipment').order_by('room_start_time')),
+        }
+
+@read_only
 def home(request: HttpRequest) -> HttpResponse:
-    equipments = Equipment.objects.all()
-    notices = Blog.objects.filter(category="공지사항").order_by('-pub_date')[:3]
-    losts = Blog.objects.filter(category="분실물").order_by('-pub_date')[:3]
-    msg = request.GET.get('msg', None)
-    
-    # Simple summary of today's reservations
+    # 수업 교대 시간의 동시 새로고침에도 DB에서는 한 번만 생성 (예약/공지/장비 변경 시 signals에서 만료)
     today = date.today()
-    reservations_today = Reservation.objects.filter(room_date=today)
-    
-    # For Calendar View: Fetch all reservations
-    all_reservations = Reservation.objects.all()
-    calendar_events = []
-    for res in all_reservations:
-        # room_start_time and room_finish_time are float (e.g., 9.5 for 09:30)
-        start_hour = int(res.room_start_time)
-        start_minute = int((res.room_start_time % 1) * 60)
-        end_hour = int(res.room_finish_time)
-        end_minute = int((res.room_finish_time % 1) * 60)
-        
-        start_dt = datetime.combine(res.room_date, datetime.min.time().replace(hour=start_hour, minute=start_minute))
-        end_dt = datetime.combine(res.room_date, datetime.min.time().replace(hour=end_hour, minute=end_minute))
-        
-        calendar_events.append({
-            'title': f"[{res.equipment.name}] {res.user}",
-            'start': start_dt.isoformat(),
-            'end': end_dt.isoformat(),
-            'color': '#3788d8' if res.equipment.pk % 2 == 0 else '#2c3e50', # Simple color distinction
-        })
-
-    return render(request, 'reservation/home.html', {
-        'equipments': equipments,
-        'notices': notices,
-        'losts': losts,
-        'msg': msg,
-        'reservations_today': reservations_today,
-        'calendar_events': json.dumps(calendar_events)
-    })
+    payload = home_cache.get_or_build(home_key(today), lambda: _build_home_payload(today))
+    return render(request, 'reservation/home.html', {**payload, 'msg': request.GET.get('msg', None)})
+
+MAX_CALENDAR_DAYS = 42 # dayGridMonth 화면(6주)
+
+# Helper function for calendar_events view: FullCalendar event from a reservation row
+def _calendar_event(row: tuple) -> dict:
+    equipment_id, equipment_name, user, room_date, start_time, finish_time = row
+    # room_start_time and room_finish_time are float (e.g., 9.5 for 09:30)
+    day = datetime.combine(room_date, datetime.min.time())
+    return {
+        'title': f"[{equipment_name}] {user}",
+        'start': (day + timedelta(hours=start_time)).isoformat(),
+        'end': (day + timedelta(hours=finish_time)).isoformat(),
+        'color': '#3788d8' if equipment_id % 2 == 0 else '#2c3e50', # Simple color distinction
+    }
+
+# 홈 달력의 이벤트 소스: 보이는 기간만, 한 번에 메모리에 올리지 않고 나눠서 전송
+@read_only
+def calendar_events(request: HttpRequest) -> HttpResponse:
+    try:
+        # FullCalendar가 보내는 ?start=2026-09-28T00:00:00+09:00&end=... 에서 날짜 부분만 사용
+        start = date.fromisoformat(request.GET['start'][:10])
+        end = date.fromisoformat(request.GET['end'][:10])
+    except (KeyError, ValueError):
+        return JsonResponse({'message': "start와 end 날짜가 필요합니다."}, status=400)
+    if not start <= end <= start + timedelta(days=MAX_CALENDAR_DAYS):
+        return JsonResponse({'message': f"조회 기간은 최대 {MAX_CALENDAR_DAYS}일입니다."}, status=400)
+    reservations = Reservation.objects.filter(equipment__isnull=False, room_date__gte=start, room_date__lt=end).order_by('room_date', 'room_start_time').values_list(
+        'equipment_id', 'equipment__name', 'user', 'room_date', 'room_start_time', 'room_finish_time'
+    )
+    return streaming_json_response(request, reservations, _calendar_event)
 
 # R 
+@read_only
 def detail(request: HttpRequest, blog_id: int) -> HttpResponse : 
     blog_detail = get_object_or_404(Blog, pk= blog_id)
     return render(request, 'reservation/detail.html', {'blog':blog_detail})
 
+@read_only
 def index(request: HttpRequest, category_name: str) -> HttpResponse:
     blogs = Blog.objects.filter(category=category_name).order_by('-pub_date')
     category = category_name
     return render(request, 'reservation/index.html', {'category':category, 'blogs':blogs})
 
+@read_only
+def search(request: HttpRequest) -> HttpResponse:
+    query = request.GET.get('q', '')
+    return render(request, 'reservation/search.html', {'query': query, 'results': search_blog(query)})
+
 # Helper function used by other apps (e.g., accounts)
 def get_blog_posts(category_name: str, count: int) -> QuerySet:
     return Blog.objects.filter(category=category_name).order_by('-pub_date')[:count]
 
 ########################## U
-def edit(request: HttpRequest, reservation_id: int) -> HttpResponse:
-    reservation = get_object_or_404(Reservation, pk= reservation_id)
+def _render_edit(request: HttpRequest, reservation: Reservation, msg: Optional[str] = None) -> HttpResponse:
     min_date = datetime.now().strftime("%Y-%m-%d")
     max_date = (datetime.now() +timedelta(days=14)).strftime("%Y-%m-%d")
-    return render(request, 'reservation/edit.html', {'reservation':reservation, 'min_date':min_date, 'max_date':max_date})
+    return render(request, 'reservation/edit.html', {
+        'reservation': reservation,
+        'min_date': min_date,
+        'max_date': max_date,
+        'start_slots': TIME_SLOTS,
+        'finish_slots': TIME_SLOTS[1:] + [("21", "21:00")],
+        'start_value': f"{reservation.room_start_time:g}",
+        'finish_value': f"{reservation.room_finish_time:g}",
+        'msg': msg,
+    })
+
+@login_required
+def edit(request: HttpRequest, reservation_id: int) -> HttpResponse:
+    reservation = get_object_or_404(Reservation, pk= reservation_id, user=request.user.username)
+    return _render_edit(request, reservation)
 
 # U
+@login_required
 def update(request: HttpRequest, reservation_id: int) -> HttpResponse:
-    reservation= get_object_or_404(Reservation, pk= reservation_id)
-    reservation.room_date= request.GET['room_date']
-    reservation.room_start_time = request.GET['room_start_time']
-    reservation.room_finish_time= request.GET['room_finish_time']
-    reservation.save()
+    try:
+        reserve_date = datetime.strptime(request.GET['room_date'].strip(), "%Y-%m-%d").date()
+        room_start_time = float(request.GET['room_start_time'])
+        room_finish_time = float(request.GET['room_finish_time'])
+    except (KeyError, ValueError):
+        code = 'invalid_time'
+    else:
+        _, code = _move_reservation(reservation_id, request.user.username, reserve_date, room_start_time, room_finish_time)
+
+    if code:
+        status = BOOKING_ERROR_STATUS[code]
+        if 'application/json' in request.headers.get('Accept', ''):
+            return JsonResponse({'code': code, 'message': BOOKING_ERRORS[code]}, status=status)
+        reservation = get_object_or_404(Reservation, pk= reservation_id, user=request.user.username)
+        response = _render_edit(request, reservation, BOOKING_ERRORS[code])
+        response.status_code = status
+        return response
 
     return redirect('/reservation/my')
 
 ########################## D
 def delete(request: HttpRequest, reservation_id: int) -> HttpResponse:
-    reservation= get_object_or_404(Reservation, pk= reservation_id)
-    if reservation.user == request.user.username:
-        reservation.delete()
-    return redirect('/reservation/my')                
+    # 소유자 조건을 삭제 조건에 넣어 남의 예약은 읽지도 않는다
+    deleted, _ = Reservation.objects.filter(pk=reservation_id, user=request.user.username).delete()
+    if not deleted:
+        raise Http404
+    return redirect('/reservation/my')
+
+########################## 일괄 취소 (staff)
+@staff_member_required
+def bulk_cancel(request: HttpRequest) -> HttpResponse:
+    form = BulkCancelForm(request.POST or None)
+    if request.method == 'POST' and form.is_valid():
+        data = form.cleaned_data
+        cancelled = cancel_reservations(
+            data['equipment'].pk, data['start_date'], data['end_date'],
+            data['start_time'], data['finish_time'], data['reason'],
+        )
+        # POST 후 리다이렉트: 새로고침해도 취소가 다시 전송되지 않음
+        return redirect(f"{reverse('bulk_cancel')}?cancelled={cancelled}")
+    cancelled = request.GET.get('cancelled')
+    return render(request, 'reservation/bulk_cancel.html', {'form': form, 'cancelled': int(cancelled) if cancelled and cancelled.isdigit() else None})
     
+########################## 대기 신청
+WAITLIST_ERRORS = {
+    'available': "지금 바로 예약할 수 있는 시간입니다.",
+    'too_many': "대기 신청은 최대 {max_waiting}건까지 할 수 있습니다.", # waitlist.MAX_WAITING_PER_USER
+    'duplicate': "이미 대기 신청한 시간입니다.",
+}
+WAITLIST_STATUS = {'invalid_time': 400, 'not_found': 404, 'daily_limit': 409, 'available': 409, 'too_many': 409, 'duplicate': 409}
+
+@login_required
+@require_POST
+@ratelimit('create')
+def waitlist_join(request: HttpRequest) -> HttpResponse:
+    equipment_id = request.POST.get('equipment_id', '')
+    try:
+        reserve_date = datetime.strptime(request.POST['room_date'].strip(), "%Y-%m-%d").date()
+        start_time = float(request.POST['room_start_time'])
+        finish_time = float(request.POST['room_finish_time'])
+    except (KeyError, ValueError):
+        return JsonResponse({'code': 'invalid_time', 'message': BOOKING_ERRORS['invalid_time']}, status=400)
+    if not equipment_id.isdigit():
+        return JsonResponse({'code': 'not_found', 'message': BOOKING_ERRORS['not_found']}, status=404)
+
+    from .waitlist import MAX_WAITING_PER_USER, join_waitlist  # waitlist.py가 이 모듈의 예약 검사 함수를 쓰므로 순환 import 방지
+    entry, code = join_waitlist(request.user.username, int(equipment_id), reserve_date, start_time, finish_time)
+    if code:
+        message = (WAITLIST_ERRORS.get(code) or BOOKING_ERRORS[code]).format(max_waiting=MAX_WAITING_PER_USER)
+        return JsonResponse({'code': code, 'message': message}, status=WAITLIST_STATUS[code])
+    return JsonResponse({'id': entry.pk, 'message': "대기 신청되었습니다. 자리가 나면 자동으로 예약하고 알려드립니다."}, status=201)
+
+@login_required
+@require_POST
+def waitlist_leave(request: HttpRequest, entry_id: int) -> HttpResponse:
+    deleted, _ = WaitlistEntry.objects.filter(pk=entry_id, user=request.user.username).delete()
+    if not deleted:
+        raise Http404
+    return redirect('/reservation/my')
+
 ########################## MY 예약
+HISTORY_PAGE_SIZE = 20
+
+# Helper function for myreservation view: Upcoming or past bookings as an index range scan
+def _get_history_queryset(username: str, mode: str, now_time: datetime) -> QuerySet:
+    today = now_time.date()
+    now = now_time.hour + (now_time.minute / 60)
+    # 오늘 날짜만 종료 시간으로 나누므로 (user, room_date) 범위 + 잔여 조건으로 표현 (OR 없음)
+    qs = Reservation.objects.filter(user=username).select_related('equipment')
+    if mode == 'past':
+        qs = qs.filter(room_date__lte=today).exclude(room_date=today, room_finish_time__gte=now)
+        return qs.order_by('-room_date', '-room_start_time', '-id')
+    qs = qs.filter(room_date__gte=today).exclude(room_date=today, room_finish_time__lt=now)
+    return qs.order_by('room_date', 'room_start_time', 'id')
+
+# Helper function for myreservation view: One keyset page and the cursor of the next one
+def _get_history_page(qs: QuerySet, mode: str, cursor: Optional[str], page_size: int) -> Tuple[List[Reservation], Optional[str]]:
+    if cursor:
+        try:
+            qs = reservations_after(qs, decode_cursor(cursor), descending=(mode == 'past'))
+        except (ValueError, IndexError, TypeError):
+            pass  # 잘못된 cursor는 첫 페이지로
+    rows = list(qs[:page_size + 1])
+    next_cursor = None
+    if len(rows) > page_size:
+        last = rows[page_size - 1]
+        next_cursor = encode_cursor((last.room_date, last.room_start_time, last.pk))
+    return rows[:page_size], next_cursor
+
+# Helper function for myreservation view: Cancelled bookings from the tombstones, newest first (TOMBSTONE_RETENTION_DAYS까지)
+def _get_cancelled_page(username: str, cursor: Optional[str], page_size: int) -> Tuple[List[ReservationTombstone], Optional[str]]:
+    qs = ReservationTombstone.objects.filter(user=username).order_by('-change_seq')
+    if cursor:
+        try:
+            qs = qs.filter(change_seq__lt=int(decode_cursor(cursor)[0]))
+        except (ValueError, IndexError, TypeError):
+            pass  # 잘못된 cursor는 첫 페이지로
+    rows = list(qs[:page_size + 1])
+    names = {equipment.pk: equipment.name for equipment in get_equipment_list()}
+    for row in rows:
+        row.equipment_name = names.get(row.equipment_id, '삭제된 장비')
+    next_cursor = encode_cursor((rows[page_size - 1].change_seq,)) if len(rows) > page_size else None
+    return rows[:page_size], next_cursor
+
+# 알림은 메일 발송(send_notifications)과 별개로 내 예약 현황에 한 번 표시
+UNREAD_NOTIFICATION_LIMIT = 20
+
+def _pop_unread_notifications(username: str) -> List[Notification]:
+    notifications = list(Notification.objects.filter(user=username, read_at__isnull=True).order_by('-created_at', '-id')[:UNREAD_NOTIFICATION_LIMIT])
+    if notifications:
+        Notification.objects.filter(pk__in=[n.pk for n in notifications]).update(read_at=timezone.now())
+    return notifications
+
 @login_required
 def myreservation(request: HttpRequest) -> HttpResponse:
+    mode = request.GET.get('mode') if request.GET.get('mode') in ('past', 'cancelled') else 'upcoming'
+    if mode == 'cancelled':
+        reservation_list, next_cursor = _get_cancelled_page(request.user.username, request.GET.get('cursor'), HISTORY_PAGE_SIZE)
+    else:
+        qs = _get_history_queryset(request.user.username, mode, datetime.now())
+        reservation_list, next_cursor = _get_history_page(qs, mode, request.GET.get('cursor'), HISTORY_PAGE_SIZE)
+    waitlist = WaitlistEntry.objects.filter(user=request.user.username, room_date__gte=date.today()).select_related('equipment').order_by('room_date', 'room_start_time') if mode == 'upcoming' else []
+    return render(request, 'reservation/myreservation.html', {
+        'reservation_list': reservation_list,
+        'waitlist': waitlist,
+        'notifications': _pop_unread_notifications(request.user.username),
+        'mode': mode,
+        'next_cursor': next_cursor,
+    })
+
+########################## 장비 사용률 리포트 (staff)
+@staff_member_required
+def report(request: HttpRequest) -> HttpResponse:
     today = date.today()
-    now_time = datetime.now()
-    now = now_time.hour + (now_time.minute / 60) 
-    reservations = Reservation.objects.all()
-    reservation_list = reservations.filter(Q(user=request.user.username, room_date__gt=today) | Q(user=request.user.username, room_date=today, room_finish_time__gte = now))
-    return render(request, 'reservation/myreservation.html',{'reservation_list':reservation_list})
-    
\ No newline at end of file
+    start = today - timedelta(weeks=4)
+    return render(request, 'reservation/report.html', {
+        'hours': list(REPORT_HOURS),
+        'heatmap': get_heatmap(start, today),
+        'trend': get_weekly_trend(today, 12),
+        'start': start,
+        'end': today,
+    })
+
+########################## Health check
+def healthz(request: HttpRequest) -> HttpResponse:
+    """Readiness probe: checks the DB and fills the equipment and availability caches."""
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        week_start = _get_week_start_day_and_params(datetime.now())[0].date()
+        equipments = get_equipment_list()
+        for equipment in equipments:
+            get_week_availability(equipment.pk, week_start)
+    except DatabaseError as e:
+        return JsonResponse({'status': 'error', 'detail': str(e)}, status=503)
+    return JsonResponse({'status': 'ok', 'equipment': len(equipments)})
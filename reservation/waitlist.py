@@ -0,0 +1,90 @@
+"""
+Waitlist for fully booked slots.
+
+A user whose ``check`` is refused with ``overlap`` can wait for the same
+(equipment, date, time range). When a booking is deleted or moved away, the
+``Reservation`` signals call ``promote_waitlist`` for the freed range once the
+transaction commits. Entries overlapping that range are read with the
+``waitlist_slot_idx`` index, oldest first, and each one that now passes the
+normal booking checks is booked under the equipment lock, removed from the
+waitlist and told through a ``Notification`` (shown on ``myreservation``).
+Entries that still do not fit keep waiting, so nobody has to poll ``new`` for
+a free slot; ``manage.py prune_waitlist`` deletes the ones whose date has
+passed.
+"""
+from datetime import date
+from typing import List, Optional, Tuple
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .cancellation import _format_time
+from .models import Equipment, Notification, Reservation, WaitlistEntry
+from .views import _get_reservation_error, _is_valid_slot, _lock_equipment
+
+MAX_WAITING_PER_USER = 5
+
+
+def join_waitlist(username: str, equipment_id: int, room_date: date, start_time: float, finish_time: float) -> Tuple[Optional[WaitlistEntry], Optional[str]]:
+    """Adds a waitlist entry; the error code is one of ``WAITLIST_ERRORS`` in views.py or a ``BOOKING_ERRORS`` code."""
+    if not _is_valid_slot(start_time, finish_time) or room_date < date.today():
+        return None, 'invalid_time'
+    if not Equipment.objects.filter(pk=equipment_id).exists():
+        return None, 'not_found'
+    code = _get_reservation_error(Reservation.objects.all(), username, equipment_id, room_date, start_time, finish_time)
+    if code is None:
+        return None, 'available'  # 지금 바로 예약할 수 있음
+    if code != 'overlap':
+        return None, code
+    if WaitlistEntry.objects.filter(user=username, room_date__gte=date.today()).count() >= MAX_WAITING_PER_USER:
+        return None, 'too_many'
+    try:
+        with transaction.atomic():
+            entry = WaitlistEntry.objects.create(
+                user=username, equipment_id=equipment_id, room_date=room_date,
+                room_start_time=start_time, room_finish_time=finish_time,
+            )
+    except IntegrityError:
+        return None, 'duplicate'
+    return entry, None
+
+
+def promote_waitlist(equipment_id: Optional[int], room_date: date, start_time: float, finish_time: float) -> List[Reservation]:
+    """Books the waiting entries that fit into the freed [start_time, finish_time) of (equipment, date)."""
+    if equipment_id is None or room_date < date.today():
+        return []
+    waiting = list(WaitlistEntry.objects.filter(
+        equipment_id=equipment_id, room_date=room_date,
+        room_start_time__lt=finish_time, room_finish_time__gt=start_time,
+    ).order_by('created_at', 'id'))
+    if not waiting:
+        return []  # 대부분의 취소는 대기자가 없으므로 잠금 없이 끝난다
+
+    booked: List[Reservation] = []
+    with transaction.atomic():
+        if not _lock_equipment(Equipment.objects.filter(pk=equipment_id)):
+            return []
+        equipment_name, capacity = Equipment.objects.values_list('name', 'capacity').get(pk=equipment_id)
+        for entry in waiting:
+            # 신청 순서대로: 앞사람이 예약한 뒤의 상태로 다음 사람을 검사
+            if _get_reservation_error(Reservation.objects.all(), entry.user, equipment_id, room_date, entry.room_start_time, entry.room_finish_time, capacity=capacity):
+                continue
+            if not WaitlistEntry.objects.filter(pk=entry.pk).delete()[0]:
+                continue  # 그 사이 본인이 대기를 취소함
+            reservation = Reservation.objects.create(
+                user=entry.user, equipment_id=equipment_id, room_date=room_date,
+                room_start_time=entry.room_start_time, room_finish_time=entry.room_finish_time, pub_date=timezone.now(),
+            )
+            Notification.objects.create(
+                user=entry.user,
+                subject=f"[장비 예약] 대기하던 {equipment_name} 예약이 확정되었습니다",
+                message=f"{room_date:%Y-%m-%d} {_format_time(entry.room_start_time)}~{_format_time(entry.room_finish_time)} {equipment_name} 예약이 대기 순서에 따라 자동으로 확정되었습니다.",
+            )
+            booked.append(reservation)
+    return booked
+
+
+def prune_waitlist(today: date) -> int:
+    """Deletes entries for dates before ``today``; they can no longer be booked."""
+    deleted, _ = WaitlistEntry.objects.filter(room_date__lt=today).delete()
+    return deleted